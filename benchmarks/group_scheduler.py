@@ -0,0 +1,117 @@
+import argparse
+import random
+import statistics
+import time
+
+# importing the lib
+from omniq.client import OmniqClient
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round((p / 100.0) * (len(values) - 1))))
+    return values[k]
+
+def report(name, values_ms):
+    print(
+        f"{name:<34} n={len(values_ms):<6} "
+        f"p50={statistics.median(values_ms):7.3f}ms "
+        f"p99={percentile(values_ms, 99):7.3f}ms "
+        f"max={max(values_ms):7.3f}ms"
+    )
+
+def reset(r, queue):
+    keys = list(r.scan_iter(match="{" + queue + "}*", count=1000))
+    if keys:
+        r.delete(*keys)
+
+def publish_groups(omniq, queue, groups, jobs_per_group, hot_share, hot_limit, hot_jobs, rng):
+    # skewed tenants: a few hot groups with a wide limit and a deep backlog, the rest limit 1
+    waiting = {}
+    jobs = []
+    for g in range(groups):
+        gid = f"tenant:{g}"
+        hot = rng.random() < hot_share
+        n = hot_jobs if hot else jobs_per_group
+        waiting[gid] = n
+        for i in range(n):
+            jobs.append({"payload": {"g": g, "i": i}, "gid": gid, "group_limit": hot_limit if hot else 1})
+
+    rng.shuffle(jobs)
+    omniq.publish_many(queue=queue, jobs=jobs, chunk_size=1000)
+    return waiting, len(jobs)
+
+def saturate(omniq, queue, waiting):
+    # lease until every group is at its limit; nothing is acked yet
+    leased = []
+    lat = []
+    while True:
+        t0 = time.perf_counter()
+        res = omniq.reserve(queue=queue)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+        if res is None:
+            break
+        waiting[res.gid] -= 1
+        leased.append(res)
+    return leased, lat
+
+def drain(omniq, queue, leased, waiting, rng):
+    # ack in random order; each ack frees a slot, so the next reserve must find work
+    # whenever the acked group still has jobs waiting
+    lat = []
+    missed = 0
+    rng.shuffle(leased)
+    while leased:
+        job = leased.pop()
+        omniq.ack_success(queue=queue, job_id=job.job_id, lease_token=job.lease_token)
+        runnable = waiting[job.gid] > 0
+
+        t0 = time.perf_counter()
+        res = omniq.reserve(queue=queue)
+        lat.append((time.perf_counter() - t0) * 1000.0)
+
+        if res is None:
+            if runnable:
+                missed += 1
+            continue
+        waiting[res.gid] -= 1
+        leased.insert(rng.randrange(len(leased) + 1), res)
+    return lat, missed
+
+def main():
+    parser = argparse.ArgumentParser(description="grouped reserve with many tenants and skewed group limits")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--queue", default="bench-group-scheduler")
+    parser.add_argument("--groups", type=int, default=10_000)
+    parser.add_argument("--jobs-per-group", type=int, default=3)
+    parser.add_argument("--hot-share", type=float, default=0.01)
+    parser.add_argument("--hot-limit", type=int, default=8)
+    parser.add_argument("--hot-jobs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    omniq = OmniqClient(host=args.host, port=args.port)
+    r = omniq.ops.r
+    rng = random.Random(args.seed)
+
+    reset(r, args.queue)
+    waiting, total = publish_groups(
+        omniq, args.queue, args.groups, args.jobs_per_group, args.hot_share, args.hot_limit, args.hot_jobs, rng
+    )
+    print(f"published {total} jobs in {args.groups} groups")
+
+    leased, lat = saturate(omniq, args.queue, waiting)
+    report("reserve until saturated", lat)
+    print(f"leased={len(leased)} groups:ready after saturation={r.zcard('{' + args.queue + '}:groups:ready')}")
+
+    lat, missed = drain(omniq, args.queue, leased, waiting, rng)
+    report("ack + reserve (saturated groups)", lat)
+    print(f"EMPTY reserves while the acked group had work: {missed}")
+
+    reset(r, args.queue)
+    omniq.close()
+
+if __name__ == "__main__":
+    main()
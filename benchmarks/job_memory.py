@@ -0,0 +1,83 @@
+import argparse
+import json
+
+# importing the lib
+from omniq.client import OmniqClient
+from omniq.ids import new_ulid
+
+def reset(r, queue):
+    keys = list(r.scan_iter(match="{" + queue + "}*", count=1000))
+    for i in range(0, len(keys), 1000):
+        r.delete(*keys[i:i + 1000])
+
+def used_memory(r):
+    return int(r.info("memory")["used_memory"])
+
+def legacy_publish(r, queue, n, now):
+    # the job hash layout written by enqueue.lua before the compact encoding
+    base = "{" + queue + "}"
+    p = r.pipeline(transaction=False)
+    for i in range(n):
+        jid = new_ulid()
+        p.hset(f"{base}:job:{jid}", mapping={
+            "id": jid,
+            "payload": json.dumps({"i": i}, separators=(",", ":")),
+            "state": "wait",
+            "attempt": "0",
+            "max_attempts": "3",
+            "timeout_ms": "60000",
+            "backoff_ms": "5000",
+            "created_ms": str(now),
+            "updated_ms": str(now),
+        })
+        p.rpush(f"{base}:wait", jid)
+        if len(p) >= 2000:
+            p.execute()
+    p.execute()
+
+def compact_publish(omniq, queue, n):
+    for start in range(0, n, 1000):
+        omniq.publish_many(
+            queue=queue,
+            jobs=[{"payload": {"i": i}} for i in range(start, min(n, start + 1000))],
+            chunk_size=1000,
+        )
+
+def per_job_bytes(r, queue, sample):
+    base = "{" + queue + "}"
+    ids = r.lrange(f"{base}:wait", 0, sample - 1)
+    sizes = [r.memory_usage(f"{base}:job:{jid}") or 0 for jid in ids]
+    return sum(sizes) / max(1, len(sizes))
+
+def measure(name, r, queue, publish, n, sample):
+    reset(r, queue)
+    before = used_memory(r)
+    publish()
+    total = used_memory(r) - before
+    print(
+        f"{name:<10} jobs={n:<8} "
+        f"hash={per_job_bytes(r, queue, sample):7.1f}B/job "
+        f"used_memory={total / n:7.1f}B/job"
+    )
+    reset(r, queue)
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis memory per waiting job: legacy vs compact job hash")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--queue", default="bench-memory")
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    omniq = OmniqClient(host=args.host, port=args.port)
+    r = omniq.ops.r
+
+    now = int(r.time()[0]) * 1000
+    measure("legacy", r, args.queue, lambda: legacy_publish(r, args.queue, args.jobs, now), args.jobs, args.sample)
+    measure("compact", r, args.queue, lambda: compact_publish(omniq, args.queue, args.jobs), args.jobs, args.sample)
+
+    omniq.close()
+
+if __name__ == "__main__":
+    main()
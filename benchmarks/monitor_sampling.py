@@ -0,0 +1,75 @@
+import argparse
+import statistics
+import time
+
+# importing the lib
+from omniq.client import OmniqClient
+from omniq.monitor import QueueMonitor
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round((p / 100.0) * (len(values) - 1))))
+    return values[k]
+
+def report(name, values_ms):
+    print(
+        f"{name:<34} n={len(values_ms):<6} "
+        f"p50={statistics.median(values_ms):8.3f}ms "
+        f"p99={percentile(values_ms, 99):8.3f}ms "
+        f"max={max(values_ms):8.3f}ms"
+    )
+
+def reset(r, queue):
+    keys = list(r.scan_iter(match="{" + queue + "}*", count=1000))
+    if keys:
+        r.delete(*keys)
+
+def per_item_sample_active(r, queue, limit):
+    base = "{" + queue + "}"
+    out = []
+    for jid in r.zrange(f"{base}:active", 0, limit - 1):
+        gid, attempt = r.hmget(f"{base}:job:{jid}", "gid", "attempt")
+        score = r.zscore(f"{base}:active", jid) or 0
+        out.append((jid, gid, int(score), attempt))
+    return out
+
+def timed(fn, rounds):
+    out = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000.0)
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="QueueMonitor sampling latency: per-item reads vs pipelined")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--queue", default="bench-monitor")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    omniq = OmniqClient(host=args.host, port=args.port)
+    r = omniq.ops.r
+    monitor = QueueMonitor(omniq)
+
+    reset(r, args.queue)
+    omniq.publish_many(
+        queue=args.queue,
+        jobs=[{"payload": {"i": i}, "timeout_ms": 600_000} for i in range(500)],
+        chunk_size=500,
+    )
+    for _ in range(5):
+        omniq.reserve_batch(queue=args.queue, max_jobs=100)
+
+    for n in (50, 500):
+        report(f"sample_active per-item n={n}", timed(lambda: per_item_sample_active(r, args.queue, n), args.rounds))
+        report(f"sample_active pipelined n={n}", timed(lambda: monitor.sample_active(args.queue, n), args.rounds))
+
+    reset(r, args.queue)
+    omniq.close()
+
+if __name__ == "__main__":
+    main()
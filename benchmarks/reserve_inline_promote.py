@@ -0,0 +1,100 @@
+import argparse
+import json
+import statistics
+import time
+
+# importing the lib
+from omniq.client import OmniqClient
+from omniq.clock import now_ms
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, int(round((p / 100.0) * (len(values) - 1))))
+    return values[k]
+
+def report(name, values_ms):
+    print(
+        f"{name:<34} n={len(values_ms):<6} "
+        f"p50={statistics.median(values_ms):7.3f}ms "
+        f"p99={percentile(values_ms, 99):7.3f}ms "
+        f"max={max(values_ms):7.3f}ms"
+    )
+
+def reset(r, queue):
+    keys = list(r.scan_iter(match="{" + queue + "}*", count=1000))
+    if keys:
+        r.delete(*keys)
+
+def reserve_call_latency(omniq, r, queue, jobs, promote_max):
+    reset(r, queue)
+    omniq.publish_many(queue=queue, jobs=[{"payload": {"i": i}} for i in range(jobs)], chunk_size=1000)
+
+    out = []
+    while True:
+        t0 = time.perf_counter()
+        res = omniq.reserve(queue=queue, promote_max=promote_max)
+        out.append((time.perf_counter() - t0) * 1000.0)
+        if res is None:
+            break
+        omniq.ack_success(queue=queue, job_id=res.job_id, lease_token=res.lease_token)
+    return out
+
+def due_pickup_delay(omniq, r, queue, jobs, promote_max, promote_interval_s):
+    reset(r, queue)
+    base_due = now_ms() + 200
+    omniq.publish_many(
+        queue=queue,
+        jobs=[{"payload": {"due": base_due + i}, "due_ms": base_due + i} for i in range(jobs)],
+        chunk_size=1000,
+    )
+
+    out = []
+    last_promote = 0.0
+    while len(out) < jobs:
+        if promote_max <= 0 and time.time() - last_promote >= promote_interval_s:
+            omniq.promote_delayed(queue=queue)
+            last_promote = time.time()
+
+        res = omniq.reserve(queue=queue, promote_max=promote_max)
+        if res is None:
+            time.sleep(0.001)
+            continue
+
+        due = json.loads(res.payload)["due"]
+        out.append(float(max(0, now_ms() - due)))
+        omniq.ack_success(queue=queue, job_id=res.job_id, lease_token=res.lease_token)
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="reserve latency with and without inline promotion")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--queue", default="bench-inline-promote")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--due-jobs", type=int, default=200)
+    parser.add_argument("--promote-max", type=int, default=10)
+    parser.add_argument("--promote-interval-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    omniq = OmniqClient(host=args.host, port=args.port)
+    r = omniq.ops.r
+
+    report("reserve (no inline promote)", reserve_call_latency(omniq, r, args.queue, args.jobs, 0))
+    report(f"reserve (promote_max={args.promote_max})", reserve_call_latency(omniq, r, args.queue, args.jobs, args.promote_max))
+
+    report(
+        f"due->reserved (promote every {args.promote_interval_s}s)",
+        due_pickup_delay(omniq, r, args.queue, args.due_jobs, 0, args.promote_interval_s),
+    )
+    report(
+        f"due->reserved (promote_max={args.promote_max})",
+        due_pickup_delay(omniq, r, args.queue, args.due_jobs, args.promote_max, args.promote_interval_s),
+    )
+
+    reset(r, args.queue)
+    omniq.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
 from .client import OmniqClient
+from .async_client import AsyncOmniqClient
 from .consumer import consume
-from .types import JobCtx, PayloadT
+from .async_consumer import async_consume
+from .pool import consume_pool
+from .multi import consume_many
+from .types import BulkProgress, JobCtx, JobDefaults, PayloadT, PublishJob, RateLimit, RetentionPolicy
+from .codec import PayloadCodec, decode_payload
+from .backoff import IdleBackoff, FixedBackoff, DecorrelatedJitterBackoff
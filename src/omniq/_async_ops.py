@@ -0,0 +1,182 @@
+import asyncio
+import redis
+
+from dataclasses import dataclass, field
+from typing import Optional, Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from .types import BulkProgress, JobDefaults, PublishJob, RateLimit, RetentionPolicy, ReserveResult, ReserveBatchResult, AckFailResult, BatchAckSuccessResult, BatchAckFailResult, BatchHeartbeatResult, BatchRemoveResult, BatchRetryFailedResult, MaintenanceResult
+from ._ops import _OpsPlans, _Eval, _Pipe, _Scan, Plan, T
+
+@dataclass
+class AsyncOmniqOps(_OpsPlans):
+    _script_lock: Optional[asyncio.Lock] = field(default=None, init=False, repr=False)
+
+    async def _evalsha_with_noscript_fallback(
+        self,
+        sha: str,
+        src: str,
+        numkeys: int,
+        *keys_and_args: Any,
+    ):
+        try:
+            return await self.r.evalsha(sha, numkeys, *keys_and_args)
+        except redis.exceptions.NoScriptError:
+            if self._script_lock is None:
+                self._script_lock = asyncio.Lock()
+            async with self._script_lock:
+                try:
+                    return await self.r.evalsha(sha, numkeys, *keys_and_args)
+                except redis.exceptions.NoScriptError:
+                    new_sha = await self.r.script_load(src)
+                    return await self.r.evalsha(new_sha, numkeys, *keys_and_args)
+
+    async def _request(self, req: Any) -> Any:
+        if isinstance(req, _Eval):
+            return await self._evalsha_with_noscript_fallback(req.script.sha, req.script.src, 1, req.anchor, *req.argv)
+        if isinstance(req, _Pipe):
+            async with self.r.pipeline(transaction=False) as p:
+                for c in req.calls:
+                    getattr(p, c.cmd)(*c.args, **c.kwargs)
+                return await p.execute()
+        if isinstance(req, _Scan):
+            return [k async for k in self.r.scan_iter(match=req.match, count=1000)]
+        return await getattr(self.r, req.cmd)(*req.args, **req.kwargs)
+
+    async def _run(self, plan: Plan[T]) -> T:
+        reply: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            try:
+                req = plan.throw(error) if error is not None else plan.send(reply)
+            except StopIteration as done:
+                return done.value
+            try:
+                reply, error = await self._request(req), None
+            except asyncio.CancelledError:
+                plan.close()
+                raise
+            except Exception as e:
+                reply, error = None, e
+
+    async def publish(self, *, queue: str, payload: Any, job_id: Optional[str] = None, max_attempts: Optional[int] = None, timeout_ms: Optional[int] = None, backoff_ms: Optional[int] = None, due_ms: int = 0, now_ms_override: int = 0, gid: Optional[str] = None, group_limit: int = 0, priority: int = 0) -> str:
+        return await self._run(self._publish(queue=queue, payload=payload, job_id=job_id, max_attempts=max_attempts, timeout_ms=timeout_ms, backoff_ms=backoff_ms, due_ms=due_ms, now_ms_override=now_ms_override, gid=gid, group_limit=group_limit, priority=priority))
+
+    async def publish_many(self, *, queue: str, jobs: Sequence[Union[PublishJob, Dict[str, Any]]], max_attempts: Optional[int] = None, timeout_ms: Optional[int] = None, backoff_ms: Optional[int] = None, chunk_size: int = 100, now_ms_override: int = 0) -> List[str]:
+        return await self._run(self._publish_many(queue=queue, jobs=jobs, max_attempts=max_attempts, timeout_ms=timeout_ms, backoff_ms=backoff_ms, chunk_size=chunk_size, now_ms_override=now_ms_override))
+
+    async def pause(self, *, queue: str) -> str:
+        return await self._run(self._pause(queue=queue))
+
+    async def resume(self, *, queue: str) -> int:
+        return await self._run(self._resume(queue=queue))
+
+    async def is_paused(self, *, queue: str) -> bool:
+        return await self._run(self._is_paused(queue=queue))
+
+    async def wait_for_jobs(self, *, queue: str, timeout_s: float) -> bool:
+        return await self._run(self._wait_for_jobs(queue=queue, timeout_s=timeout_s))
+
+    async def wait_for_any(self, *, queues: Sequence[str], timeout_s: float) -> Optional[str]:
+        return await self._run(self._wait_for_any(queues=queues, timeout_s=timeout_s))
+
+    async def reserve(self, *, queue: str, now_ms_override: int = 0, promote_max: int = 0) -> ReserveResult:
+        return await self._run(self._reserve(queue=queue, now_ms_override=now_ms_override, promote_max=promote_max))
+
+    async def reserve_batch(self, *, queue: str, max_jobs: int, now_ms_override: int = 0, promote_max: int = 0) -> ReserveBatchResult:
+        return await self._run(self._reserve_batch(queue=queue, max_jobs=max_jobs, now_ms_override=now_ms_override, promote_max=promote_max))
+
+    async def heartbeat(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> int:
+        return await self._run(self._heartbeat(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override))
+
+    async def heartbeat_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchHeartbeatResult:
+        return await self._run(self._heartbeat_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override))
+
+    async def ack_success(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> None:
+        return await self._run(self._ack_success(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override))
+
+    async def ack_fail(self, *, queue: str, job_id: str, lease_token: str, error: Optional[str] = None, now_ms_override: int = 0) -> AckFailResult:
+        return await self._run(self._ack_fail(queue=queue, job_id=job_id, lease_token=lease_token, error=error, now_ms_override=now_ms_override))
+
+    async def ack_success_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchAckSuccessResult:
+        return await self._run(self._ack_success_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override))
+
+    async def ack_fail_batch(self, *, queue: str, jobs: Sequence[Tuple[str, ...]], now_ms_override: int = 0) -> BatchAckFailResult:
+        return await self._run(self._ack_fail_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override))
+
+    async def promote_delayed(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> int:
+        return await self._run(self._promote_delayed(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override))
+
+    async def promote_delayed_next(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        return await self._run(self._promote_delayed_next(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override))
+
+    async def reap_expired(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> int:
+        return await self._run(self._reap_expired(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override))
+
+    async def reap_expired_next(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        return await self._run(self._reap_expired_next(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override))
+
+    async def next_maintenance_ms(self, *, queue: str) -> Optional[int]:
+        return await self._run(self._next_maintenance_ms(queue=queue))
+
+    async def leader_acquire(self, *, queue: str, owner: str, lease_ms: int) -> bool:
+        return await self._run(self._leader_acquire(queue=queue, owner=owner, lease_ms=lease_ms))
+
+    async def leader_release(self, *, queue: str, owner: str) -> bool:
+        return await self._run(self._leader_release(queue=queue, owner=owner))
+
+    async def rebuild_stats(self, *, queue: str) -> None:
+        return await self._run(self._rebuild_stats(queue=queue))
+
+    async def set_retention(self, *, queue: str, policy: RetentionPolicy) -> None:
+        return await self._run(self._set_retention(queue=queue, policy=policy))
+
+    async def get_retention(self, *, queue: str) -> RetentionPolicy:
+        return await self._run(self._get_retention(queue=queue))
+
+    async def sweep_retention(self, *, queue: str, max_sweep: int = 1000, now_ms_override: int = 0) -> int:
+        return await self._run(self._sweep_retention(queue=queue, max_sweep=max_sweep, now_ms_override=now_ms_override))
+
+    async def set_job_defaults(self, *, queue: str, defaults: JobDefaults) -> None:
+        return await self._run(self._set_job_defaults(queue=queue, defaults=defaults))
+
+    async def get_job_defaults(self, *, queue: str) -> JobDefaults:
+        return await self._run(self._get_job_defaults(queue=queue))
+
+    async def set_priority_fairness(self, *, queue: str, fair_every: int) -> None:
+        return await self._run(self._set_priority_fairness(queue=queue, fair_every=fair_every))
+
+    async def get_priority_fairness(self, *, queue: str) -> int:
+        return await self._run(self._get_priority_fairness(queue=queue))
+
+    async def set_rate_limit(self, *, queue: str, limit: RateLimit, gid: Optional[str] = None, now_ms_override: int = 0) -> None:
+        return await self._run(self._set_rate_limit(queue=queue, limit=limit, gid=gid, now_ms_override=now_ms_override))
+
+    async def get_rate_limit(self, *, queue: str, gid: Optional[str] = None) -> Optional[RateLimit]:
+        return await self._run(self._get_rate_limit(queue=queue, gid=gid))
+
+    async def job_timeout_ms(self, *, queue: str, job_id: str, default_ms: int = 60000) -> int:
+        return await self._run(self._job_timeout_ms(queue=queue, job_id=job_id, default_ms=default_ms))
+
+    async def retry_failed(self, *, queue: str, job_id: str, now_ms_override: int = 0) -> None:
+        return await self._run(self._retry_failed(queue=queue, job_id=job_id, now_ms_override=now_ms_override))
+
+    async def retry_failed_batch(self, *, queue: str, job_ids: List[str], now_ms_override: int = 0) -> BatchRetryFailedResult:
+        return await self._run(self._retry_failed_batch(queue=queue, job_ids=job_ids, now_ms_override=now_ms_override))
+
+    async def retry_all_failed(self, *, queue: str, gid: str = "", error_contains: str = "", chunk: int = 1000, cursor: int = 0, max_chunks: int = 0, on_progress: Optional[Callable[[BulkProgress], None]] = None, now_ms_override: int = 0) -> BulkProgress:
+        return await self._run(self._retry_all_failed(queue=queue, gid=gid, error_contains=error_contains, chunk=chunk, cursor=cursor, max_chunks=max_chunks, on_progress=on_progress, now_ms_override=now_ms_override))
+
+    async def purge_lane(self, *, queue: str, lane: str, older_than_ms: int = 0, chunk: int = 1000, max_chunks: int = 0, on_progress: Optional[Callable[[BulkProgress], None]] = None, now_ms_override: int = 0) -> BulkProgress:
+        return await self._run(self._purge_lane(queue=queue, lane=lane, older_than_ms=older_than_ms, chunk=chunk, max_chunks=max_chunks, on_progress=on_progress, now_ms_override=now_ms_override))
+
+    async def remove_job(self, *, queue: str, job_id: str, lane: str) -> str:
+        return await self._run(self._remove_job(queue=queue, job_id=job_id, lane=lane))
+
+    async def remove_jobs_batch(self, *, queue: str, lane: str, job_ids: List[str]) -> BatchRemoveResult:
+        return await self._run(self._remove_jobs_batch(queue=queue, lane=lane, job_ids=job_ids))
+
+    async def childs_init(self, *, key: str, expected: int) -> None:
+        return await self._run(self._childs_init(key=key, expected=expected))
+
+    async def child_ack(self, *, key: str, child_id: str) -> int:
+        return await self._run(self._child_ack(key=key, child_id=child_id))
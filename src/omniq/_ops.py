@@ -1,215 +1,838 @@
-import json
 import redis
+import redis.crc
 
-from dataclasses import dataclass
-from typing import Optional, Any, List, ClassVar
+import itertools
+import time
+
+from dataclasses import dataclass, field, replace
+from typing import Optional, Any, Callable, Dict, Generator, Iterator, List, ClassVar, Sequence, Tuple, TypeVar, Union
 from threading import Lock
 
 from .clock import now_ms
 from .ids import new_ulid
-from .types import ReservePaused, ReserveJob, ReserveResult, AckFailResult, BatchRemoveResult, BatchRetryFailedResult
-from .transport import RedisLike
-from .scripts import OmniqScripts
-from .helper import queue_base, queue_anchor, childs_anchor
+from .types import BulkProgress, JobDefaults, PublishJob, RateLimit, RetentionPolicy, ReservePaused, ReserveThrottled, ReserveJob, ReserveResult, ReserveBatchResult, AckFailResult, BatchAckSuccessResult, BatchAckFailResult, BatchHeartbeatResult, BatchRemoveResult, BatchRetryFailedResult, MaintenanceResult
+from .transport import RedisLike, is_cluster_client
+from .codec import PayloadCodec, encode_payload
+from .scripts import OmniqScripts, ScriptDef
+from .helper import queue_base, queue_anchor, childs_anchor, queue_partitions, shard_for_gid, check_priority
+
+def _opt_arg(v: Optional[int]) -> str:
+    return "" if v is None else str(int(v))
+
+def _priority_arg(name: str, priority: int, gid: str) -> str:
+    priority = check_priority(priority)
+    if priority and gid:
+        raise ValueError(f"{name} priority applies to jobs without a gid (groups are served in their own order)")
+    return str(priority)
+
+def _publish_argv(
+    *,
+    payload: Any,
+    job_id: Optional[str],
+    max_attempts: Optional[int],
+    timeout_ms: Optional[int],
+    backoff_ms: Optional[int],
+    due_ms: int,
+    nms: int,
+    gid: Optional[str],
+    group_limit: int,
+    priority: int = 0,
+    codec: Optional[PayloadCodec] = None,
+) -> List[str]:
+    if not isinstance(payload, (dict, list)):
+        raise TypeError(
+            "publish(payload=...) must be a dict or list (structured JSON). "
+            "Wrap strings as {'text': '...'} or {'value': '...'}."
+        )
+
+    jid = job_id or new_ulid()
+
+    payload_s = encode_payload(payload, codec)
+
+    gid_s = (gid or "").strip()
+    glimit_s = str(int(group_limit)) if group_limit and group_limit > 0 else "0"
+
+    return [
+        jid,
+        payload_s,
+        _opt_arg(max_attempts),
+        _opt_arg(timeout_ms),
+        _opt_arg(backoff_ms),
+        str(int(nms)),
+        str(int(due_ms)),
+        gid_s,
+        glimit_s,
+        _priority_arg("publish", priority, gid_s),
+    ]
+
+def _parse_publish(res: Any) -> str:
+    if not isinstance(res, list) or len(res) < 2:
+        raise RuntimeError(f"Unexpected ENQUEUE response: {res}")
+
+    status = str(res[0])
+    out_id = str(res[1])
+
+    if status == "ERR":
+        raise RuntimeError(f"ENQUEUE failed: {out_id}")
+
+    if status != "OK":
+        raise RuntimeError(f"ENQUEUE failed: {status}")
+
+    return out_id
+
+def _publish_many_rows(
+    jobs: Sequence[Union[PublishJob, Dict[str, Any]]],
+    *,
+    max_attempts: Optional[int],
+    timeout_ms: Optional[int],
+    backoff_ms: Optional[int],
+    codec: Optional[PayloadCodec] = None,
+) -> List[List[str]]:
+    rows: List[List[str]] = []
+    seen: Dict[str, int] = {}
+    for i, job in enumerate(jobs):
+        if isinstance(job, dict):
+            job = PublishJob(**job)
+        elif not isinstance(job, PublishJob):
+            raise TypeError(f"publish_many(jobs[{i}]) must be a PublishJob or dict")
+
+        if not isinstance(job.payload, (dict, list)):
+            raise TypeError(
+                f"publish_many(jobs[{i}].payload=...) must be a dict or list (structured JSON). "
+                "Wrap strings as {'text': '...'} or {'value': '...'}."
+            )
+
+        ma = job.max_attempts if job.max_attempts is not None else max_attempts
+        tm = job.timeout_ms if job.timeout_ms is not None else timeout_ms
+        bo = job.backoff_ms if job.backoff_ms is not None else backoff_ms
+        gl = job.group_limit
+        gid_s = (job.gid or "").strip()
+
+        # checked for the whole call: chunks of a sharded queue go to different partitions
+        jid = job.job_id or new_ulid()
+        if jid in seen:
+            raise ValueError(f"publish_many(jobs[{i}]) repeats job_id {jid!r} of jobs[{seen[jid]}]")
+        seen[jid] = i
+
+        rows.append([
+            jid,
+            encode_payload(job.payload, codec),
+            _opt_arg(ma),
+            _opt_arg(tm),
+            _opt_arg(bo),
+            str(int(job.due_ms or 0)),
+            gid_s,
+            str(int(gl)) if gl and gl > 0 else "0",
+            _priority_arg(f"publish_many(jobs[{i}])", job.priority, gid_s),
+        ])
+    return rows
+
+def _publish_many_argv(chunk: List[List[str]], nms: int) -> List[str]:
+    argv: list[str] = [str(int(nms)), str(len(chunk))]
+    for row in chunk:
+        argv.extend(row)
+    return argv
+
+def _parse_publish_many(res: Any, expected: int) -> List[str]:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected ENQUEUE_BATCH response: {res}")
+
+    if res[0] == "ERR":
+        reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
+        extra = str(res[2]) if len(res) > 2 else ""
+        raise RuntimeError(f"ENQUEUE_BATCH failed: {reason} {extra}".strip())
+
+    if res[0] != "OK" or len(res) - 1 != expected:
+        raise RuntimeError(f"Unexpected ENQUEUE_BATCH response: {res}")
+
+    return [str(j) for j in res[1:]]
+
+def _partitions(shards: Dict[str, int], queue: str) -> List[str]:
+    return queue_partitions(queue, shards.get(queue, 1))
+
+def _route(parts: List[str], gid: Optional[str], rr: Iterator[int]) -> str:
+    if len(parts) == 1:
+        return parts[0]
+    gid_s = (gid or "").strip()
+    if gid_s:
+        return parts[shard_for_gid(gid_s, len(parts))]
+    return parts[next(rr) % len(parts)]
+
+_WAIT_SLICE_S = 0.05
+
+def _slot_groups(keys: List[str]) -> List[List[str]]:
+    groups: Dict[int, List[str]] = {}
+    for key in keys:
+        groups.setdefault(redis.crc.key_slot(key.encode("utf-8")), []).append(key)
+    return list(groups.values())
+
+def _group_parts(located: Sequence[str]) -> Dict[str, List[int]]:
+    out: Dict[str, List[int]] = {}
+    for i, part in enumerate(located):
+        out.setdefault(part, []).append(i)
+    return out
+
+# bulk cursors on a sharded queue carry the partition index above the in-partition cursor
+_PART_CURSOR = 1 << 40
+
+def _split_cursor(parts: List[str], cursor: int) -> Tuple[int, int]:
+    if len(parts) == 1:
+        return 0, int(cursor)
+    i, offset = divmod(int(cursor), _PART_CURSOR)
+    if i >= len(parts):
+        raise ValueError(f"cursor {cursor} does not belong to a partition of this queue")
+    return i, offset
+
+def _shard_rows(rows: List[List[str]], parts: List[str], rr: Iterator[int], chunk_size: int) -> Dict[str, List[int]]:
+    if len(parts) == 1:
+        return {parts[0]: list(range(len(rows)))}
+
+    start = next(rr)
+    plain = 0
+    out: Dict[str, List[int]] = {}
+    for i, row in enumerate(rows):
+        gid = row[6]
+        if gid:
+            part = parts[shard_for_gid(gid, len(parts))]
+        else:
+            # jobs without a gid rotate a chunk at a time, so each chunk is still one script call
+            part = parts[(start + plain // chunk_size) % len(parts)]
+            plain += 1
+        out.setdefault(part, []).append(i)
+    return out
+
+def _check_chunk_size(chunk_size: int) -> int:
+    chunk_size = int(chunk_size)
+    if chunk_size <= 0 or chunk_size > 1000:
+        raise ValueError("publish_many chunk_size must be between 1 and 1000")
+    return chunk_size
+
+def _parse_resume(res: Any) -> int:
+    try:
+        return int(res)
+    except Exception:
+        return 0
+
+def _reserve_continues(res: Any) -> bool:
+    # the script skipped a long run of stale (removed / retried) ids and stopped early; more work may follow
+    return isinstance(res, list) and len(res) >= 1 and res[0] == "CONTINUE"
+
+def _parse_reserve(res: Any) -> ReserveResult:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected RESERVE response: {res}")
+
+    if res[0] == "EMPTY":
+        return None
+
+    if res[0] == "PAUSED":
+        return ReservePaused()
+
+    if res[0] == "THROTTLED":
+        return ReserveThrottled(retry_in_ms=int(res[1]))
+
+    if res[0] != "JOB" or len(res) < 7:
+        raise RuntimeError(f"Unexpected RESERVE response: {res}")
+
+    return ReserveJob(
+        status="JOB",
+        job_id=str(res[1]),
+        payload=str(res[2]),
+        lock_until_ms=int(res[3]),
+        attempt=int(res[4]),
+        gid=str(res[5] or ""),
+        lease_token=str(res[6] or ""),
+    )
+
+def _check_reserve_batch(max_jobs: int) -> None:
+    if max_jobs <= 0:
+        raise ValueError("reserve_batch max_jobs must be > 0")
+    if max_jobs > 100:
+        raise ValueError("reserve_batch max is 100 jobs per call")
+
+def _parse_reserve_batch(res: Any) -> ReserveBatchResult:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected RESERVE_BATCH response: {res}")
+
+    if res[0] == "EMPTY":
+        return []
+
+    if res[0] == "PAUSED":
+        return ReservePaused()
+
+    if res[0] == "THROTTLED":
+        return ReserveThrottled(retry_in_ms=int(res[1]))
+
+    if res[0] == "ERR":
+        reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
+        extra = str(res[2]) if len(res) > 2 else ""
+        raise RuntimeError(f"RESERVE_BATCH failed: {reason} {extra}".strip())
+
+    if res[0] != "JOBS" or (len(res) - 1) % 6 != 0:
+        raise RuntimeError(f"Unexpected RESERVE_BATCH response: {res}")
+
+    out: List[ReserveJob] = []
+    i = 1
+    while i < len(res):
+        out.append(
+            ReserveJob(
+                status="JOB",
+                job_id=str(res[i]),
+                payload=str(res[i + 1]),
+                lock_until_ms=int(res[i + 2]),
+                attempt=int(res[i + 3]),
+                gid=str(res[i + 4] or ""),
+                lease_token=str(res[i + 5] or ""),
+            )
+        )
+        i += 6
+    return out
+
+def _parse_ok(name: str, res: Any) -> None:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected {name} response: {res}")
+
+    if res[0] == "OK":
+        return
+
+    if res[0] == "ERR":
+        reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
+        raise RuntimeError(f"{name} failed: {reason}")
+
+    raise RuntimeError(f"Unexpected {name} response: {res}")
+
+def _parse_heartbeat(res: Any) -> int:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected HEARTBEAT response: {res}")
+
+    if res[0] == "OK":
+        return int(res[1])
+
+    if res[0] == "ERR":
+        reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
+        raise RuntimeError(f"HEARTBEAT failed: {reason}")
+
+    raise RuntimeError(f"Unexpected HEARTBEAT response: {res}")
+
+def _ack_fail_argv(job_id: str, nms: int, lease_token: str, error: Optional[str]) -> List[str]:
+    if error is None or str(error).strip() == "":
+        return [job_id, str(int(nms)), lease_token]
+    return [job_id, str(int(nms)), lease_token, str(error)]
+
+def _parse_ack_fail(res: Any) -> AckFailResult:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected ACK_FAIL response: {res}")
+
+    if res[0] == "RETRY":
+        return ("RETRY", int(res[1]))
+
+    if res[0] == "FAILED":
+        return ("FAILED", None)
+
+    if res[0] == "ERR":
+        reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
+        raise RuntimeError(f"ACK_FAIL failed: {reason}")
+
+    raise RuntimeError(f"Unexpected ACK_FAIL response: {res}")
+
+def _check_batch(name: str, n: int, what: str = "job_ids") -> None:
+    if n > 100:
+        raise ValueError(f"{name} max is 100 {what} per call")
+
+def _ack_success_batch_argv(jobs: Sequence[Tuple[str, str]], nms: int) -> List[str]:
+    argv: list[str] = [str(int(nms)), str(len(jobs))]
+    for job_id, lease_token in jobs:
+        argv.extend([str(job_id), str(lease_token or "")])
+    return argv
+
+def _ack_fail_batch_argv(jobs: Sequence[Tuple[str, ...]], nms: int) -> List[str]:
+    argv: list[str] = [str(int(nms)), str(len(jobs))]
+    for job in jobs:
+        if len(job) < 2:
+            raise ValueError("ack_fail_batch jobs must be (job_id, lease_token[, error]) tuples")
+        error = job[2] if len(job) > 2 else None
+        err_s = "" if error is None else str(error)
+        argv.extend([str(job[0]), str(job[1] or ""), err_s])
+    return argv
+
+def _raise_batch_err(name: str, res: Any) -> None:
+    if not isinstance(res, list):
+        raise RuntimeError(f"Unexpected {name} response: {res}")
+
+    if len(res) >= 2 and str(res[0]) == "ERR":
+        reason = str(res[1])
+        extra = str(res[2]) if len(res) > 2 else ""
+        raise RuntimeError(f"{name} failed: {reason} {extra}".strip())
+
+def _parse_batch(name: str, res: Any) -> List[Tuple[str, str, Optional[str]]]:
+    _raise_batch_err(name, res)
+
+    out: List[Tuple[str, str, Optional[str]]] = []
+    i = 0
+    while i < len(res):
+        job_id = str(res[i] or "")
+        status = str(res[i + 1] or "")
+        reason: Optional[str] = None
+        if status == "ERR":
+            reason = str(res[i + 2] or "UNKNOWN")
+            i += 3
+        else:
+            i += 2
+        out.append((job_id, status, reason))
+    return out
+
+def _parse_ack_fail_batch(res: Any) -> BatchAckFailResult:
+    _raise_batch_err("ACK_FAIL_BATCH", res)
+
+    out: BatchAckFailResult = []
+    i = 0
+    while i < len(res):
+        job_id = str(res[i] or "")
+        status = str(res[i + 1] or "")
+        if status == "RETRY":
+            out.append((job_id, status, int(res[i + 2])))
+            i += 3
+        elif status == "ERR":
+            out.append((job_id, status, str(res[i + 2] or "UNKNOWN")))
+            i += 3
+        else:
+            out.append((job_id, status, None))
+            i += 2
+    return out
+
+def _parse_heartbeat_batch(res: Any) -> BatchHeartbeatResult:
+    _raise_batch_err("HEARTBEAT_BATCH", res)
+
+    out: BatchHeartbeatResult = []
+    for i in range(0, len(res) - 2, 3):
+        job_id = str(res[i] or "")
+        status = str(res[i + 1] or "")
+        if status == "OK":
+            out.append((job_id, status, int(res[i + 2])))
+        else:
+            out.append((job_id, status, str(res[i + 2] or "UNKNOWN")))
+    return out
+
+def _parse_count(name: str, res: Any) -> int:
+    if isinstance(res, list) and len(res) >= 2 and res[0] == "ERR":
+        raise RuntimeError(f"{name} failed: {res[1]}")
+
+    if not isinstance(res, list) or len(res) < 2 or res[0] != "OK":
+        raise RuntimeError(f"Unexpected {name} response: {res}")
+
+    return int(res[1])
+
+def _parse_count_next(name: str, res: Any) -> Tuple[int, Optional[int]]:
+    n = _parse_count(name, res)
+    nxt = res[2] if len(res) > 2 else None
+    if nxt is None or nxt == "":
+        return n, None
+    return n, int(float(nxt))
+
+def _group_ids(base: str, keys: Sequence[Any]) -> List[str]:
+    prefix = base + ":g:"
+    out: List[str] = []
+    for k in keys:
+        k_s = k.decode("utf-8", errors="replace") if isinstance(k, (bytes, bytearray)) else str(k)
+        if k_s.startswith(prefix) and k_s.endswith(":wait"):
+            out.append(k_s[len(prefix):-len(":wait")])
+    return out
+
+def _check_bulk_chunk(name: str, chunk: int) -> int:
+    chunk = int(chunk)
+    if chunk <= 0:
+        raise ValueError(f"{name} chunk must be > 0")
+    if chunk > 1000:
+        raise ValueError(f"{name} max chunk is 1000")
+    return chunk
+
+def _check_purge_lane(lane: str) -> None:
+    if lane not in ("failed", "completed"):
+        raise ValueError("purge_lane lane must be 'failed' or 'completed'")
+
+def _parse_bulk(name: str, res: Any, total: int) -> BulkProgress:
+    _raise_batch_err(name, res)
+
+    if len(res) < 5 or res[0] != "OK":
+        raise RuntimeError(f"Unexpected {name} response: {res}")
+
+    processed = int(res[1])
+    return BulkProgress(
+        processed=processed,
+        scanned=int(res[2]),
+        cursor=int(res[3]),
+        done=str(res[4]) == "1",
+        total=total + processed,
+    )
+
+def _retention_argv(policy: RetentionPolicy) -> List[str]:
+    values = (policy.completed_keep, policy.completed_max_age_ms, policy.failed_keep, policy.failed_max_age_ms)
+    if any(int(v) < 0 for v in values):
+        raise ValueError("set_retention values must be >= 0 (0 disables the limit)")
+    return [str(int(v)) for v in values]
+
+def _parse_retention(row: Sequence[Any]) -> RetentionPolicy:
+    default = RetentionPolicy()
+    completed_keep, completed_max_age_ms, failed_keep, failed_max_age_ms = (None if v is None else int(v) for v in row)
+    return RetentionPolicy(
+        completed_keep=default.completed_keep if completed_keep is None else completed_keep,
+        completed_max_age_ms=completed_max_age_ms or 0,
+        failed_keep=failed_keep or 0,
+        failed_max_age_ms=failed_max_age_ms or 0,
+    )
+
+JOB_DEFAULT_FIELDS = ("max_attempts", "timeout_ms", "backoff_ms")
+
+def _job_defaults_argv(defaults: JobDefaults) -> List[str]:
+    if int(defaults.max_attempts) < 1 or int(defaults.timeout_ms) < 1 or int(defaults.backoff_ms) < 0:
+        raise ValueError("set_job_defaults requires max_attempts >= 1, timeout_ms >= 1, backoff_ms >= 0")
+    return [str(int(defaults.max_attempts)), str(int(defaults.timeout_ms)), str(int(defaults.backoff_ms))]
+
+def _parse_job_defaults(row: Sequence[Any]) -> JobDefaults:
+    default = JobDefaults()
+    max_attempts, timeout_ms, backoff_ms = row
+    return JobDefaults(
+        max_attempts=default.max_attempts if max_attempts is None else int(max_attempts),
+        timeout_ms=default.timeout_ms if timeout_ms is None else int(timeout_ms),
+        backoff_ms=default.backoff_ms if backoff_ms is None else int(backoff_ms),
+    )
+
+def _priority_fairness_argv(fair_every: int) -> List[str]:
+    if int(fair_every) < 0:
+        raise ValueError("set_priority_fairness requires fair_every >= 0 (0 drains strictly by priority)")
+    return [str(int(fair_every))]
+
+def _rate_key(queue: str, gid: str) -> str:
+    if gid:
+        return queue_base(queue) + ":g:" + gid + ":rate"
+    return queue_base(queue) + ":rate"
+
+def _rate_limit_argv(gid: str, limit: RateLimit, shares: int, share: int, nms: int) -> List[str]:
+    if float(limit.rate_per_s) < 0 or int(limit.burst) < 1:
+        raise ValueError("set_rate_limit requires rate_per_s >= 0 (0 removes the limit) and burst >= 1")
+    # split burst like the rate; every partition needs a whole token, so a burst below the partition count becomes 1 each
+    burst = int(limit.burst)
+    part_burst = max(1, burst // shares + (1 if share < burst % shares else 0))
+    return [gid, repr(float(limit.rate_per_s) / shares), str(part_burst), str(int(nms))]
+
+def _parse_rate_limit(rows: Sequence[Sequence[Any]]) -> Optional[RateLimit]:
+    if any(rate_per_s is None for rate_per_s, _ in rows):
+        return None
+    return RateLimit(
+        rate_per_s=sum(float(rate_per_s) for rate_per_s, _ in rows),
+        burst=sum(int(burst or 1) for _, burst in rows),
+    )
+
+def _parse_next_due(rows: Sequence[Any]) -> Optional[int]:
+    due: Optional[int] = None
+    for row in rows:
+        if not row:
+            continue
+        score = int(float(row[0][1]))
+        if due is None or score < due:
+            due = score
+    return due
+
+def _parse_timeout_ms(v: Any, default_ms: int) -> int:
+    try:
+        n = int(v) if v is not None and v != "" else 0
+    except Exception:
+        n = 0
+    return n if n > 0 else int(default_ms)
+
+def _parse_remove_job(res: Any) -> str:
+    if not isinstance(res, list) or len(res) < 1:
+        raise RuntimeError(f"Unexpected REMOVE_JOB response: {res}")
+
+    if res[0] == "OK":
+        return str(res[0] or "")
+
+    if res[0] == "ERR":
+        reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
+        raise RuntimeError(f"REMOVE_JOB failed: {reason}")
+
+    raise RuntimeError(f"Unexpected REMOVE_JOB response: {res}")
+
+def _child_id(child_id: str) -> str:
+    cid = (str(child_id) if child_id is not None else "").strip()
+    if not cid:
+        raise ValueError("child_ack child_id is required")
+    return cid
+
+def _parse_child_ack(res: Any) -> int:
+    try:
+        if not isinstance(res, list) or len(res) < 1:
+            return -1
+
+        if res[0] == "OK":
+            if len(res) < 2:
+                return -1
+            try:
+                return int(res[1])
+            except Exception:
+                return -1
+
+        if res[0] == "ERR":
+            return -1
+
+        return -1
+    except Exception:
+        return -1
+
+@dataclass(frozen=True)
+class _Eval:
+    script: ScriptDef
+    anchor: str
+    argv: Sequence[str] = ()
+
+@dataclass(frozen=True)
+class _Call:
+    cmd: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class _Pipe:
+    calls: Sequence[_Call]
+
+@dataclass(frozen=True)
+class _Scan:
+    match: str
+
+# each op is written once, as a generator that yields the _Eval / _Call / _Pipe / _Scan requests it needs
+# and gets their replies back; OmniqOps runs it on a sync client, AsyncOmniqOps on a redis.asyncio one
+T = TypeVar("T")
+Plan = Generator[Any, Any, T]
 
 @dataclass
-class OmniqOps:
-    _script_lock: ClassVar[Lock] = Lock()
-    r: RedisLike
+class _OpsPlans:
+    r: Any
     scripts: OmniqScripts
+    codec: Optional[PayloadCodec] = None
+    shards: Dict[str, int] = field(default_factory=dict)
+    _rr: Iterator[int] = field(default_factory=itertools.count, init=False, repr=False)
+
+    def partitions(self, queue: str) -> List[str]:
+        return _partitions(self.shards, queue)
+
+    def _job_parts(self, queue: str, job_ids: Sequence[str]) -> Plan[List[str]]:
+        # jobs without a gid may be on any partition of a sharded queue; ids are unique, so the partition
+        # holding the job hash owns it (unknown ids go to the first one and fail there as usual)
+        parts = self.partitions(queue)
+        if len(parts) == 1:
+            return [parts[0]] * len(job_ids)
+
+        rows = yield _Pipe([_Call("exists", (queue_base(p) + ":job:" + str(j),)) for j in job_ids for p in parts])
+
+        out: List[str] = []
+        for i in range(len(job_ids)):
+            hits = rows[i * len(parts):(i + 1) * len(parts)]
+            out.append(next((p for p, hit in zip(parts, hits) if hit), parts[0]))
+        return out
 
-    def _evalsha_with_noscript_fallback(
+    def _bulk(
         self,
-        sha: str,
-        src: str,
-        numkeys: int,
-        *keys_and_args: Any,
-    ):
-        try:
-            return self.r.evalsha(sha, numkeys, *keys_and_args)
-        except redis.exceptions.NoScriptError:
-            with self._script_lock:
-                try:
-                    return self.r.evalsha(sha, numkeys, *keys_and_args)
-                except redis.exceptions.NoScriptError:
-                    new_sha = self.r.script_load(src)
-                    return self.r.evalsha(new_sha, numkeys, *keys_and_args)
-
-    def publish(
+        name: str,
+        script: ScriptDef,
+        parts: List[str],
+        argv: Callable[[int], List[str]],
+        cursor: int,
+        max_chunks: int,
+        on_progress: Optional[Callable[[BulkProgress], None]],
+    ) -> Plan[BulkProgress]:
+        # runs the partitions one after another; progress.done only once the last one is done
+        i, offset = _split_cursor(parts, cursor)
+
+        progress = BulkProgress(processed=0, scanned=0, cursor=int(cursor), done=False, total=0)
+        chunks = 0
+        while not progress.done and (max_chunks <= 0 or chunks < max_chunks):
+            res = yield _Eval(script, queue_anchor(parts[i]), argv(offset))
+            step = _parse_bulk(name, res, progress.total)
+            # an already empty partition does not use up max_chunks
+            if step.scanned or not step.done:
+                chunks += 1
+
+            offset = step.cursor
+            if step.done and i + 1 < len(parts):
+                i, offset = i + 1, 0
+                step = replace(step, done=False)
+
+            progress = replace(step, cursor=i * _PART_CURSOR + offset if len(parts) > 1 else offset)
+            if on_progress is not None:
+                on_progress(progress)
+
+        return progress
+
+    def _publish(
         self,
         *,
         queue: str,
         payload: Any,
         job_id: Optional[str] = None,
-        max_attempts: int = 3,
-        timeout_ms: int = 30_000,
-        backoff_ms: int = 5_000,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
         due_ms: int = 0,
         now_ms_override: int = 0,
         gid: Optional[str] = None,
         group_limit: int = 0,
-    ) -> str:
-        if not isinstance(payload, (dict, list)):
-            raise TypeError(
-                "publish(payload=...) must be a dict or list (structured JSON). "
-                "Wrap strings as {'text': '...'} or {'value': '...'}."
-            )
-
-        anchor = queue_anchor(queue)
+        priority: int = 0,
+    ) -> Plan[str]:
+        anchor = queue_anchor(_route(self.partitions(queue), gid, self._rr))
         nms = now_ms_override or now_ms()
 
-        jid = job_id or new_ulid()
+        argv = _publish_argv(
+            payload=payload,
+            job_id=job_id,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            due_ms=due_ms,
+            nms=nms,
+            gid=gid,
+            group_limit=group_limit,
+            priority=priority,
+            codec=self.codec,
+        )
 
-        payload_s = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+        res = yield _Eval(self.scripts.enqueue, anchor, argv)
 
-        gid_s = (gid or "").strip()
-        glimit_s = str(int(group_limit)) if group_limit and group_limit > 0 else "0"
+        return _parse_publish(res)
 
-        argv = [
-            jid,
-            payload_s,
-            str(int(max_attempts)),
-            str(int(timeout_ms)),
-            str(int(backoff_ms)),
-            str(int(nms)),
-            str(int(due_ms)),
-            gid_s,
-            glimit_s,
-        ]
-
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.enqueue.sha,
-            self.scripts.enqueue.src,
-            1,
-            anchor,
-            *argv,
+    def _publish_many(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Union[PublishJob, Dict[str, Any]]],
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        chunk_size: int = 100,
+        now_ms_override: int = 0,
+    ) -> Plan[List[str]]:
+        chunk_size = _check_chunk_size(chunk_size)
+
+        rows = _publish_many_rows(
+            jobs,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            codec=self.codec,
         )
-        
-        if not isinstance(res, list) or len(res) < 2:
-            raise RuntimeError(f"Unexpected ENQUEUE response: {res}")
 
-        status = str(res[0])
-        out_id = str(res[1])
+        out: List[str] = [""] * len(rows)
+        for part, idx in _shard_rows(rows, self.partitions(queue), self._rr, chunk_size).items():
+            anchor = queue_anchor(part)
 
-        if status != "OK":
-            raise RuntimeError(f"ENQUEUE failed: {status}")
+            for start in range(0, len(idx), chunk_size):
+                sel = idx[start:start + chunk_size]
+                chunk = [rows[i] for i in sel]
+                nms = now_ms_override or now_ms()
 
-        return out_id
+                res = yield _Eval(self.scripts.enqueue_batch, anchor, _publish_many_argv(chunk, nms))
 
-    def pause(self, *, queue: str) -> str:
-        anchor = queue_anchor(queue)
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.pause.sha,
-            self.scripts.pause.src,
-            1,
-            anchor
-        )
+                for i, jid in zip(sel, _parse_publish_many(res, len(chunk))):
+                    out[i] = jid
+
+        return out
+
+    def _pause(self, *, queue: str) -> Plan[str]:
+        res = None
+        for part in self.partitions(queue):
+            res = yield _Eval(self.scripts.pause, queue_anchor(part))
         return str(res)
 
-    def resume(self, *, queue: str) -> int:
-        anchor = queue_anchor(queue)
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.resume.sha,
-            self.scripts.resume.src,
-            1,
-            anchor
-        )
-        try:
-            return int(res)
-        except Exception:
-            return 0
+    def _resume(self, *, queue: str) -> Plan[int]:
+        resumed = []
+        for part in self.partitions(queue):
+            res = yield _Eval(self.scripts.resume, queue_anchor(part))
+            resumed.append(_parse_resume(res))
+        return -1 if min(resumed) < 0 else sum(resumed)
 
-    def is_paused(self, *, queue: str) -> bool:
-        base = queue_base(queue)
-        return self.r.exists(base + ":paused") == 1
+    def _is_paused(self, *, queue: str) -> Plan[bool]:
+        for part in self.partitions(queue):
+            if (yield _Call("exists", (queue_base(part) + ":paused",))) != 1:
+                return False
+        return True
 
-    def reserve(self, *, queue: str, now_ms_override: int = 0) -> ReserveResult:
+    def _wait_for_jobs(self, *, queue: str, timeout_s: float) -> Plan[bool]:
+        base = queue_base(queue)
+        return (yield _Call("blpop", ([base + ":notify"],), {"timeout": max(0.01, float(timeout_s))})) is not None
+
+    def _wait_for_any(self, *, queues: Sequence[str], timeout_s: float) -> Plan[Optional[str]]:
+        keys = {queue_base(q) + ":notify": q for q in queues}
+        groups = _slot_groups(list(keys)) if is_cluster_client(self.r) else [list(keys)]
+        if len(groups) == 1:
+            res = yield _Call("blpop", (groups[0],), {"timeout": max(0.01, float(timeout_s))})
+            return None if res is None else keys.get(str(res[0]))
+
+        # a cluster BLPOP cannot span slots: block on each slot in turn for a short slice
+        deadline = time.monotonic() + float(timeout_s)
+        while True:
+            for group in groups:
+                slice_s = min(_WAIT_SLICE_S, deadline - time.monotonic())
+                res = yield _Call("blpop", (group,), {"timeout": max(0.01, slice_s)})
+                if res is not None:
+                    return keys.get(str(res[0]))
+            if time.monotonic() >= deadline:
+                return None
+
+    def _reserve(self, *, queue: str, now_ms_override: int = 0, promote_max: int = 0) -> Plan[ReserveResult]:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.reserve.sha,
-            self.scripts.reserve.src,
-            1,
-            anchor,
-            str(int(nms)),
-        )
+        argv = [str(int(nms)), str(int(promote_max))]
+        res = yield _Eval(self.scripts.reserve, anchor, argv)
+        while _reserve_continues(res):
+            res = yield _Eval(self.scripts.reserve, anchor, argv)
 
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected RESERVE response: {res}")
+        return _parse_reserve(res)
 
-        if res[0] == "EMPTY":
-            return None
+    def _reserve_batch(self, *, queue: str, max_jobs: int, now_ms_override: int = 0, promote_max: int = 0) -> Plan[ReserveBatchResult]:
+        _check_reserve_batch(max_jobs)
 
-        if res[0] == "PAUSED":
-            return ReservePaused()
+        anchor = queue_anchor(queue)
+        nms = now_ms_override or now_ms()
 
-        if res[0] != "JOB" or len(res) < 7:
-            raise RuntimeError(f"Unexpected RESERVE response: {res}")
+        argv = [str(int(nms)), str(int(max_jobs)), str(int(promote_max))]
+        res = yield _Eval(self.scripts.reserve_batch, anchor, argv)
+        while _reserve_continues(res):
+            res = yield _Eval(self.scripts.reserve_batch, anchor, argv)
 
-        return ReserveJob(
-            status="JOB",
-            job_id=str(res[1]),
-            payload=str(res[2]),
-            lock_until_ms=int(res[3]),
-            attempt=int(res[4]),
-            gid=str(res[5] or ""),
-            lease_token=str(res[6] or ""),
-        )
+        return _parse_reserve_batch(res)
 
-    def heartbeat(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> int:
+    def _heartbeat(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> Plan[int]:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.heartbeat.sha,
-            self.scripts.heartbeat.src,
-            1,
-            anchor,
-            job_id,
-            str(int(nms)),
-            lease_token
-        )
-
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected HEARTBEAT response: {res}")
+        res = yield _Eval(self.scripts.heartbeat, anchor, [job_id, str(int(nms)), lease_token])
 
-        if res[0] == "OK":
-            return int(res[1])
+        return _parse_heartbeat(res)
 
-        if res[0] == "ERR":
-            reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
-            raise RuntimeError(f"HEARTBEAT failed: {reason}")
-
-        raise RuntimeError(f"Unexpected HEARTBEAT response: {res}")
+    def _heartbeat_batch(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Tuple[str, str]],
+        now_ms_override: int = 0,
+    ) -> Plan[BatchHeartbeatResult]:
+        _check_batch("heartbeat_batch", len(jobs), "jobs")
 
-    def ack_success(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> None:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.ack_success.sha,
-            self.scripts.ack_success.src,
-            1,
-            anchor,
-            job_id,
-            str(int(nms)),
-            lease_token
-        )
+        res = yield _Eval(self.scripts.heartbeat_batch, anchor, _ack_success_batch_argv(jobs, nms))
 
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected ACK_SUCCESS response: {res}")
+        return _parse_heartbeat_batch(res)
 
-        if res[0] == "OK":
-            return
+    def _ack_success(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> Plan[None]:
+        anchor = queue_anchor(queue)
+        nms = now_ms_override or now_ms()
 
-        if res[0] == "ERR":
-            reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
-            raise RuntimeError(f"ACK_SUCCESS failed: {reason}")
+        res = yield _Eval(self.scripts.ack_success, anchor, [job_id, str(int(nms)), lease_token])
 
-        raise RuntimeError(f"Unexpected ACK_SUCCESS response: {res}")
+        _parse_ok("ACK_SUCCESS", res)
 
-    def ack_fail(
+    def _ack_fail(
         self,
         *,
         queue: str,
@@ -217,292 +840,281 @@ class OmniqOps:
         lease_token: str,
         error: Optional[str] = None,
         now_ms_override: int = 0,
-    ) -> AckFailResult:
+    ) -> Plan[AckFailResult]:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        if error is None or str(error).strip() == "":
-            res = self._evalsha_with_noscript_fallback(
-                self.scripts.ack_fail.sha,
-                self.scripts.ack_fail.src,
-                1,
-                anchor,
-                job_id,
-                str(int(nms)),
-                lease_token
-            )
-        else:
-            err_s = str(error)
-            res = self._evalsha_with_noscript_fallback(
-                self.scripts.ack_fail.sha,
-                self.scripts.ack_fail.src,
-                1,
-                anchor,
-                job_id,
-                str(int(nms)),
-                lease_token,
-                err_s
-            )
+        res = yield _Eval(self.scripts.ack_fail, anchor, _ack_fail_argv(job_id, nms, lease_token, error))
 
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected ACK_FAIL response: {res}")
+        return _parse_ack_fail(res)
 
-        if res[0] == "RETRY":
-            return ("RETRY", int(res[1]))
+    def _ack_success_batch(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Tuple[str, str]],
+        now_ms_override: int = 0,
+    ) -> Plan[BatchAckSuccessResult]:
+        _check_batch("ack_success_batch", len(jobs), "jobs")
 
-        if res[0] == "FAILED":
-            return ("FAILED", None)
+        anchor = queue_anchor(queue)
+        nms = now_ms_override or now_ms()
 
-        if res[0] == "ERR":
-            reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
-            raise RuntimeError(f"ACK_FAIL failed: {reason}")
+        res = yield _Eval(self.scripts.ack_success_batch, anchor, _ack_success_batch_argv(jobs, nms))
 
-        raise RuntimeError(f"Unexpected ACK_FAIL response: {res}")
+        return _parse_batch("ACK_SUCCESS_BATCH", res)
+
+    def _ack_fail_batch(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Tuple[str, ...]],
+        now_ms_override: int = 0,
+    ) -> Plan[BatchAckFailResult]:
+        _check_batch("ack_fail_batch", len(jobs), "jobs")
 
-    def promote_delayed(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> int:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.promote_delayed.sha,
-            self.scripts.promote_delayed.src,
-            1,
-            anchor,
-            str(int(nms)),
-            str(int(max_promote))
-        )
+        res = yield _Eval(self.scripts.ack_fail_batch, anchor, _ack_fail_batch_argv(jobs, nms))
 
-        if not isinstance(res, list) or len(res) < 2 or res[0] != "OK":
-            raise RuntimeError(f"Unexpected PROMOTE_DELAYED response: {res}")
+        return _parse_ack_fail_batch(res)
 
-        return int(res[1])
+    def _promote_delayed(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> Plan[int]:
+        n, _ = yield from self._promote_delayed_next(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override)
+        return n
 
-    def reap_expired(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> int:
+    def _promote_delayed_next(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> Plan[MaintenanceResult]:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.reap_expired.sha,
-            self.scripts.reap_expired.src,
-            1,
-            anchor,
-            str(int(nms)),
-            str(int(max_reap))
-        )
+        res = yield _Eval(self.scripts.promote_delayed, anchor, [str(int(nms)), str(int(max_promote))])
 
-        if not isinstance(res, list) or len(res) < 2 or res[0] != "OK":
-            raise RuntimeError(f"Unexpected REAP_EXPIRED response: {res}")
+        return _parse_count_next("PROMOTE_DELAYED", res)
 
-        return int(res[1])
+    def _reap_expired(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> Plan[int]:
+        n, _ = yield from self._reap_expired_next(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override)
+        return n
 
-    def job_timeout_ms(self, *, queue: str, job_id: str, default_ms: int = 60_000) -> int:
-        base = queue_base(queue)
-        k_job = base + ":job:" + job_id
-        v = self.r.hget(k_job, "timeout_ms")
-        try:
-            n = int(v) if v is not None and v != "" else 0
-        except Exception:
-            n = 0
-        return n if n > 0 else int(default_ms)
-    
-    def retry_failed(self, *, queue: str, job_id: str, now_ms_override: int = 0) -> None:
+    def _reap_expired_next(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> Plan[MaintenanceResult]:
         anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.retry_failed.sha,
-            self.scripts.retry_failed.src,
-            1,
-            anchor,
-            job_id,
-            str(int(nms)),
+        res = yield _Eval(self.scripts.reap_expired, anchor, [str(int(nms)), str(int(max_reap))])
+
+        return _parse_count_next("REAP_EXPIRED", res)
+
+    def _next_maintenance_ms(self, *, queue: str) -> Plan[Optional[int]]:
+        base = queue_base(queue)
+        rows = yield _Pipe([
+            _Call("zrange", (base + ":delayed", 0, 0), {"withscores": True}),
+            _Call("zrange", (base + ":active", 0, 0), {"withscores": True}),
+        ])
+        return _parse_next_due(rows)
+
+    def _leader_acquire(self, *, queue: str, owner: str, lease_ms: int) -> Plan[bool]:
+        res = yield _Eval(self.scripts.leader_acquire, queue_anchor(queue), [str(owner), str(int(lease_ms))])
+        return _parse_count("LEADER_ACQUIRE", res) == 1
+
+    def _leader_release(self, *, queue: str, owner: str) -> Plan[bool]:
+        res = yield _Eval(self.scripts.leader_release, queue_anchor(queue), [str(owner)])
+        return _parse_count("LEADER_RELEASE", res) == 1
+
+    def _rebuild_stats(self, *, queue: str) -> Plan[None]:
+        for part in self.partitions(queue):
+            base = queue_base(part)
+            gids = _group_ids(base, (yield _Scan(base + ":g:*:wait")))
+
+            res = yield _Eval(self.scripts.rebuild_stats, queue_anchor(part), gids)
+
+            _parse_ok("REBUILD_STATS", res)
+
+    def _set_retention(self, *, queue: str, policy: RetentionPolicy) -> Plan[None]:
+        for part in self.partitions(queue):
+            res = yield _Eval(self.scripts.set_retention, queue_anchor(part), _retention_argv(policy))
+            _parse_ok("SET_RETENTION", res)
+
+    def _get_retention(self, *, queue: str) -> Plan[RetentionPolicy]:
+        anchor = queue_anchor(self.partitions(queue)[0])
+        return _parse_retention(
+            (yield _Call("hmget", (anchor, "completed_keep", "completed_max_age_ms", "failed_keep", "failed_max_age_ms")))
         )
 
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected RETRY_FAILED response: {res}")
+    def _sweep_retention(self, *, queue: str, max_sweep: int = 1000, now_ms_override: int = 0) -> Plan[int]:
+        nms = now_ms_override or now_ms()
 
-        if res[0] == "OK":
-            return
+        swept = 0
+        for part in self.partitions(queue):
+            res = yield _Eval(self.scripts.sweep_retention, queue_anchor(part), [str(int(nms)), str(int(max_sweep))])
+            swept += _parse_count("SWEEP_RETENTION", res)
+        return swept
 
-        if res[0] == "ERR":
-            reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
-            raise RuntimeError(f"RETRY_FAILED failed: {reason}")
+    def _set_job_defaults(self, *, queue: str, defaults: JobDefaults) -> Plan[None]:
+        for part in self.partitions(queue):
+            res = yield _Eval(self.scripts.set_job_defaults, queue_anchor(part), _job_defaults_argv(defaults))
+            _parse_ok("SET_JOB_DEFAULTS", res)
+
+    def _get_job_defaults(self, *, queue: str) -> Plan[JobDefaults]:
+        return _parse_job_defaults((yield _Call("hmget", (queue_anchor(self.partitions(queue)[0]), *JOB_DEFAULT_FIELDS))))
+
+    def _set_priority_fairness(self, *, queue: str, fair_every: int) -> Plan[None]:
+        for part in self.partitions(queue):
+            res = yield _Eval(self.scripts.set_priority_fairness, queue_anchor(part), _priority_fairness_argv(fair_every))
+            _parse_ok("SET_PRIORITY_FAIRNESS", res)
+
+    def _get_priority_fairness(self, *, queue: str) -> Plan[int]:
+        return int((yield _Call("hget", (queue_anchor(self.partitions(queue)[0]), "priority_fair_every"))) or 0)
+
+    def _set_rate_limit(self, *, queue: str, limit: RateLimit, gid: Optional[str] = None, now_ms_override: int = 0) -> Plan[None]:
+        parts = self.partitions(queue)
+        nms = now_ms_override or now_ms()
+        gid_s = (gid or "").strip()
+
+        # a group lives in one partition; a queue-wide limit is split evenly over the partitions
+        targets = [_route(parts, gid_s, self._rr)] if gid_s else parts
+        shares = 1 if gid_s else len(parts)
+
+        for share, part in enumerate(targets):
+            res = yield _Eval(self.scripts.set_rate_limit, queue_anchor(part), _rate_limit_argv(gid_s, limit, shares, share, nms))
+            _parse_ok("SET_RATE_LIMIT", res)
 
-        raise RuntimeError(f"Unexpected RETRY_FAILED response: {res}")
+    def _get_rate_limit(self, *, queue: str, gid: Optional[str] = None) -> Plan[Optional[RateLimit]]:
+        parts = self.partitions(queue)
+        gid_s = (gid or "").strip()
+        targets = [_route(parts, gid_s, self._rr)] if gid_s else parts
+        rows = yield _Pipe([_Call("hmget", (_rate_key(part, gid_s), "rate_per_s", "burst")) for part in targets])
+        return _parse_rate_limit(rows)
+
+    def _job_timeout_ms(self, *, queue: str, job_id: str, default_ms: int = 60_000) -> Plan[int]:
+        (part,) = yield from self._job_parts(queue, [job_id])
+        k_job = queue_base(part) + ":job:" + job_id
+        v = yield _Call("hget", (k_job, "timeout_ms"))
+        if v is None:
+            v = yield _Call("hget", (queue_anchor(part), "timeout_ms"))
+        return _parse_timeout_ms(v, default_ms)
+
+    def _retry_failed(self, *, queue: str, job_id: str, now_ms_override: int = 0) -> Plan[None]:
+        (part,) = yield from self._job_parts(queue, [job_id])
+        anchor = queue_anchor(part)
+        nms = now_ms_override or now_ms()
 
-    def retry_failed_batch(
+        res = yield _Eval(self.scripts.retry_failed, anchor, [job_id, str(int(nms))])
+
+        _parse_ok("RETRY_FAILED", res)
+
+    def _retry_failed_batch(
         self,
         *,
         queue: str,
         job_ids: List[str],
         now_ms_override: int = 0,
-    ) -> BatchRetryFailedResult:
-        if len(job_ids) > 100:
-            raise ValueError("retry_failed_batch max is 100 job_ids per call")
+    ) -> Plan[BatchRetryFailedResult]:
+        _check_batch("retry_failed_batch", len(job_ids))
 
-        anchor = queue_anchor(queue)
         nms = now_ms_override or now_ms()
 
-        argv: list[str] = [str(int(nms)), str(len(job_ids))]
-        argv.extend([str(j) for j in job_ids])
+        out: BatchRetryFailedResult = [("", "", None)] * len(job_ids)
+        for part, sel in _group_parts((yield from self._job_parts(queue, job_ids))).items():
+            argv: list[str] = [str(int(nms)), str(len(sel))]
+            argv.extend([str(job_ids[i]) for i in sel])
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.retry_failed_batch.sha,
-            self.scripts.retry_failed_batch.src,
-            1,
-            anchor,
-            *argv,
-        )
+            res = yield _Eval(self.scripts.retry_failed_batch, queue_anchor(part), argv)
 
-        if not isinstance(res, list):
-            raise RuntimeError(f"Unexpected RETRY_FAILED_BATCH response: {res}")
-
-        if len(res) >= 2 and str(res[0]) == "ERR":
-            reason = str(res[1])
-            extra = str(res[2]) if len(res) > 2 else ""
-            raise RuntimeError(f"RETRY_FAILED_BATCH failed: {reason} {extra}".strip())
-
-        out: BatchRetryFailedResult = []
-        i = 0
-        while i < len(res):
-            job_id = str(res[i] or "")
-            status = str(res[i + 1] or "")
-            reason: Optional[str] = None
-            if status == "ERR":
-                reason = str(res[i + 2] or "UNKNOWN")
-                i += 3
-            else:
-                i += 2
-            out.append((job_id, status, reason))
+            for i, row in zip(sel, _parse_batch("RETRY_FAILED_BATCH", res)):
+                out[i] = row
         return out
 
-    def remove_job(self, *, queue: str, job_id: str, lane: str) -> str:
-        anchor = queue_anchor(queue)
-
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.remove_job.sha,
-            self.scripts.remove_job.src,
-            1,
-            anchor,
-            job_id,
-            lane,
-        )
-
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected REMOVE_JOB response: {res}")
+    def _retry_all_failed(
+        self,
+        *,
+        queue: str,
+        gid: str = "",
+        error_contains: str = "",
+        chunk: int = 1000,
+        cursor: int = 0,
+        max_chunks: int = 0,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+        now_ms_override: int = 0,
+    ) -> Plan[BulkProgress]:
+        chunk = _check_bulk_chunk("retry_all_failed", chunk)
 
-        if res[0] == "OK":
-            return str(res[0] or "")
+        parts = self.partitions(queue)
+        if (gid or "").strip():
+            parts = [_route(parts, gid, self._rr)]
 
-        if res[0] == "ERR":
-            reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
-            raise RuntimeError(f"REMOVE_JOB failed: {reason}")
+        def argv(offset: int) -> List[str]:
+            return [
+                str(int(now_ms_override or now_ms())),
+                str(chunk),
+                str(offset),
+                str(gid or ""),
+                str(error_contains or ""),
+            ]
 
-        raise RuntimeError(f"Unexpected REMOVE_JOB response: {res}")
+        return (yield from self._bulk("RETRY_ALL_FAILED", self.scripts.retry_all_failed, parts, argv, cursor, max_chunks, on_progress))
 
-    def remove_jobs_batch(
+    def _purge_lane(
+        self,
+        *,
+        queue: str,
+        lane: str,
+        older_than_ms: int = 0,
+        chunk: int = 1000,
+        max_chunks: int = 0,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+        now_ms_override: int = 0,
+    ) -> Plan[BulkProgress]:
+        _check_purge_lane(lane)
+        chunk = _check_bulk_chunk("purge_lane", chunk)
+
+        def argv(offset: int) -> List[str]:
+            return [
+                lane,
+                str(int(now_ms_override or now_ms())),
+                str(max(0, int(older_than_ms))),
+                str(chunk),
+            ]
+
+        return (yield from self._bulk("PURGE_LANE", self.scripts.purge_lane, self.partitions(queue), argv, 0, max_chunks, on_progress))
+
+    def _remove_job(self, *, queue: str, job_id: str, lane: str) -> Plan[str]:
+        (part,) = yield from self._job_parts(queue, [job_id])
+        res = yield _Eval(self.scripts.remove_job, queue_anchor(part), [job_id, lane])
+        return _parse_remove_job(res)
+
+    def _remove_jobs_batch(
         self,
         *,
         queue: str,
         lane: str,
         job_ids: List[str],
-    ) -> BatchRemoveResult:
-        if len(job_ids) > 100:
-            raise ValueError("remove_jobs_batch max is 100 job_ids per call")
+    ) -> Plan[BatchRemoveResult]:
+        _check_batch("remove_jobs_batch", len(job_ids))
 
-        anchor = queue_anchor(queue)
-
-        argv: list[str] = [str(lane), str(len(job_ids))]
-        argv.extend([str(j) for j in job_ids])
+        out: BatchRemoveResult = [("", "", None)] * len(job_ids)
+        for part, sel in _group_parts((yield from self._job_parts(queue, job_ids))).items():
+            argv: list[str] = [str(lane), str(len(sel))]
+            argv.extend([str(job_ids[i]) for i in sel])
 
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.remove_jobs_batch.sha,
-            self.scripts.remove_jobs_batch.src,
-            1,
-            anchor,
-            *argv,
-        )
+            res = yield _Eval(self.scripts.remove_jobs_batch, queue_anchor(part), argv)
 
-        if not isinstance(res, list):
-            raise RuntimeError(f"Unexpected REMOVE_JOBS_BATCH response: {res}")
-
-        if len(res) >= 2 and str(res[0]) == "ERR":
-            reason = str(res[1])
-            extra = str(res[2]) if len(res) > 2 else ""
-            raise RuntimeError(f"REMOVE_JOBS_BATCH failed: {reason} {extra}".strip())
-
-        out: BatchRemoveResult = []
-        i = 0
-        while i < len(res):
-            job_id = str(res[i] or "")
-            status = str(res[i + 1] or "")
-            reason: Optional[str] = None
-            if status == "ERR":
-                reason = str(res[i + 2] or "UNKNOWN")
-                i += 3
-            else:
-                i += 2
-            out.append((job_id, status, reason))
+            for i, row in zip(sel, _parse_batch("REMOVE_JOBS_BATCH", res)):
+                out[i] = row
         return out
-    
-    def childs_init(self, *, key: str, expected: int) -> None:
-        anchor = childs_anchor(key)
-
-        res = self._evalsha_with_noscript_fallback(
-            self.scripts.childs_init.sha,
-            self.scripts.childs_init.src,
-            1,
-            anchor,
-            str(int(expected)),
-        )
-
-        if not isinstance(res, list) or len(res) < 1:
-            raise RuntimeError(f"Unexpected CHILDS_INIT response: {res}")
 
-        if res[0] == "OK":
-            return
-
-        if res[0] == "ERR":
-            reason = str(res[1]) if len(res) > 1 else "UNKNOWN"
-            raise RuntimeError(f"CHILDS_INIT failed: {reason}")
+    def _childs_init(self, *, key: str, expected: int) -> Plan[None]:
+        res = yield _Eval(self.scripts.childs_init, childs_anchor(key), [str(int(expected))])
+        _parse_ok("CHILDS_INIT", res)
 
-        raise RuntimeError(f"Unexpected CHILDS_INIT response: {res}")
-
-    def child_ack(self, *, key: str, child_id: str) -> int:
+    def _child_ack(self, *, key: str, child_id: str) -> Plan[int]:
         anchor = childs_anchor(key)
+        cid = _child_id(child_id)
 
-        cid = (str(child_id) if child_id is not None else "").strip()
-        if not cid:
-            raise ValueError("child_ack child_id is required")
-
-        try:
-            res = self._evalsha_with_noscript_fallback(
-                self.scripts.child_ack.sha,
-                self.scripts.child_ack.src,
-                1,
-                anchor,
-                cid,
-            )
-        except Exception:
-            return -1
         try:
-            if not isinstance(res, list) or len(res) < 1:
-                return -1
-
-            if res[0] == "OK":
-                if len(res) < 2:
-                    return -1
-                try:
-                    return int(res[1])
-                except Exception:
-                    return -1
-
-            if res[0] == "ERR":
-                return -1
-
-            return -1
+            res = yield _Eval(self.scripts.child_ack, anchor, [cid])
         except Exception:
             return -1
+        return _parse_child_ack(res)
 
     @staticmethod
     def paused_backoff_s(poll_interval_s: float) -> float:
@@ -512,3 +1124,173 @@ class OmniqOps:
     def derive_heartbeat_interval_s(timeout_ms: int) -> float:
         half = max(1.0, (float(timeout_ms) / 1000.0) / 2.0)
         return max(1.0, min(10.0, half))
+
+@dataclass
+class OmniqOps(_OpsPlans):
+    _script_lock: ClassVar[Lock] = Lock()
+    r: RedisLike
+
+    def _evalsha_with_noscript_fallback(
+        self,
+        sha: str,
+        src: str,
+        numkeys: int,
+        *keys_and_args: Any,
+    ):
+        try:
+            return self.r.evalsha(sha, numkeys, *keys_and_args)
+        except redis.exceptions.NoScriptError:
+            with self._script_lock:
+                try:
+                    return self.r.evalsha(sha, numkeys, *keys_and_args)
+                except redis.exceptions.NoScriptError:
+                    new_sha = self.r.script_load(src)
+                    return self.r.evalsha(new_sha, numkeys, *keys_and_args)
+
+    def _request(self, req: Any) -> Any:
+        if isinstance(req, _Eval):
+            return self._evalsha_with_noscript_fallback(req.script.sha, req.script.src, 1, req.anchor, *req.argv)
+        if isinstance(req, _Pipe):
+            p = self.r.pipeline(transaction=False)
+            for c in req.calls:
+                getattr(p, c.cmd)(*c.args, **c.kwargs)
+            return p.execute()
+        if isinstance(req, _Scan):
+            return list(self.r.scan_iter(match=req.match, count=1000))
+        return getattr(self.r, req.cmd)(*req.args, **req.kwargs)
+
+    def _run(self, plan: Plan[T]) -> T:
+        reply: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            try:
+                req = plan.throw(error) if error is not None else plan.send(reply)
+            except StopIteration as done:
+                return done.value
+            try:
+                reply, error = self._request(req), None
+            except Exception as e:
+                reply, error = None, e
+
+    def publish(self, *, queue: str, payload: Any, job_id: Optional[str] = None, max_attempts: Optional[int] = None, timeout_ms: Optional[int] = None, backoff_ms: Optional[int] = None, due_ms: int = 0, now_ms_override: int = 0, gid: Optional[str] = None, group_limit: int = 0, priority: int = 0) -> str:
+        return self._run(self._publish(queue=queue, payload=payload, job_id=job_id, max_attempts=max_attempts, timeout_ms=timeout_ms, backoff_ms=backoff_ms, due_ms=due_ms, now_ms_override=now_ms_override, gid=gid, group_limit=group_limit, priority=priority))
+
+    def publish_many(self, *, queue: str, jobs: Sequence[Union[PublishJob, Dict[str, Any]]], max_attempts: Optional[int] = None, timeout_ms: Optional[int] = None, backoff_ms: Optional[int] = None, chunk_size: int = 100, now_ms_override: int = 0) -> List[str]:
+        return self._run(self._publish_many(queue=queue, jobs=jobs, max_attempts=max_attempts, timeout_ms=timeout_ms, backoff_ms=backoff_ms, chunk_size=chunk_size, now_ms_override=now_ms_override))
+
+    def pause(self, *, queue: str) -> str:
+        return self._run(self._pause(queue=queue))
+
+    def resume(self, *, queue: str) -> int:
+        return self._run(self._resume(queue=queue))
+
+    def is_paused(self, *, queue: str) -> bool:
+        return self._run(self._is_paused(queue=queue))
+
+    def wait_for_jobs(self, *, queue: str, timeout_s: float) -> bool:
+        return self._run(self._wait_for_jobs(queue=queue, timeout_s=timeout_s))
+
+    def wait_for_any(self, *, queues: Sequence[str], timeout_s: float) -> Optional[str]:
+        return self._run(self._wait_for_any(queues=queues, timeout_s=timeout_s))
+
+    def reserve(self, *, queue: str, now_ms_override: int = 0, promote_max: int = 0) -> ReserveResult:
+        return self._run(self._reserve(queue=queue, now_ms_override=now_ms_override, promote_max=promote_max))
+
+    def reserve_batch(self, *, queue: str, max_jobs: int, now_ms_override: int = 0, promote_max: int = 0) -> ReserveBatchResult:
+        return self._run(self._reserve_batch(queue=queue, max_jobs=max_jobs, now_ms_override=now_ms_override, promote_max=promote_max))
+
+    def heartbeat(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> int:
+        return self._run(self._heartbeat(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override))
+
+    def heartbeat_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchHeartbeatResult:
+        return self._run(self._heartbeat_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override))
+
+    def ack_success(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> None:
+        return self._run(self._ack_success(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override))
+
+    def ack_fail(self, *, queue: str, job_id: str, lease_token: str, error: Optional[str] = None, now_ms_override: int = 0) -> AckFailResult:
+        return self._run(self._ack_fail(queue=queue, job_id=job_id, lease_token=lease_token, error=error, now_ms_override=now_ms_override))
+
+    def ack_success_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchAckSuccessResult:
+        return self._run(self._ack_success_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override))
+
+    def ack_fail_batch(self, *, queue: str, jobs: Sequence[Tuple[str, ...]], now_ms_override: int = 0) -> BatchAckFailResult:
+        return self._run(self._ack_fail_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override))
+
+    def promote_delayed(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> int:
+        return self._run(self._promote_delayed(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override))
+
+    def promote_delayed_next(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        return self._run(self._promote_delayed_next(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override))
+
+    def reap_expired(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> int:
+        return self._run(self._reap_expired(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override))
+
+    def reap_expired_next(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        return self._run(self._reap_expired_next(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override))
+
+    def next_maintenance_ms(self, *, queue: str) -> Optional[int]:
+        return self._run(self._next_maintenance_ms(queue=queue))
+
+    def leader_acquire(self, *, queue: str, owner: str, lease_ms: int) -> bool:
+        return self._run(self._leader_acquire(queue=queue, owner=owner, lease_ms=lease_ms))
+
+    def leader_release(self, *, queue: str, owner: str) -> bool:
+        return self._run(self._leader_release(queue=queue, owner=owner))
+
+    def rebuild_stats(self, *, queue: str) -> None:
+        return self._run(self._rebuild_stats(queue=queue))
+
+    def set_retention(self, *, queue: str, policy: RetentionPolicy) -> None:
+        return self._run(self._set_retention(queue=queue, policy=policy))
+
+    def get_retention(self, *, queue: str) -> RetentionPolicy:
+        return self._run(self._get_retention(queue=queue))
+
+    def sweep_retention(self, *, queue: str, max_sweep: int = 1000, now_ms_override: int = 0) -> int:
+        return self._run(self._sweep_retention(queue=queue, max_sweep=max_sweep, now_ms_override=now_ms_override))
+
+    def set_job_defaults(self, *, queue: str, defaults: JobDefaults) -> None:
+        return self._run(self._set_job_defaults(queue=queue, defaults=defaults))
+
+    def get_job_defaults(self, *, queue: str) -> JobDefaults:
+        return self._run(self._get_job_defaults(queue=queue))
+
+    def set_priority_fairness(self, *, queue: str, fair_every: int) -> None:
+        return self._run(self._set_priority_fairness(queue=queue, fair_every=fair_every))
+
+    def get_priority_fairness(self, *, queue: str) -> int:
+        return self._run(self._get_priority_fairness(queue=queue))
+
+    def set_rate_limit(self, *, queue: str, limit: RateLimit, gid: Optional[str] = None, now_ms_override: int = 0) -> None:
+        return self._run(self._set_rate_limit(queue=queue, limit=limit, gid=gid, now_ms_override=now_ms_override))
+
+    def get_rate_limit(self, *, queue: str, gid: Optional[str] = None) -> Optional[RateLimit]:
+        return self._run(self._get_rate_limit(queue=queue, gid=gid))
+
+    def job_timeout_ms(self, *, queue: str, job_id: str, default_ms: int = 60000) -> int:
+        return self._run(self._job_timeout_ms(queue=queue, job_id=job_id, default_ms=default_ms))
+
+    def retry_failed(self, *, queue: str, job_id: str, now_ms_override: int = 0) -> None:
+        return self._run(self._retry_failed(queue=queue, job_id=job_id, now_ms_override=now_ms_override))
+
+    def retry_failed_batch(self, *, queue: str, job_ids: List[str], now_ms_override: int = 0) -> BatchRetryFailedResult:
+        return self._run(self._retry_failed_batch(queue=queue, job_ids=job_ids, now_ms_override=now_ms_override))
+
+    def retry_all_failed(self, *, queue: str, gid: str = "", error_contains: str = "", chunk: int = 1000, cursor: int = 0, max_chunks: int = 0, on_progress: Optional[Callable[[BulkProgress], None]] = None, now_ms_override: int = 0) -> BulkProgress:
+        return self._run(self._retry_all_failed(queue=queue, gid=gid, error_contains=error_contains, chunk=chunk, cursor=cursor, max_chunks=max_chunks, on_progress=on_progress, now_ms_override=now_ms_override))
+
+    def purge_lane(self, *, queue: str, lane: str, older_than_ms: int = 0, chunk: int = 1000, max_chunks: int = 0, on_progress: Optional[Callable[[BulkProgress], None]] = None, now_ms_override: int = 0) -> BulkProgress:
+        return self._run(self._purge_lane(queue=queue, lane=lane, older_than_ms=older_than_ms, chunk=chunk, max_chunks=max_chunks, on_progress=on_progress, now_ms_override=now_ms_override))
+
+    def remove_job(self, *, queue: str, job_id: str, lane: str) -> str:
+        return self._run(self._remove_job(queue=queue, job_id=job_id, lane=lane))
+
+    def remove_jobs_batch(self, *, queue: str, lane: str, job_ids: List[str]) -> BatchRemoveResult:
+        return self._run(self._remove_jobs_batch(queue=queue, lane=lane, job_ids=job_ids))
+
+    def childs_init(self, *, key: str, expected: int) -> None:
+        return self._run(self._childs_init(key=key, expected=expected))
+
+    def child_ack(self, *, key: str, child_id: str) -> int:
+        return self._run(self._child_ack(key=key, child_id=child_id))
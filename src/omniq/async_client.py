@@ -0,0 +1,433 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ._async_ops import AsyncOmniqOps
+from .client import _structured_payload
+from .scripts import read_scripts, default_scripts_dir
+from .transport import RedisConnOpts, build_async_redis_client, _safe_aclose
+from .codec import PayloadCodec
+from .types import BulkProgress, JobDefaults, PublishJob, RateLimit, RetentionPolicy, ReserveResult, ReserveBatchResult, AckFailResult, BatchAckSuccessResult, BatchAckFailResult, BatchHeartbeatResult, BatchRemoveResult, BatchRetryFailedResult, MaintenanceResult
+from .helper import queue_base, queue_partitions, check_shards
+from .backoff import IdleBackoff
+
+class AsyncOmniqClient:
+    def __init__(
+        self,
+        *,
+        redis: Optional[Any] = None,
+        redis_url: Optional[str] = None,
+        host: Optional[str] = None,
+        port: int = 6379,
+        db: int = 0,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        ssl: bool = False,
+        scripts_dir: Optional[str] = None,
+        client_name: Optional[str] = None,
+        codec: Optional[PayloadCodec] = None,
+        shards: Optional[Dict[str, int]] = None,
+    ):
+        self._owns_redis = redis is None
+        self._client_name = client_name
+        self._codec = codec
+        self._shards = check_shards(shards)
+        self._conn_opts = RedisConnOpts(
+            redis_url=redis_url,
+            host=host,
+            port=port,
+            db=db,
+            username=username,
+            password=password,
+            ssl=ssl,
+        )
+
+        if redis is None and not redis_url and not host:
+            raise ValueError("AsyncOmniqClient requires redis, redis_url or host")
+
+        if scripts_dir is None:
+            scripts_dir = default_scripts_dir()
+        self._scripts = read_scripts(scripts_dir)
+
+        self._ops: Optional[AsyncOmniqOps] = None
+        self._redis = redis
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    async def connect(self) -> AsyncOmniqOps:
+        if self._ops is not None:
+            return self._ops
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self._ops is not None:
+                return self._ops
+
+            if self._redis is not None:
+                r = self._redis
+                if self._client_name:
+                    try:
+                        await r.client_setname(str(self._client_name))
+                    except Exception:
+                        pass
+            else:
+                r = await build_async_redis_client(self._conn_opts, client_name=self._client_name)
+
+            self._ops = AsyncOmniqOps(r=r, scripts=self._scripts, codec=self._codec, shards=self._shards)
+            return self._ops
+
+    async def close(self) -> None:
+        if not self._owns_redis or self._ops is None:
+            return
+        await _safe_aclose(self._ops.r)
+
+    async def __aenter__(self) -> "AsyncOmniqClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    @staticmethod
+    def queue_base(queue_name: str) -> str:
+        return queue_base(queue_name)
+
+    def partitions(self, queue: str) -> List[str]:
+        return queue_partitions(queue, self._shards.get(queue, 1))
+
+    async def publish(
+        self,
+        *,
+        queue: str,
+        payload: Any,
+        job_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        due_ms: int = 0,
+        gid: Optional[str] = None,
+        group_limit: int = 0,
+        priority: int = 0,
+    ) -> str:
+        ops = await self.connect()
+        return await ops.publish(
+            queue=queue,
+            payload=payload,
+            job_id=job_id,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            due_ms=due_ms,
+            gid=gid,
+            group_limit=group_limit,
+            priority=priority,
+        )
+
+    async def publish_json(
+        self,
+        *,
+        queue: str,
+        payload: Any,
+        job_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        due_ms: int = 0,
+        gid: Optional[str] = None,
+        group_limit: int = 0,
+        priority: int = 0,
+    ) -> str:
+        structured = _structured_payload(payload)
+
+        ops = await self.connect()
+        return await ops.publish(
+            queue=queue,
+            payload=structured,
+            job_id=job_id,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            due_ms=due_ms,
+            gid=gid,
+            group_limit=group_limit,
+            priority=priority,
+        )
+
+    async def publish_many(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Union[PublishJob, Dict[str, Any]]],
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        chunk_size: int = 100,
+    ) -> List[str]:
+        ops = await self.connect()
+        return await ops.publish_many(
+            queue=queue,
+            jobs=jobs,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            chunk_size=chunk_size,
+        )
+
+    async def reserve(self, *, queue: str, now_ms_override: int = 0, promote_max: int = 0) -> ReserveResult:
+        ops = await self.connect()
+        return await ops.reserve(queue=queue, now_ms_override=now_ms_override, promote_max=promote_max)
+
+    async def reserve_batch(self, *, queue: str, max_jobs: int, now_ms_override: int = 0, promote_max: int = 0) -> ReserveBatchResult:
+        ops = await self.connect()
+        return await ops.reserve_batch(queue=queue, max_jobs=max_jobs, now_ms_override=now_ms_override, promote_max=promote_max)
+
+    async def heartbeat(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> int:
+        ops = await self.connect()
+        return await ops.heartbeat(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override)
+
+    async def heartbeat_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchHeartbeatResult:
+        ops = await self.connect()
+        return await ops.heartbeat_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override)
+
+    async def ack_success(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> None:
+        ops = await self.connect()
+        return await ops.ack_success(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override)
+
+    async def ack_fail(self, *, queue: str, job_id: str, lease_token: str, error: Optional[str] = None, now_ms_override: int = 0) -> AckFailResult:
+        ops = await self.connect()
+        return await ops.ack_fail(queue=queue, job_id=job_id, lease_token=lease_token, error=error, now_ms_override=now_ms_override)
+
+    async def ack_success_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchAckSuccessResult:
+        ops = await self.connect()
+        return await ops.ack_success_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override)
+
+    async def ack_fail_batch(self, *, queue: str, jobs: Sequence[Tuple[str, ...]], now_ms_override: int = 0) -> BatchAckFailResult:
+        ops = await self.connect()
+        return await ops.ack_fail_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override)
+
+    async def promote_delayed(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> int:
+        ops = await self.connect()
+        return await ops.promote_delayed(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override)
+
+    async def reap_expired(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> int:
+        ops = await self.connect()
+        return await ops.reap_expired(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override)
+
+    async def promote_delayed_next(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        ops = await self.connect()
+        return await ops.promote_delayed_next(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override)
+
+    async def reap_expired_next(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        ops = await self.connect()
+        return await ops.reap_expired_next(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override)
+
+    async def next_maintenance_ms(self, *, queue: str) -> Optional[int]:
+        ops = await self.connect()
+        return await ops.next_maintenance_ms(queue=queue)
+
+    async def leader_acquire(self, *, queue: str, owner: str, lease_ms: int) -> bool:
+        ops = await self.connect()
+        return await ops.leader_acquire(queue=queue, owner=owner, lease_ms=lease_ms)
+
+    async def leader_release(self, *, queue: str, owner: str) -> bool:
+        ops = await self.connect()
+        return await ops.leader_release(queue=queue, owner=owner)
+
+    async def rebuild_stats(self, *, queue: str) -> None:
+        ops = await self.connect()
+        return await ops.rebuild_stats(queue=queue)
+
+    async def set_retention(
+        self,
+        *,
+        queue: str,
+        completed_keep: int = 100,
+        completed_max_age_ms: int = 0,
+        failed_keep: int = 0,
+        failed_max_age_ms: int = 0,
+    ) -> None:
+        ops = await self.connect()
+        return await ops.set_retention(
+            queue=queue,
+            policy=RetentionPolicy(
+                completed_keep=completed_keep,
+                completed_max_age_ms=completed_max_age_ms,
+                failed_keep=failed_keep,
+                failed_max_age_ms=failed_max_age_ms,
+            ),
+        )
+
+    async def set_job_defaults(
+        self,
+        *,
+        queue: str,
+        max_attempts: int = 3,
+        timeout_ms: int = 60_000,
+        backoff_ms: int = 5_000,
+    ) -> None:
+        ops = await self.connect()
+        return await ops.set_job_defaults(
+            queue=queue,
+            defaults=JobDefaults(max_attempts=max_attempts, timeout_ms=timeout_ms, backoff_ms=backoff_ms),
+        )
+
+    async def get_job_defaults(self, *, queue: str) -> JobDefaults:
+        ops = await self.connect()
+        return await ops.get_job_defaults(queue=queue)
+
+    async def set_priority_fairness(self, *, queue: str, fair_every: int = 0) -> None:
+        ops = await self.connect()
+        return await ops.set_priority_fairness(queue=queue, fair_every=fair_every)
+
+    async def get_priority_fairness(self, *, queue: str) -> int:
+        ops = await self.connect()
+        return await ops.get_priority_fairness(queue=queue)
+
+    async def set_rate_limit(self, *, queue: str, rate_per_s: float, burst: int = 1, gid: Optional[str] = None, now_ms_override: int = 0) -> None:
+        ops = await self.connect()
+        return await ops.set_rate_limit(queue=queue, limit=RateLimit(rate_per_s=rate_per_s, burst=burst), gid=gid, now_ms_override=now_ms_override)
+
+    async def get_rate_limit(self, *, queue: str, gid: Optional[str] = None) -> Optional[RateLimit]:
+        ops = await self.connect()
+        return await ops.get_rate_limit(queue=queue, gid=gid)
+
+    async def get_retention(self, *, queue: str) -> RetentionPolicy:
+        ops = await self.connect()
+        return await ops.get_retention(queue=queue)
+
+    async def sweep_retention(self, *, queue: str, max_sweep: int = 1000, now_ms_override: int = 0) -> int:
+        ops = await self.connect()
+        return await ops.sweep_retention(queue=queue, max_sweep=max_sweep, now_ms_override=now_ms_override)
+
+    async def pause(self, *, queue: str) -> str:
+        ops = await self.connect()
+        return await ops.pause(queue=queue)
+
+    async def resume(self, *, queue: str) -> int:
+        ops = await self.connect()
+        return await ops.resume(queue=queue)
+
+    async def is_paused(self, *, queue: str) -> bool:
+        ops = await self.connect()
+        return await ops.is_paused(queue=queue)
+
+    async def wait_for_jobs(self, *, queue: str, timeout_s: float) -> bool:
+        ops = await self.connect()
+        return await ops.wait_for_jobs(queue=queue, timeout_s=timeout_s)
+
+    async def wait_for_any(self, *, queues: Sequence[str], timeout_s: float) -> Optional[str]:
+        ops = await self.connect()
+        return await ops.wait_for_any(queues=queues, timeout_s=timeout_s)
+
+    async def retry_failed(self, *, queue: str, job_id: str, now_ms_override: int = 0) -> None:
+        ops = await self.connect()
+        return await ops.retry_failed(queue=queue, job_id=job_id, now_ms_override=now_ms_override)
+
+    async def retry_failed_batch(self, *, queue: str, job_ids: List[str], now_ms_override: int = 0) -> BatchRetryFailedResult:
+        ops = await self.connect()
+        return await ops.retry_failed_batch(queue=queue, job_ids=job_ids, now_ms_override=now_ms_override)
+
+    async def retry_all_failed(
+        self,
+        *,
+        queue: str,
+        gid: str = "",
+        error_contains: str = "",
+        chunk: int = 1000,
+        cursor: int = 0,
+        max_chunks: int = 0,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+    ) -> BulkProgress:
+        ops = await self.connect()
+        return await ops.retry_all_failed(
+            queue=queue,
+            gid=gid,
+            error_contains=error_contains,
+            chunk=chunk,
+            cursor=cursor,
+            max_chunks=max_chunks,
+            on_progress=on_progress,
+        )
+
+    async def purge_lane(
+        self,
+        *,
+        queue: str,
+        lane: str,
+        older_than_ms: int = 0,
+        chunk: int = 1000,
+        max_chunks: int = 0,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+    ) -> BulkProgress:
+        ops = await self.connect()
+        return await ops.purge_lane(
+            queue=queue,
+            lane=lane,
+            older_than_ms=older_than_ms,
+            chunk=chunk,
+            max_chunks=max_chunks,
+            on_progress=on_progress,
+        )
+
+    async def remove_job(self, *, queue: str, job_id: str, lane: str) -> str:
+        ops = await self.connect()
+        return await ops.remove_job(queue=queue, job_id=job_id, lane=lane)
+
+    async def remove_jobs_batch(self, *, queue: str, lane: str, job_ids: List[str]) -> BatchRemoveResult:
+        ops = await self.connect()
+        return await ops.remove_jobs_batch(queue=queue, lane=lane, job_ids=job_ids)
+
+    async def childs_init(self, *, key: str, expected: int) -> None:
+        ops = await self.connect()
+        return await ops.childs_init(key=key, expected=expected)
+
+    async def child_ack(self, *, key: str, child_id: str) -> int:
+        ops = await self.connect()
+        return await ops.child_ack(key=key, child_id=child_id)
+
+    async def consume(
+        self,
+        *,
+        queue: str,
+        handler: Callable[[Any], Union[Awaitable[None], None]],
+        concurrency: int = 10,
+        poll_interval_s: float = 0.05,
+        promote_interval_s: float = 1.0,
+        promote_batch: int = 1000,
+        reap_interval_s: float = 1.0,
+        reap_batch: int = 1000,
+        heartbeat_interval_s: Optional[float] = None,
+        verbose: bool = False,
+        logger: Callable[[str], None] = print,
+        drain: bool = True,
+        idle_wait_s: float = 1.0,
+        backoff: Optional[IdleBackoff] = None,
+        maintenance: bool = True,
+        promote_inline: int = 0,
+        stop_event: Optional[asyncio.Event] = None,
+    ) -> None:
+        from .async_consumer import async_consume
+        return await async_consume(
+            self,
+            queue=queue,
+            handler=handler,
+            concurrency=concurrency,
+            poll_interval_s=poll_interval_s,
+            promote_interval_s=promote_interval_s,
+            promote_batch=promote_batch,
+            reap_interval_s=reap_interval_s,
+            reap_batch=reap_batch,
+            heartbeat_interval_s=heartbeat_interval_s,
+            verbose=verbose,
+            logger=logger,
+            drain=drain,
+            idle_wait_s=idle_wait_s,
+            backoff=backoff,
+            maintenance=maintenance,
+            promote_inline=promote_inline,
+            stop_event=stop_event,
+        )
+
+    @property
+    def ops(self) -> Optional[AsyncOmniqOps]:
+        return self._ops
@@ -0,0 +1,306 @@
+import asyncio
+import inspect
+import signal
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from .async_client import AsyncOmniqClient
+from .consumer import StopController, _idle_timeout_s, _steal_order, _safe_log, _payload_preview
+from .pool import MAX_CONCURRENCY
+from .heartbeat import AsyncHeartbeatScheduler, _lease_heartbeat_s
+from .types import JobCtx, ReserveJob, ReserveResult
+from .exec import AsyncExec
+from .backoff import IdleBackoff, default_backoff
+from .maintenance import AsyncQueueMaintainer
+
+async def _reserve_any(client: AsyncOmniqClient, parts: List[str], *, promote_max: int) -> Tuple[str, ReserveResult]:
+    paused = None
+    throttled = None
+    error = None
+    for part in parts:
+        try:
+            res = await client.reserve(queue=part, promote_max=promote_max)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+            continue
+
+        if getattr(res, "status", "") == "PAUSED":
+            paused = res
+            continue
+        if getattr(res, "status", "") == "THROTTLED":
+            if throttled is None or res.retry_in_ms < throttled.retry_in_ms:
+                throttled = res
+            continue
+        if res:
+            return part, res
+
+    if throttled is not None:
+        return parts[0], throttled
+    if error is not None and paused is None:
+        raise error
+    return parts[0], paused
+
+async def async_consume(
+    client: AsyncOmniqClient,
+    *,
+    queue: str,
+    handler: Callable[[JobCtx], Any],
+    concurrency: int = 10,
+    poll_interval_s: float = 0.05,
+    promote_interval_s: float = 1.0,
+    promote_batch: int = 1000,
+    reap_interval_s: float = 1.0,
+    reap_batch: int = 1000,
+    heartbeat_interval_s: Optional[float] = None,
+    verbose: bool = False,
+    logger: Callable[[str], None] = print,
+    stop_on_ctrl_c: bool = True,
+    drain: bool = True,
+    idle_wait_s: float = 1.0,
+    backoff: Optional[IdleBackoff] = None,
+    maintenance: bool = True,
+    promote_inline: int = 0,
+    stop_event: Optional[asyncio.Event] = None,
+) -> None:
+    ops = await client.connect()
+    loop = asyncio.get_running_loop()
+    parts = _steal_order(ops.partitions(queue))
+
+    concurrency = max(1, min(int(concurrency), MAX_CONCURRENCY))
+    slots = asyncio.Semaphore(concurrency)
+    tasks: Set[asyncio.Task] = set()
+
+    maints: List[AsyncQueueMaintainer] = []
+    if maintenance:
+        maints = [
+            AsyncQueueMaintainer(
+                client,
+                queue=part,
+                promote_batch=promote_batch,
+                reap_batch=reap_batch,
+                max_interval_s=min(promote_interval_s, reap_interval_s),
+            )
+            for part in parts
+        ]
+
+    idle = backoff or default_backoff(poll_interval_s)
+
+    async def wait_idle(throttle_s: Optional[float] = None) -> None:
+        delay_s = idle.on_empty()
+        if throttle_s is not None:
+            delay_s = min(delay_s, throttle_s)
+        if idle_wait_s <= 0:
+            await asyncio.sleep(delay_s)
+            return
+        timeout_s = _idle_timeout_s(idle_wait_s, maints, throttle_s)
+        if timeout_s <= 0:
+            return
+        try:
+            await client.wait_for_any(queues=parts, timeout_s=timeout_s)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await asyncio.sleep(delay_s)
+
+    hb = AsyncHeartbeatScheduler(client, queue=parts[0])
+
+    ctrl = StopController(stop=False, sigint_count=0)
+    wait_for_jobs = drain
+    installed_signals = []
+
+    def stopping() -> bool:
+        return ctrl.stop or (stop_event is not None and stop_event.is_set())
+
+    def on_sigterm() -> None:
+        ctrl.stop = True
+        if verbose:
+            _safe_log(logger, f"[async_consume] SIGTERM received; stopping... queue={queue}")
+
+    def on_sigint() -> None:
+        nonlocal wait_for_jobs
+        ctrl.sigint_count += 1
+        ctrl.stop = True
+        if not drain or ctrl.sigint_count >= 2:
+            wait_for_jobs = False
+            if verbose:
+                _safe_log(logger, f"[async_consume] SIGINT; cancelling in-flight jobs. queue={queue}")
+            for t in list(tasks):
+                t.cancel()
+            return
+        if verbose:
+            _safe_log(logger, f"[async_consume] Ctrl+C received; draining in-flight jobs then exiting. queue={queue}")
+
+    async def run_job(part: str, res: ReserveJob) -> None:
+        try:
+            hb_s, first_s = _lease_heartbeat_s(res.lock_until_ms, heartbeat_interval_s)
+            flags = hb.add(job_id=res.job_id, lease_token=res.lease_token, interval_s=hb_s, first_delay_s=first_s, queue=part)
+
+            exec = AsyncExec(client=client, default_child_id=res.job_id)
+            ctx = JobCtx(
+                queue=part,
+                job_id=res.job_id,
+                payload_raw=res.payload,
+                attempt=res.attempt,
+                lock_until_ms=res.lock_until_ms,
+                lease_token=res.lease_token,
+                gid=res.gid,
+                exec=exec,
+                lease=flags,
+            )
+
+            if verbose:
+                pv = _payload_preview(ctx.payload)
+                gid_s = ctx.gid or "-"
+                _safe_log(logger, f"[async_consume] received job_id={ctx.job_id} attempt={ctx.attempt} gid={gid_s} payload={pv}")
+
+            try:
+                out = handler(ctx)
+                if inspect.isawaitable(out):
+                    await out
+
+                if not flags.get("lost", False):
+                    try:
+                        await client.ack_success(queue=part, job_id=res.job_id, lease_token=res.lease_token)
+                        if verbose:
+                            _safe_log(logger, f"[async_consume] ack success job_id={ctx.job_id}")
+                    except Exception as e:
+                        if verbose:
+                            _safe_log(logger, f"[async_consume] ack success error job_id={ctx.job_id}: {e}")
+
+            except asyncio.CancelledError:
+                if verbose:
+                    _safe_log(logger, f"[async_consume] cancelled job_id={ctx.job_id}")
+                raise
+
+            except Exception as e:
+                if not flags.get("lost", False):
+                    try:
+                        err = f"{type(e).__name__}: {e}"
+                        result = await client.ack_fail(
+                            queue=part,
+                            job_id=res.job_id,
+                            lease_token=res.lease_token,
+                            error=err,
+                        )
+                        if verbose:
+                            if result[0] == "RETRY":
+                                _safe_log(logger, f"[async_consume] ack fail job_id={ctx.job_id} => RETRY due_ms={result[1]}")
+                            else:
+                                _safe_log(logger, f"[async_consume] ack fail job_id={ctx.job_id} => FAILED")
+                            _safe_log(logger, f"[async_consume] error job_id={ctx.job_id} => {err}")
+                    except Exception as e2:
+                        if verbose:
+                            _safe_log(logger, f"[async_consume] ack fail error job_id={ctx.job_id}: {e2}")
+
+            finally:
+                hb.remove(res.job_id)
+
+        finally:
+            slots.release()
+
+    async def acquire_slot() -> bool:
+        if not slots.locked():
+            await slots.acquire()
+            return True
+        if tasks:
+            await asyncio.wait(tasks, timeout=max(0.01, float(poll_interval_s)), return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(max(0.01, float(poll_interval_s)))
+        return False
+
+    try:
+        if stop_on_ctrl_c:
+            for sig, cb in ((signal.SIGTERM, on_sigterm), (signal.SIGINT, on_sigint)):
+                try:
+                    loop.add_signal_handler(sig, cb)
+                    installed_signals.append(sig)
+                except (NotImplementedError, RuntimeError, ValueError):
+                    pass
+
+        hb.start()
+
+        while True:
+            if stopping():
+                if verbose:
+                    _safe_log(logger, f"[async_consume] stop requested; no new reserves. queue={queue} active={len(tasks)}")
+                return
+
+            for m in maints:
+                await m.tick()
+
+            if not await acquire_slot():
+                continue
+
+            try:
+                part, res = await _reserve_any(client, parts, promote_max=promote_inline)
+            except Exception as e:
+                slots.release()
+                if verbose:
+                    _safe_log(logger, f"[async_consume] reserve error: {e}")
+                await asyncio.sleep(0.2)
+                continue
+
+            if res is None:
+                slots.release()
+                await wait_idle()
+                continue
+
+            if getattr(res, "status", "") == "THROTTLED":
+                slots.release()
+                await wait_idle(res.retry_in_ms / 1000.0)
+                continue
+
+            if getattr(res, "status", "") == "PAUSED":
+                slots.release()
+                await asyncio.sleep(ops.paused_backoff_s(poll_interval_s))
+                continue
+
+            assert isinstance(res, ReserveJob)
+            idle.on_job()
+
+            if not res.lease_token:
+                slots.release()
+                if verbose:
+                    _safe_log(logger, f"[async_consume] invalid reserve (missing lease_token) job_id={res.job_id}")
+                await asyncio.sleep(0.2)
+                continue
+
+            if stopping() and not drain:
+                slots.release()
+                if verbose:
+                    _safe_log(logger, f"[async_consume] stop requested; fast-exit after reserve job_id={res.job_id}")
+                return
+
+            task = asyncio.ensure_future(run_job(part, res))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    except asyncio.CancelledError:
+        wait_for_jobs = False
+        raise
+
+    finally:
+        if tasks:
+            if not wait_for_jobs:
+                for t in list(tasks):
+                    t.cancel()
+            await asyncio.gather(*list(tasks), return_exceptions=True)
+            if verbose and wait_for_jobs:
+                _safe_log(logger, f"[async_consume] drained in-flight jobs; exiting. queue={queue}")
+
+        await hb.stop()
+
+        for m in maints:
+            await m.release()
+
+        for sig in installed_signals:
+            try:
+                loop.remove_signal_handler(sig)
+            except Exception:
+                pass
+
+        try:
+            await client.close()
+        except Exception:
+            pass
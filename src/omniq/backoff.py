@@ -0,0 +1,69 @@
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass
+class IdleStats:
+    reserves: int = 0
+    empty: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def empty_ratio(self) -> float:
+        if self.reserves <= 0:
+            return 0.0
+        return self.empty / self.reserves
+
+    def empty_per_s(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.empty / elapsed
+
+class IdleBackoff(ABC):
+    def __init__(self):
+        self.stats = IdleStats()
+
+    @abstractmethod
+    def next_delay_s(self) -> float: ...
+
+    def reset(self) -> None:
+        pass
+
+    def on_empty(self) -> float:
+        self.stats.reserves += 1
+        self.stats.empty += 1
+        return max(0.0, float(self.next_delay_s()))
+
+    def on_job(self) -> None:
+        self.stats.reserves += 1
+        self.reset()
+
+class FixedBackoff(IdleBackoff):
+    def __init__(self, delay_s: float = 0.05):
+        super().__init__()
+        self.delay_s = max(0.0, float(delay_s))
+
+    def next_delay_s(self) -> float:
+        return self.delay_s
+
+class DecorrelatedJitterBackoff(IdleBackoff):
+    def __init__(self, base_s: float = 0.05, cap_s: float = 2.0, rng: Optional[random.Random] = None):
+        super().__init__()
+        self.base_s = max(0.001, float(base_s))
+        self.cap_s = max(self.base_s, float(cap_s))
+        self._rng = rng or random.Random()
+        self._prev_s = self.base_s
+
+    def next_delay_s(self) -> float:
+        delay_s = min(self.cap_s, self._rng.uniform(self.base_s, self._prev_s * 3.0))
+        self._prev_s = delay_s
+        return delay_s
+
+    def reset(self) -> None:
+        self._prev_s = self.base_s
+
+def default_backoff(poll_interval_s: float) -> IdleBackoff:
+    base_s = max(0.001, float(poll_interval_s))
+    return DecorrelatedJitterBackoff(base_s=base_s, cap_s=max(base_s, 2.0))
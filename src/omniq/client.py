@@ -1,11 +1,13 @@
 from dataclasses import dataclass, is_dataclass, asdict
-from typing import Callable, Optional, Any
+from typing import Callable, Optional, Any, Dict, List, Sequence, Tuple, Union
 
 from ._ops import OmniqOps
 from .scripts import load_scripts, default_scripts_dir
 from .transport import RedisConnOpts, build_redis_client, RedisLike
-from .types import ReserveResult, AckFailResult
-from .helper import queue_base
+from .codec import PayloadCodec
+from .types import BulkProgress, JobDefaults, PublishJob, RateLimit, RetentionPolicy, ReserveResult, ReserveBatchResult, AckFailResult, BatchAckSuccessResult, BatchAckFailResult, BatchHeartbeatResult, MaintenanceResult
+from .helper import queue_base, check_shards
+from .backoff import IdleBackoff
 
 def _safe_close_redis(r: Any) -> None:
     if r is None:
@@ -20,6 +22,32 @@ def _safe_close_redis(r: Any) -> None:
     except Exception:
         pass
 
+def _structured_payload(payload: Any) -> Any:
+    if isinstance(payload, (dict, list)):
+        structured = payload
+    else:
+        if is_dataclass(payload):
+            structured = asdict(payload)
+
+        elif hasattr(payload, "model_dump"):
+            structured = payload.model_dump()
+
+        elif hasattr(payload, "dict"):
+            structured = payload.dict()
+
+        else:
+            raise TypeError(
+                "publish_json(payload=...) must be dict/list or a dataclass/pydantic model "
+                "that converts to structured JSON."
+            )
+
+    if not isinstance(structured, (dict, list)):
+        raise TypeError(
+            "publish_json(payload=...) must convert to dict or list (structured JSON)."
+        )
+
+    return structured
+
 @dataclass
 class OmniqClient:
     _ops: OmniqOps
@@ -37,8 +65,11 @@ class OmniqClient:
         ssl: bool = False,
         scripts_dir: Optional[str] = None,
         client_name: Optional[str] = None,
+        codec: Optional[PayloadCodec] = None,
+        shards: Optional[Dict[str, int]] = None,
     ):
         self._owns_redis = redis is None
+        shards = check_shards(shards)
 
         if redis is not None:
             r = redis
@@ -65,7 +96,7 @@ class OmniqClient:
             scripts_dir = default_scripts_dir()
         scripts = load_scripts(r, scripts_dir)
 
-        self._ops = OmniqOps(r=r, scripts=scripts)
+        self._ops = OmniqOps(r=r, scripts=scripts, codec=codec, shards=shards)
 
     def close(self) -> None:
         if not getattr(self, "_owns_redis", False):
@@ -83,18 +114,22 @@ class OmniqClient:
     def queue_base(queue_name: str) -> str:
         return queue_base(queue_name)
 
+    def partitions(self, queue: str) -> List[str]:
+        return self._ops.partitions(queue)
+
     def publish(
         self,
         *,
         queue: str,
         payload: Any,
         job_id: Optional[str] = None,
-        max_attempts: int = 3,
-        timeout_ms: int = 60_000,
-        backoff_ms: int = 5_000,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
         due_ms: int = 0,
         gid: Optional[str] = None,
         group_limit: int = 0,
+        priority: int = 0,
     ) -> str:
         return self._ops.publish(
             queue=queue,
@@ -106,6 +141,7 @@ class OmniqClient:
             due_ms=due_ms,
             gid=gid,
             group_limit=group_limit,
+            priority=priority,
         )
 
     def publish_json(
@@ -114,35 +150,15 @@ class OmniqClient:
         queue: str,
         payload: Any,
         job_id: Optional[str] = None,
-        max_attempts: int = 3,
-        timeout_ms: int = 60_000,
-        backoff_ms: int = 5_000,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
         due_ms: int = 0,
         gid: Optional[str] = None,
         group_limit: int = 0,
+        priority: int = 0,
     ) -> str:
-        if isinstance(payload, (dict, list)):
-            structured = payload
-        else:
-            if is_dataclass(payload):
-                structured = asdict(payload)
-
-            elif hasattr(payload, "model_dump"):
-                structured = payload.model_dump()
-
-            elif hasattr(payload, "dict"):
-                structured = payload.dict()
-
-            else:
-                raise TypeError(
-                    "publish_json(payload=...) must be dict/list or a dataclass/pydantic model "
-                    "that converts to structured JSON."
-                )
-
-        if not isinstance(structured, (dict, list)):
-            raise TypeError(
-                "publish_json(payload=...) must convert to dict or list (structured JSON)."
-            )
+        structured = _structured_payload(payload)
 
         return self._ops.publish(
             queue=queue,
@@ -154,26 +170,129 @@ class OmniqClient:
             due_ms=due_ms,
             gid=gid,
             group_limit=group_limit,
+            priority=priority,
         )
 
-    def reserve(self, *, queue: str, now_ms_override: int = 0) -> ReserveResult:
-        return self._ops.reserve(queue=queue, now_ms_override=now_ms_override)
+    def publish_many(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Union[PublishJob, Dict[str, Any]]],
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        chunk_size: int = 100,
+    ) -> List[str]:
+        return self._ops.publish_many(
+            queue=queue,
+            jobs=jobs,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            chunk_size=chunk_size,
+        )
+
+    def reserve(self, *, queue: str, now_ms_override: int = 0, promote_max: int = 0) -> ReserveResult:
+        return self._ops.reserve(queue=queue, now_ms_override=now_ms_override, promote_max=promote_max)
+
+    def reserve_batch(self, *, queue: str, max_jobs: int, now_ms_override: int = 0, promote_max: int = 0) -> ReserveBatchResult:
+        return self._ops.reserve_batch(queue=queue, max_jobs=max_jobs, now_ms_override=now_ms_override, promote_max=promote_max)
 
     def heartbeat(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> int:
         return self._ops.heartbeat(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override)
 
+    def heartbeat_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchHeartbeatResult:
+        return self._ops.heartbeat_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override)
+
     def ack_success(self, *, queue: str, job_id: str, lease_token: str, now_ms_override: int = 0) -> None:
         return self._ops.ack_success(queue=queue, job_id=job_id, lease_token=lease_token, now_ms_override=now_ms_override)
 
     def ack_fail(self, *, queue: str, job_id: str, lease_token: str, error: Optional[str] = None, now_ms_override: int = 0) -> AckFailResult:
         return self._ops.ack_fail(queue=queue, job_id=job_id, lease_token=lease_token, error=error, now_ms_override=now_ms_override)
 
+    def ack_success_batch(self, *, queue: str, jobs: Sequence[Tuple[str, str]], now_ms_override: int = 0) -> BatchAckSuccessResult:
+        return self._ops.ack_success_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override)
+
+    def ack_fail_batch(self, *, queue: str, jobs: Sequence[Tuple[str, ...]], now_ms_override: int = 0) -> BatchAckFailResult:
+        return self._ops.ack_fail_batch(queue=queue, jobs=jobs, now_ms_override=now_ms_override)
+
     def promote_delayed(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> int:
         return self._ops.promote_delayed(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override)
 
     def reap_expired(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> int:
         return self._ops.reap_expired(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override)
 
+    def promote_delayed_next(self, *, queue: str, max_promote: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        return self._ops.promote_delayed_next(queue=queue, max_promote=max_promote, now_ms_override=now_ms_override)
+
+    def reap_expired_next(self, *, queue: str, max_reap: int = 1000, now_ms_override: int = 0) -> MaintenanceResult:
+        return self._ops.reap_expired_next(queue=queue, max_reap=max_reap, now_ms_override=now_ms_override)
+
+    def next_maintenance_ms(self, *, queue: str) -> Optional[int]:
+        return self._ops.next_maintenance_ms(queue=queue)
+
+    def leader_acquire(self, *, queue: str, owner: str, lease_ms: int) -> bool:
+        return self._ops.leader_acquire(queue=queue, owner=owner, lease_ms=lease_ms)
+
+    def leader_release(self, *, queue: str, owner: str) -> bool:
+        return self._ops.leader_release(queue=queue, owner=owner)
+
+    def rebuild_stats(self, *, queue: str) -> None:
+        return self._ops.rebuild_stats(queue=queue)
+
+    def set_retention(
+        self,
+        *,
+        queue: str,
+        completed_keep: int = 100,
+        completed_max_age_ms: int = 0,
+        failed_keep: int = 0,
+        failed_max_age_ms: int = 0,
+    ) -> None:
+        return self._ops.set_retention(
+            queue=queue,
+            policy=RetentionPolicy(
+                completed_keep=completed_keep,
+                completed_max_age_ms=completed_max_age_ms,
+                failed_keep=failed_keep,
+                failed_max_age_ms=failed_max_age_ms,
+            ),
+        )
+
+    def set_job_defaults(
+        self,
+        *,
+        queue: str,
+        max_attempts: int = 3,
+        timeout_ms: int = 60_000,
+        backoff_ms: int = 5_000,
+    ) -> None:
+        return self._ops.set_job_defaults(
+            queue=queue,
+            defaults=JobDefaults(max_attempts=max_attempts, timeout_ms=timeout_ms, backoff_ms=backoff_ms),
+        )
+
+    def get_job_defaults(self, *, queue: str) -> JobDefaults:
+        return self._ops.get_job_defaults(queue=queue)
+
+    def set_priority_fairness(self, *, queue: str, fair_every: int = 0) -> None:
+        return self._ops.set_priority_fairness(queue=queue, fair_every=fair_every)
+
+    def get_priority_fairness(self, *, queue: str) -> int:
+        return self._ops.get_priority_fairness(queue=queue)
+
+    def set_rate_limit(self, *, queue: str, rate_per_s: float, burst: int = 1, gid: Optional[str] = None, now_ms_override: int = 0) -> None:
+        return self._ops.set_rate_limit(queue=queue, limit=RateLimit(rate_per_s=rate_per_s, burst=burst), gid=gid, now_ms_override=now_ms_override)
+
+    def get_rate_limit(self, *, queue: str, gid: Optional[str] = None) -> Optional[RateLimit]:
+        return self._ops.get_rate_limit(queue=queue, gid=gid)
+
+    def get_retention(self, *, queue: str) -> RetentionPolicy:
+        return self._ops.get_retention(queue=queue)
+
+    def sweep_retention(self, *, queue: str, max_sweep: int = 1000, now_ms_override: int = 0) -> int:
+        return self._ops.sweep_retention(queue=queue, max_sweep=max_sweep, now_ms_override=now_ms_override)
+
     def pause(self, *, queue: str) -> str:
         return self._ops.pause(queue=queue)
 
@@ -183,12 +302,58 @@ class OmniqClient:
     def is_paused(self, *, queue: str) -> bool:
         return self._ops.is_paused(queue=queue)
 
+    def wait_for_jobs(self, *, queue: str, timeout_s: float) -> bool:
+        return self._ops.wait_for_jobs(queue=queue, timeout_s=timeout_s)
+
+    def wait_for_any(self, *, queues: Sequence[str], timeout_s: float) -> Optional[str]:
+        return self._ops.wait_for_any(queues=queues, timeout_s=timeout_s)
+
     def retry_failed(self, *, queue: str, job_id: str, now_ms_override: int = 0) -> None:
         return self._ops.retry_failed(queue=queue, job_id=job_id, now_ms_override=now_ms_override)
 
     def retry_failed_batch(self, *, queue: str, job_ids: list[str], now_ms_override: int = 0) -> None:
         return self._ops.retry_failed_batch(queue=queue, job_ids=job_ids, now_ms_override=now_ms_override)
 
+    def retry_all_failed(
+        self,
+        *,
+        queue: str,
+        gid: str = "",
+        error_contains: str = "",
+        chunk: int = 1000,
+        cursor: int = 0,
+        max_chunks: int = 0,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+    ) -> BulkProgress:
+        return self._ops.retry_all_failed(
+            queue=queue,
+            gid=gid,
+            error_contains=error_contains,
+            chunk=chunk,
+            cursor=cursor,
+            max_chunks=max_chunks,
+            on_progress=on_progress,
+        )
+
+    def purge_lane(
+        self,
+        *,
+        queue: str,
+        lane: str,
+        older_than_ms: int = 0,
+        chunk: int = 1000,
+        max_chunks: int = 0,
+        on_progress: Optional[Callable[[BulkProgress], None]] = None,
+    ) -> BulkProgress:
+        return self._ops.purge_lane(
+            queue=queue,
+            lane=lane,
+            older_than_ms=older_than_ms,
+            chunk=chunk,
+            max_chunks=max_chunks,
+            on_progress=on_progress,
+        )
+
     def remove_job(self, *, queue: str, job_id: str, lane: str) -> None:
         return self._ops.remove_job(queue=queue, job_id=job_id, lane=lane)
     
@@ -215,6 +380,12 @@ class OmniqClient:
         verbose: bool = False,
         logger: Callable[[str], None] = print,
         drain: bool = True,
+        idle_wait_s: float = 1.0,
+        backoff: Optional[IdleBackoff] = None,
+        maintenance: bool = True,
+        promote_inline: int = 0,
+        prefetch: int = 1,
+        ack_flush_ms: float = 5.0,
     ) -> None:
         from .consumer import consume as consume_loop
         return consume_loop(
@@ -230,6 +401,117 @@ class OmniqClient:
             verbose=verbose,
             logger=logger,
             drain=drain,
+            idle_wait_s=idle_wait_s,
+            backoff=backoff,
+            maintenance=maintenance,
+            promote_inline=promote_inline,
+            prefetch=prefetch,
+            ack_flush_ms=ack_flush_ms,
+        )
+
+    def consume_pool(
+        self,
+        *,
+        queue: str,
+        handler: Callable[[Any], None],
+        concurrency: int = 4,
+        poll_interval_s: float = 0.05,
+        promote_interval_s: float = 1.0,
+        promote_batch: int = 1000,
+        reap_interval_s: float = 1.0,
+        reap_batch: int = 1000,
+        heartbeat_interval_s: Optional[float] = None,
+        verbose: bool = False,
+        logger: Callable[[str], None] = print,
+        drain: bool = True,
+        idle_wait_s: float = 1.0,
+        backoff: Optional[IdleBackoff] = None,
+        maintenance: bool = True,
+        promote_inline: int = 0,
+        shutdown_timeout_s: float = 30.0,
+    ) -> None:
+        from .pool import consume_pool as consume_pool_loop
+        return consume_pool_loop(
+            self,
+            queue=queue,
+            handler=handler,
+            concurrency=concurrency,
+            poll_interval_s=poll_interval_s,
+            promote_interval_s=promote_interval_s,
+            promote_batch=promote_batch,
+            reap_interval_s=reap_interval_s,
+            reap_batch=reap_batch,
+            heartbeat_interval_s=heartbeat_interval_s,
+            verbose=verbose,
+            logger=logger,
+            drain=drain,
+            idle_wait_s=idle_wait_s,
+            backoff=backoff,
+            maintenance=maintenance,
+            promote_inline=promote_inline,
+            shutdown_timeout_s=shutdown_timeout_s,
+        )
+
+    def consume_many(
+        self,
+        *,
+        queues: Dict[str, int],
+        handlers: Union[Callable[[Any], None], Dict[str, Callable[[Any], None]]],
+        poll_interval_s: float = 0.05,
+        promote_interval_s: float = 1.0,
+        promote_batch: int = 1000,
+        reap_interval_s: float = 1.0,
+        reap_batch: int = 1000,
+        heartbeat_interval_s: Optional[float] = None,
+        verbose: bool = False,
+        logger: Callable[[str], None] = print,
+        drain: bool = True,
+        idle_wait_s: float = 1.0,
+        idle_rescan_s: float = 30.0,
+        maintenance: bool = True,
+        promote_inline: int = 0,
+    ) -> None:
+        from .multi import consume_many as consume_many_loop
+        return consume_many_loop(
+            self,
+            queues=queues,
+            handlers=handlers,
+            poll_interval_s=poll_interval_s,
+            promote_interval_s=promote_interval_s,
+            promote_batch=promote_batch,
+            reap_interval_s=reap_interval_s,
+            reap_batch=reap_batch,
+            heartbeat_interval_s=heartbeat_interval_s,
+            verbose=verbose,
+            logger=logger,
+            drain=drain,
+            idle_wait_s=idle_wait_s,
+            idle_rescan_s=idle_rescan_s,
+            maintenance=maintenance,
+            promote_inline=promote_inline,
+        )
+
+    def run_maintenance(
+        self,
+        *,
+        queues: Sequence[str],
+        lease_ms: int = 5000,
+        promote_batch: int = 1000,
+        reap_batch: int = 1000,
+        max_interval_s: float = 1.0,
+        verbose: bool = False,
+        logger: Callable[[str], None] = print,
+    ) -> None:
+        from .maintenance import run_maintenance as run_maintenance_loop
+        return run_maintenance_loop(
+            self,
+            queues=queues,
+            lease_ms=lease_ms,
+            promote_batch=promote_batch,
+            reap_batch=reap_batch,
+            max_interval_s=max_interval_s,
+            verbose=verbose,
+            logger=logger,
         )
 
     @property
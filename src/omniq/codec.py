@@ -0,0 +1,123 @@
+import base64
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None
+
+CODEC_MARK = "~"
+
+SERIALIZERS = ("json", "orjson", "msgpack")
+COMPRESSIONS = ("", "zlib", "zstd")
+
+def _require(module: Any, name: str, what: str) -> None:
+    if module is None:
+        raise RuntimeError(f"{what} requires the '{name}' package (pip install {name})")
+
+def _dumps_json(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+def _loads_json(data: Any) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+@dataclass(frozen=True)
+class PayloadCodec:
+    serializer: str = "json"
+    compression: str = ""
+    threshold_bytes: int = 4096
+    level: int = 3
+
+    def __post_init__(self) -> None:
+        if self.serializer not in SERIALIZERS:
+            raise ValueError(f"PayloadCodec serializer must be one of {SERIALIZERS}")
+        if self.compression not in COMPRESSIONS:
+            raise ValueError(f"PayloadCodec compression must be one of {COMPRESSIONS}")
+        if self.threshold_bytes < 0:
+            raise ValueError("PayloadCodec threshold_bytes must be >= 0")
+
+        if self.serializer == "orjson":
+            _require(orjson, "orjson", "PayloadCodec(serializer='orjson')")
+        if self.serializer == "msgpack":
+            _require(msgpack, "msgpack", "PayloadCodec(serializer='msgpack')")
+        if self.compression == "zstd":
+            _require(zstandard, "zstandard", "PayloadCodec(compression='zstd')")
+
+    def _serialize(self, payload: Any) -> bytes:
+        if self.serializer == "msgpack":
+            return msgpack.packb(payload, use_bin_type=True)
+        if self.serializer == "orjson":
+            return orjson.dumps(payload)
+        return _dumps_json(payload).encode("utf-8")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return zlib.compress(data, self.level)
+
+    def encode(self, payload: Any) -> str:
+        data = self._serialize(payload)
+        fmt = "msgpack" if self.serializer == "msgpack" else "json"
+
+        compression = ""
+        if self.compression and len(data) >= self.threshold_bytes:
+            packed = self._compress(data)
+            if len(packed) < len(data):
+                data = packed
+                compression = self.compression
+
+        # plain JSON stays readable by every client; anything else is tagged
+        if fmt == "json" and not compression:
+            return data.decode("utf-8")
+
+        tag = fmt + ("+" + compression if compression else "")
+        return CODEC_MARK + tag + ":" + base64.b64encode(data).decode("ascii")
+
+def encode_payload(payload: Any, codec: Optional[PayloadCodec] = None) -> str:
+    if codec is None:
+        return _dumps_json(payload)
+    return codec.encode(payload)
+
+def decode_payload(raw: str) -> Any:
+    if not raw.startswith(CODEC_MARK):
+        return _loads_json(raw)
+
+    tag, sep, body = raw[len(CODEC_MARK):].partition(":")
+    if not sep:
+        raise ValueError(f"payload codec header is malformed: {raw[:32]!r}")
+
+    fmt, _, compression = tag.partition("+")
+    data = base64.b64decode(body)
+
+    if compression == "zlib":
+        data = zlib.decompress(data)
+    elif compression == "zstd":
+        _require(zstandard, "zstandard", "decoding a zstd payload")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif compression:
+        raise ValueError(f"unknown payload compression: {compression}")
+
+    if fmt == "json":
+        return _loads_json(data)
+    if fmt == "msgpack":
+        _require(msgpack, "msgpack", "decoding a msgpack payload")
+        return msgpack.unpackb(data, raw=False)
+    raise ValueError(f"unknown payload serializer: {fmt}")
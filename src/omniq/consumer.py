@@ -1,13 +1,18 @@
 import json
+import random
 import threading
 import time
 import signal
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
 
 from .client import OmniqClient
-from .types import JobCtx, ReserveJob
+from .types import JobCtx, ReserveJob, ReserveResult, ReserveBatchResult
 from .exec import Exec
+from .backoff import IdleBackoff, default_backoff
+from .maintenance import QueueMaintainer
+from .heartbeat import HeartbeatScheduler, _lease_heartbeat_s
 
 @dataclass
 class StopController:
@@ -82,6 +87,112 @@ def _payload_preview(payload: Any, max_len: int = 300) -> str:
         return s[:max_len] + "…"
     return s
 
+def _idle_timeout_s(idle_wait_s: float, maints: Sequence[Any], throttle_s: Optional[float] = None) -> float:
+    timeout_s = min([float(idle_wait_s)] + [m.due_in_s() for m in maints])
+    # rate-limited work becomes reservable at a known time; wake up for it
+    return timeout_s if throttle_s is None else min(timeout_s, throttle_s)
+
+def _steal_order(parts: List[str]) -> List[str]:
+    # each consumer starts at its own home partition and steals from the others when it is empty
+    if len(parts) <= 1:
+        return list(parts)
+    home = random.randrange(len(parts))
+    return parts[home:] + parts[:home]
+
+def _reserve_any(
+    client: OmniqClient,
+    parts: List[str],
+    *,
+    max_jobs: int,
+    promote_max: int,
+) -> Tuple[str, Union[ReserveResult, ReserveBatchResult]]:
+    paused = None
+    throttled = None
+    error = None
+    for part in parts:
+        try:
+            if max_jobs > 1:
+                res = client.reserve_batch(queue=part, max_jobs=max_jobs, promote_max=promote_max)
+            else:
+                res = client.reserve(queue=part, promote_max=promote_max)
+        except Exception as e:
+            error = e
+            continue
+
+        if getattr(res, "status", "") == "PAUSED":
+            paused = res
+            continue
+        if getattr(res, "status", "") == "THROTTLED":
+            if throttled is None or res.retry_in_ms < throttled.retry_in_ms:
+                throttled = res
+            continue
+        if res:
+            return part, res
+
+    if throttled is not None:
+        return parts[0], throttled
+    if error is not None and paused is None:
+        raise error
+    return parts[0], paused
+
+def _wait_idle(client: OmniqClient, *, queues: List[str], timeout_s: float, fallback_s: float) -> None:
+    # a sharded queue wakes on a publish to any of its partitions
+    if timeout_s <= 0:
+        return
+    try:
+        client.wait_for_any(queues=queues, timeout_s=timeout_s)
+    except Exception:
+        time.sleep(fallback_s)
+
+def _install_stop_signals(
+    ctrl: StopController,
+    *,
+    queue: str,
+    drain: bool,
+    verbose: bool,
+    logger: Callable[[str], None],
+    tag: str = "consume",
+) -> Tuple[Any, Any]:
+    prev_sigint = None
+
+    def on_sigterm(signum, _frame):
+        ctrl.stop = True
+        if verbose:
+            _safe_log(logger, f"[{tag}] SIGTERM received; stopping... queue={queue}")
+
+    prev_sigterm = signal.getsignal(signal.SIGTERM)
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+    if drain:
+        prev_sigint = signal.getsignal(signal.SIGINT)
+
+        def on_sigint(signum, frame):
+            ctrl.sigint_count += 1
+            if ctrl.sigint_count >= 2:
+                if verbose:
+                    _safe_log(logger, f"[{tag}] SIGINT x2; hard exit now. queue={queue}")
+                raise KeyboardInterrupt
+
+            ctrl.stop = True
+            if verbose:
+                _safe_log(logger, f"[{tag}] Ctrl+C received; draining current job then exiting. queue={queue}")
+
+        signal.signal(signal.SIGINT, on_sigint)
+
+    return prev_sigterm, prev_sigint
+
+def _restore_stop_signals(prev_sigterm: Any, prev_sigint: Any) -> None:
+    try:
+        if prev_sigterm is not None:
+            signal.signal(signal.SIGTERM, prev_sigterm)
+    except Exception:
+        pass
+    try:
+        if prev_sigint is not None:
+            signal.signal(signal.SIGINT, prev_sigint)
+    except Exception:
+        pass
+
 def consume(
     client: OmniqClient,
     *,
@@ -97,67 +208,119 @@ def consume(
     logger: Callable[[str], None] = print,
     stop_on_ctrl_c: bool = True,
     drain: bool = True,
+    idle_wait_s: float = 1.0,
+    backoff: Optional[IdleBackoff] = None,
+    maintenance: bool = True,
+    promote_inline: int = 0,
+    prefetch: int = 1,
+    ack_flush_ms: float = 5.0,
 ) -> None:
     ops = client.ops
 
-    last_promote = 0.0
-    last_reap = 0.0
+    parts = _steal_order(ops.partitions(queue))
 
-    ctrl = StopController(stop=False, sigint_count=0)
+    prefetch = max(1, min(int(prefetch), 100))
+    pending: Deque[Tuple[str, ReserveJob, Dict[str, bool]]] = deque()
 
-    prev_sigterm = None
-    prev_sigint = None
+    buffer_acks = prefetch > 1 and ack_flush_ms > 0
+    ack_flush_s = max(0.0, float(ack_flush_ms) / 1000.0)
+    acked: List[Tuple[str, str, str]] = []
+    acked_since = 0.0
 
-    try:
-        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
-            def on_sigterm(signum, _frame):
-                ctrl.stop = True
+    def flush_acks() -> None:
+        if not acked:
+            return
+        by_part: Dict[str, List[Tuple[str, str]]] = {}
+        for part, job_id, lease_token in acked:
+            by_part.setdefault(part, []).append((job_id, lease_token))
+        acked.clear()
+
+        for part, batch in by_part.items():
+            try:
+                results = client.ack_success_batch(queue=part, jobs=batch)
+            except Exception as e:
                 if verbose:
-                    _safe_log(logger, f"[consume] SIGTERM received; stopping... queue={queue}")
+                    _safe_log(logger, f"[consume] ack success batch error jobs={len(batch)}: {e}")
+                continue
+            finally:
+                # buffered jobs keep their heartbeat until the ack lands, so a slow next handler cannot let them expire
+                for job_id, _ in batch:
+                    hb.remove(job_id)
+            if verbose:
+                for job_id, status, reason in results:
+                    if status == "OK":
+                        _safe_log(logger, f"[consume] ack success job_id={job_id}")
+                    else:
+                        _safe_log(logger, f"[consume] ack success error job_id={job_id}: {reason}")
+
+    maints: List[QueueMaintainer] = []
+    if maintenance:
+        maints = [
+            QueueMaintainer(
+                client,
+                queue=part,
+                promote_batch=promote_batch,
+                reap_batch=reap_batch,
+                max_interval_s=min(promote_interval_s, reap_interval_s),
+            )
+            for part in parts
+        ]
 
-            prev_sigterm = signal.getsignal(signal.SIGTERM)
-            signal.signal(signal.SIGTERM, on_sigterm)
+    idle = backoff or default_backoff(poll_interval_s)
 
-            if drain:
-                prev_sigint = signal.getsignal(signal.SIGINT)
+    def wait_idle(throttle_s: Optional[float] = None) -> None:
+        delay_s = idle.on_empty()
+        if throttle_s is not None:
+            delay_s = min(delay_s, throttle_s)
+        if idle_wait_s <= 0:
+            time.sleep(delay_s)
+            return
+        timeout_s = _idle_timeout_s(idle_wait_s, maints, throttle_s)
+        _wait_idle(client, queues=parts, timeout_s=timeout_s, fallback_s=delay_s)
 
-                def on_sigint(signum, frame):
-                    ctrl.sigint_count += 1
-                    if ctrl.sigint_count >= 2:
-                        if verbose:
-                            _safe_log(logger, f"[consume] SIGINT x2; hard exit now. queue={queue}")
-                        raise KeyboardInterrupt
+    hb = HeartbeatScheduler(client, queue=parts[0])
+
+    def watch(part: str, job: ReserveJob) -> Dict[str, bool]:
+        hb_s, first_s = _lease_heartbeat_s(job.lock_until_ms, heartbeat_interval_s)
+        return hb.add(job_id=job.job_id, lease_token=job.lease_token, interval_s=hb_s, first_delay_s=first_s, queue=part)
+
+    ctrl = StopController(stop=False, sigint_count=0)
+
+    prev_sigterm = None
+    prev_sigint = None
 
-                    ctrl.stop = True
-                    if verbose:
-                        _safe_log(logger, f"[consume] Ctrl+C received; draining current job then exiting. queue={queue}")
+    try:
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            prev_sigterm, prev_sigint = _install_stop_signals(
+                ctrl,
+                queue=queue,
+                drain=drain,
+                verbose=verbose,
+                logger=logger,
+            )
 
-                signal.signal(signal.SIGINT, on_sigint)
+        hb.start()
 
         while True:
-            if ctrl.stop:
+            if ctrl.stop and not (drain and pending):
                 if verbose:
                     _safe_log(logger, f"[consume] stop requested; exiting (idle). queue={queue}")
                 return
 
-            now_s = time.time()
-
-            if now_s - last_promote >= promote_interval_s:
-                try:
-                    client.promote_delayed(queue=queue, max_promote=promote_batch)
-                except Exception:
-                    pass
-                last_promote = now_s
-
-            if now_s - last_reap >= reap_interval_s:
-                try:
-                    client.reap_expired(queue=queue, max_reap=reap_batch)
-                except Exception:
-                    pass
-                last_reap = now_s
+            for m in maints:
+                m.tick()
 
+            fresh = not pending
+            flags: Optional[Dict[str, bool]] = None
             try:
-                res = client.reserve(queue=queue)
+                if pending:
+                    part, res, flags = pending.popleft()
+                else:
+                    part, res = _reserve_any(client, parts, max_jobs=prefetch, promote_max=promote_inline)
+                    if isinstance(res, list):
+                        # prefetched leases are heartbeated from reserve time, not only once their job starts
+                        pending.extend((part, job, watch(part, job)) for job in res)
+                        part, res, flags = pending.popleft()
             except Exception as e:
                 if verbose:
                     _safe_log(logger, f"[consume] reserve error: {e}")
@@ -165,7 +328,11 @@ def consume(
                 continue
 
             if res is None:
-                time.sleep(poll_interval_s)
+                wait_idle()
+                continue
+
+            if getattr(res, "status", "") == "THROTTLED":
+                wait_idle(res.retry_in_ms / 1000.0)
                 continue
 
             if getattr(res, "status", "") == "PAUSED":
@@ -173,33 +340,42 @@ def consume(
                 continue
 
             assert isinstance(res, ReserveJob)
+            if fresh:
+                idle.on_job()
+
             if not res.lease_token:
+                hb.remove(res.job_id)
                 if verbose:
                     _safe_log(logger, f"[consume] invalid reserve (missing lease_token) job_id={res.job_id}")
                 time.sleep(0.2)
                 continue
 
+            if flags is not None and flags.get("lost", False):
+                # the lease ran out while the job waited in the prefetch buffer; another worker owns it now
+                hb.remove(res.job_id)
+                if verbose:
+                    _safe_log(logger, f"[consume] lease lost while prefetched; skipping job_id={res.job_id}")
+                continue
+
             if ctrl.stop and not drain:
                 if verbose:
                     _safe_log(logger, f"[consume] stop requested; fast-exit after reserve job_id={res.job_id}")
                 return
 
-            try:
-                payload_obj: Any = json.loads(res.payload)
-            except Exception:
-                payload_obj = res.payload
+            if flags is None:
+                flags = watch(part, res)
 
             exec = Exec(client=client, default_child_id=res.job_id)
             ctx = JobCtx(
-                queue=queue,
+                queue=part,
                 job_id=res.job_id,
                 payload_raw=res.payload,
-                payload=payload_obj,
                 attempt=res.attempt,
                 lock_until_ms=res.lock_until_ms,
                 lease_token=res.lease_token,
                 gid=res.gid,
                 exec=exec,
+                lease=flags,
             )
 
             if verbose:
@@ -207,26 +383,18 @@ def consume(
                 gid_s = ctx.gid or "-"
                 _safe_log(logger, f"[consume] received job_id={ctx.job_id} attempt={ctx.attempt} gid={gid_s} payload={pv}")
 
-            if heartbeat_interval_s is not None:
-                hb_s = float(heartbeat_interval_s)
-            else:
-                timeout_ms = ops.job_timeout_ms(queue=queue, job_id=res.job_id)
-                hb_s = ops.derive_heartbeat_interval_s(timeout_ms)
-
-            hb = start_heartbeater(
-                client,
-                queue=queue,
-                job_id=res.job_id,
-                lease_token=res.lease_token,
-                interval_s=hb_s,
-            )
-
+            buffered = False
             try:
                 handler(ctx)
 
-                if not hb.flags.get("lost", False):
+                if not flags.get("lost", False) and buffer_acks:
+                    if not acked:
+                        acked_since = time.time()
+                    acked.append((part, res.job_id, res.lease_token))
+                    buffered = True
+                elif not flags.get("lost", False):
                     try:
-                        client.ack_success(queue=queue, job_id=res.job_id, lease_token=res.lease_token)
+                        client.ack_success(queue=part, job_id=res.job_id, lease_token=res.lease_token)
                         if verbose:
                             _safe_log(logger, f"[consume] ack success job_id={ctx.job_id}")
                     except Exception as e:
@@ -239,11 +407,11 @@ def consume(
                 return
 
             except Exception as e:
-                if not hb.flags.get("lost", False):
+                if not flags.get("lost", False):
                     try:
                         err = f"{type(e).__name__}: {e}"
                         result = client.ack_fail(
-                            queue=queue,
+                            queue=part,
                             job_id=res.job_id,
                             lease_token=res.lease_token,
                             error=err,
@@ -259,17 +427,13 @@ def consume(
                             _safe_log(logger, f"[consume] ack fail error job_id={ctx.job_id}: {e2}")
 
             finally:
-                try:
-                    hb.stop_evt.set()
-                except Exception:
-                    pass
-                try:
-                    join_timeout = max(0.2, min(2.0, hb_s * 1.5))
-                    hb.thread.join(timeout=join_timeout)
-                except Exception:
-                    pass
-
-            if ctrl.stop and drain:
+                if not buffered:
+                    hb.remove(res.job_id)
+
+            if acked and (not pending or len(acked) >= prefetch or time.time() - acked_since >= ack_flush_s):
+                flush_acks()
+
+            if ctrl.stop and drain and not pending:
                 if verbose:
                     _safe_log(logger, f"[consume] stop requested; exiting after draining job_id={ctx.job_id}")
                 return
@@ -280,17 +444,15 @@ def consume(
         return
 
     finally:
+        flush_acks()
+
+        hb.stop()
+
+        for m in maints:
+            m.release()
+
         if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
-            try:
-                if prev_sigterm is not None:
-                    signal.signal(signal.SIGTERM, prev_sigterm)
-            except Exception:
-                pass
-            try:
-                if prev_sigint is not None:
-                    signal.signal(signal.SIGINT, prev_sigint)
-            except Exception:
-                pass
+            _restore_stop_signals(prev_sigterm, prev_sigint)
 
         try:
             client.close()
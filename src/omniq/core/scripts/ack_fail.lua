@@ -17,6 +17,36 @@ end
 
 local base = derive_base(anchor)
 
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+seed_stat("failed")
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
 local k_job     = base .. ":job:" .. job_id
 local k_active  = base .. ":active"
 local k_delayed = base .. ":delayed"
@@ -30,6 +60,15 @@ local function to_i(v)
   return math.floor(n)
 end
 
+local OPT_DEFAULTS = {max_attempts = 3, timeout_ms = 60000, backoff_ms = 5000}
+
+local function job_opt(k_job, field)
+  local v = redis.call("HGET", k_job, field)
+  if not v then v = redis.call("HGET", anchor, field) end
+  if not v then return OPT_DEFAULTS[field] end
+  return to_i(v)
+end
+
 local function dec_floor0(key)
   local v = to_i(redis.call("DECR", key))
   if v < 0 then
@@ -71,6 +110,7 @@ if redis.call("ZREM", k_active, job_id) ~= 1 then
 end
 
 maybe_store_last_error()
+stat("active", -1)
 
 local gid = redis.call("HGET", k_job, "gid")
 if gid and gid ~= "" then
@@ -80,22 +120,24 @@ if gid and gid ~= "" then
   local k_gwait = base .. ":g:" .. gid .. ":wait"
   if inflight < limit and to_i(redis.call("LLEN", k_gwait)) > 0 then
     redis.call("ZADD", k_gready, now_ms, gid)
+    notify(1)
   end
 end
 
 local attempt      = to_i(redis.call("HGET", k_job, "attempt"))
-local max_attempts = to_i(redis.call("HGET", k_job, "max_attempts"))
+local max_attempts = job_opt(k_job, "max_attempts")
 if max_attempts <= 0 then max_attempts = 1 end
-local backoff_ms   = to_i(redis.call("HGET", k_job, "backoff_ms"))
+local backoff_ms   = job_opt(k_job, "backoff_ms")
 
 if attempt >= max_attempts then
   redis.call("HSET", k_job,
     "state", "failed",
-    "updated_ms", tostring(now_ms),
-    "lease_token", "",
-    "lock_until_ms", ""
+    "updated_ms", tostring(now_ms)
   )
+  redis.call("HDEL", k_job, "lease_token", "lock_until_ms")
   redis.call("LPUSH", k_failed, job_id)
+  stat("failed", 1)
+  stat("total_failed", 1)
   return {"FAILED"}
 end
 
@@ -103,10 +145,11 @@ local due_ms = now_ms + backoff_ms
 redis.call("HSET", k_job,
   "state", "delayed",
   "due_ms", tostring(due_ms),
-  "updated_ms", tostring(now_ms),
-  "lease_token", "",
-  "lock_until_ms", ""
+  "updated_ms", tostring(now_ms)
 )
+redis.call("HDEL", k_job, "lease_token", "lock_until_ms")
 redis.call("ZADD", k_delayed, due_ms, job_id)
+stat("delayed", 1)
+stat("total_retried", 1)
 
 return {"RETRY", tostring(due_ms)}
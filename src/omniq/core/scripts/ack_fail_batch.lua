@@ -0,0 +1,194 @@
+local anchor = KEYS[1]
+local now_ms = tonumber(ARGV[1] or "0")
+local count  = tonumber(ARGV[2] or "0")
+
+local DEFAULT_GROUP_LIMIT = 1
+local MAX_ERR_BYTES = 4096
+local MAX_BATCH = 100
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+seed_stat("failed")
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
+local k_active  = base .. ":active"
+local k_delayed = base .. ":delayed"
+local k_failed  = base .. ":failed"
+local k_gready  = base .. ":groups:ready"
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local OPT_DEFAULTS = {max_attempts = 3, timeout_ms = 60000, backoff_ms = 5000}
+
+local function job_opt(k_job, field)
+  local v = redis.call("HGET", k_job, field)
+  if not v then v = redis.call("HGET", anchor, field) end
+  if not v then return OPT_DEFAULTS[field] end
+  return to_i(v)
+end
+
+local function dec_floor0(key)
+  local v = to_i(redis.call("DECR", key))
+  if v < 0 then
+    redis.call("SET", key, "0")
+    return 0
+  end
+  return v
+end
+
+local function group_limit_for(gid)
+  local k_glimit = base .. ":g:" .. gid .. ":limit"
+  local lim = to_i(redis.call("GET", k_glimit))
+  if lim <= 0 then return DEFAULT_GROUP_LIMIT end
+  return lim
+end
+
+local function maybe_store_last_error(k_job, err_msg)
+  if err_msg == nil or err_msg == "" then return end
+  if string.len(err_msg) > MAX_ERR_BYTES then
+    err_msg = string.sub(err_msg, 1, MAX_ERR_BYTES)
+  end
+  redis.call("HSET", k_job,
+    "last_error", err_msg,
+    "last_error_ms", tostring(now_ms)
+  )
+end
+
+local out = {}
+local ready = 0
+local failed = 0
+local retried = 0
+
+local function push(job_id, status, extra)
+  table.insert(out, job_id)
+  table.insert(out, status)
+  if status == "ERR" then
+    table.insert(out, extra or "UNKNOWN")
+  elseif status == "RETRY" then
+    table.insert(out, extra or "0")
+  end
+end
+
+if count <= 0 then
+  return out
+end
+
+if count > MAX_BATCH then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_BATCH)}
+end
+
+if #ARGV < (2 + count * 3) then
+  return {"ERR", "BAD_ARGS"}
+end
+
+for i = 1, count do
+  local job_id      = ARGV[3 * i]
+  local lease_token = ARGV[3 * i + 1]
+  local err_msg     = ARGV[3 * i + 2]
+
+  if job_id == nil or job_id == "" then
+    push("", "ERR", "BAD_JOB_ID")
+  elseif lease_token == nil or lease_token == "" then
+    push(job_id, "ERR", "TOKEN_REQUIRED")
+  else
+    local k_job = base .. ":job:" .. job_id
+    local cur_token = redis.call("HGET", k_job, "lease_token") or ""
+
+    if cur_token ~= lease_token then
+      push(job_id, "ERR", "TOKEN_MISMATCH")
+    elseif redis.call("ZREM", k_active, job_id) ~= 1 then
+      push(job_id, "ERR", "NOT_ACTIVE")
+    else
+      maybe_store_last_error(k_job, err_msg)
+
+      local gid = redis.call("HGET", k_job, "gid")
+      if gid and gid ~= "" then
+        local k_ginflight = base .. ":g:" .. gid .. ":inflight"
+        local inflight = dec_floor0(k_ginflight)
+        local limit = group_limit_for(gid)
+        local k_gwait = base .. ":g:" .. gid .. ":wait"
+        if inflight < limit and to_i(redis.call("LLEN", k_gwait)) > 0 then
+          redis.call("ZADD", k_gready, now_ms, gid)
+          ready = ready + 1
+        end
+      end
+
+      local attempt      = to_i(redis.call("HGET", k_job, "attempt"))
+      local max_attempts = job_opt(k_job, "max_attempts")
+      if max_attempts <= 0 then max_attempts = 1 end
+      local backoff_ms   = job_opt(k_job, "backoff_ms")
+
+      if attempt >= max_attempts then
+        redis.call("HSET", k_job,
+          "state", "failed",
+          "updated_ms", tostring(now_ms)
+        )
+  redis.call("HDEL", k_job, "lease_token", "lock_until_ms")
+        redis.call("LPUSH", k_failed, job_id)
+        failed = failed + 1
+        push(job_id, "FAILED", nil)
+      else
+        local due_ms = now_ms + backoff_ms
+        redis.call("HSET", k_job,
+          "state", "delayed",
+          "due_ms", tostring(due_ms),
+          "updated_ms", tostring(now_ms)
+        )
+        redis.call("HDEL", k_job, "lease_token", "lock_until_ms")
+        redis.call("ZADD", k_delayed, due_ms, job_id)
+        retried = retried + 1
+        push(job_id, "RETRY", tostring(due_ms))
+      end
+    end
+  end
+end
+
+stat("active", -(failed + retried))
+stat("failed", failed)
+stat("total_failed", failed)
+stat("delayed", retried)
+stat("total_retried", retried)
+
+notify(ready)
+
+return out
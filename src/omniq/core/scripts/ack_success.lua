@@ -4,7 +4,8 @@ local now_ms      = tonumber(ARGV[2] or "0")
 local lease_token = ARGV[3]
 
 local DEFAULT_GROUP_LIMIT = 1
-local KEEP_COMPLETED = 100
+local DEFAULT_COMPLETED_KEEP = 100
+local ACK_TRIM = 2
 
 local function derive_base(a)
   if a == nil or a == "" then return "" end
@@ -16,6 +17,36 @@ end
 
 local base = derive_base(anchor)
 
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+seed_stat("completed")
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
 local k_job       = base .. ":job:" .. job_id
 local k_active    = base .. ":active"
 local k_completed = base .. ":completed"
@@ -44,6 +75,29 @@ local function group_limit_for(gid)
   return lim
 end
 
+-- bounded trim so completed_keep holds without a maintenance sweep
+local function trim_completed(budget)
+  local keep = DEFAULT_COMPLETED_KEEP
+  local v = redis.call("HGET", anchor, "completed_keep")
+  if v then keep = to_i(v) end
+  if keep <= 0 then return end
+
+  local live = to_i(redis.call("HGET", k_stats, "completed"))
+  local removed = 0
+  while budget > 0 and live - removed > keep do
+    local old_id = redis.call("RPOP", k_completed)
+    if not old_id then break end
+    local k_old = base .. ":job:" .. old_id
+    if redis.call("HGET", k_old, "state") == "completed" then
+      redis.call("DEL", k_old)
+      removed = removed + 1
+    end
+    budget = budget - 1
+  end
+
+  stat("completed", -removed)
+end
+
 if lease_token == nil or lease_token == "" then
   return {"ERR", "TOKEN_REQUIRED"}
 end
@@ -59,10 +113,9 @@ end
 
 redis.call("HSET", k_job,
   "state", "completed",
-  "updated_ms", tostring(now_ms),
-  "lease_token", "",
-  "lock_until_ms", ""
+  "updated_ms", tostring(now_ms)
 )
+redis.call("HDEL", k_job, "lease_token", "lock_until_ms")
 
 local gid = redis.call("HGET", k_job, "gid")
 if gid and gid ~= "" then
@@ -72,15 +125,16 @@ if gid and gid ~= "" then
   local k_gwait = base .. ":g:" .. gid .. ":wait"
   if inflight < limit and to_i(redis.call("LLEN", k_gwait)) > 0 then
     redis.call("ZADD", k_gready, now_ms, gid)
+    notify(1)
   end
 end
 
 redis.call("LPUSH", k_completed, job_id)
-while redis.call("LLEN", k_completed) > KEEP_COMPLETED do
-  local old_id = redis.call("RPOP", k_completed)
-  if old_id then
-    redis.call("DEL", base .. ":job:" .. old_id)
-  end
-end
+
+stat("active", -1)
+stat("completed", 1)
+stat("total_completed", 1)
+
+trim_completed(ACK_TRIM)
 
 return {"OK"}
@@ -0,0 +1,175 @@
+local anchor = KEYS[1]
+local now_ms = tonumber(ARGV[1] or "0")
+local count  = tonumber(ARGV[2] or "0")
+
+local DEFAULT_GROUP_LIMIT = 1
+local DEFAULT_COMPLETED_KEEP = 100
+local ACK_TRIM = 2
+local MAX_BATCH = 100
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+seed_stat("completed")
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
+local k_active    = base .. ":active"
+local k_completed = base .. ":completed"
+local k_gready    = base .. ":groups:ready"
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local function dec_floor0(key)
+  local v = to_i(redis.call("DECR", key))
+  if v < 0 then
+    redis.call("SET", key, "0")
+    return 0
+  end
+  return v
+end
+
+local function group_limit_for(gid)
+  local k_glimit = base .. ":g:" .. gid .. ":limit"
+  local lim = to_i(redis.call("GET", k_glimit))
+  if lim <= 0 then return DEFAULT_GROUP_LIMIT end
+  return lim
+end
+
+-- bounded trim so completed_keep holds without a maintenance sweep
+local function trim_completed(budget)
+  local keep = DEFAULT_COMPLETED_KEEP
+  local v = redis.call("HGET", anchor, "completed_keep")
+  if v then keep = to_i(v) end
+  if keep <= 0 then return end
+
+  local live = to_i(redis.call("HGET", k_stats, "completed"))
+  local removed = 0
+  while budget > 0 and live - removed > keep do
+    local old_id = redis.call("RPOP", k_completed)
+    if not old_id then break end
+    local k_old = base .. ":job:" .. old_id
+    if redis.call("HGET", k_old, "state") == "completed" then
+      redis.call("DEL", k_old)
+      removed = removed + 1
+    end
+    budget = budget - 1
+  end
+
+  stat("completed", -removed)
+end
+
+local out = {}
+local ready = 0
+
+local function push(job_id, status, reason)
+  table.insert(out, job_id)
+  table.insert(out, status)
+  if status == "ERR" then
+    table.insert(out, reason or "UNKNOWN")
+  end
+end
+
+if count <= 0 then
+  return out
+end
+
+if count > MAX_BATCH then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_BATCH)}
+end
+
+if #ARGV < (2 + count * 2) then
+  return {"ERR", "BAD_ARGS"}
+end
+
+local completed = 0
+
+for i = 1, count do
+  local job_id      = ARGV[1 + i * 2]
+  local lease_token = ARGV[2 + i * 2]
+
+  if job_id == nil or job_id == "" then
+    push("", "ERR", "BAD_JOB_ID")
+  elseif lease_token == nil or lease_token == "" then
+    push(job_id, "ERR", "TOKEN_REQUIRED")
+  else
+    local k_job = base .. ":job:" .. job_id
+    local cur_token = redis.call("HGET", k_job, "lease_token") or ""
+
+    if cur_token ~= lease_token then
+      push(job_id, "ERR", "TOKEN_MISMATCH")
+    elseif redis.call("ZREM", k_active, job_id) ~= 1 then
+      push(job_id, "ERR", "NOT_ACTIVE")
+    else
+      redis.call("HSET", k_job,
+        "state", "completed",
+        "updated_ms", tostring(now_ms)
+      )
+      redis.call("HDEL", k_job, "lease_token", "lock_until_ms")
+
+      local gid = redis.call("HGET", k_job, "gid")
+      if gid and gid ~= "" then
+        local k_ginflight = base .. ":g:" .. gid .. ":inflight"
+        local inflight = dec_floor0(k_ginflight)
+        local limit = group_limit_for(gid)
+        local k_gwait = base .. ":g:" .. gid .. ":wait"
+        if inflight < limit and to_i(redis.call("LLEN", k_gwait)) > 0 then
+          redis.call("ZADD", k_gready, now_ms, gid)
+          ready = ready + 1
+        end
+      end
+
+      redis.call("LPUSH", k_completed, job_id)
+      completed = completed + 1
+      push(job_id, "OK", nil)
+    end
+  end
+end
+
+stat("active", -completed)
+stat("completed", completed)
+stat("total_completed", completed)
+
+trim_completed(ACK_TRIM * completed)
+
+notify(ready)
+
+return out
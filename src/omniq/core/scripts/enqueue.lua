@@ -2,13 +2,14 @@ local anchor       = KEYS[1]
 
 local job_id       = ARGV[1]
 local payload      = ARGV[2] or ""
-local max_attempts = tonumber(ARGV[3] or "1")
-local timeout_ms   = tonumber(ARGV[4] or "60000")
-local backoff_ms   = tonumber(ARGV[5] or "5000")
+local max_attempts = tonumber(ARGV[3] or "")
+local timeout_ms   = tonumber(ARGV[4] or "")
+local backoff_ms   = tonumber(ARGV[5] or "")
 local now_ms       = tonumber(ARGV[6] or "0")
 local due_ms       = tonumber(ARGV[7] or "0")
 local gid          = ARGV[8]
 local group_limit  = tonumber(ARGV[9] or "0")
+local priority     = tonumber(ARGV[10] or "0") or 0
 
 local DEFAULT_GROUP_LIMIT = 1
 
@@ -22,27 +23,79 @@ end
 
 local base = derive_base(anchor)
 
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
+-- only options the caller passed are stored; the rest follow the queue defaults in {queue}:meta
+local OPT_FIELDS = {"max_attempts", "timeout_ms", "backoff_ms"}
+
+local function job_fields(payload, gid, priority, opts, due_ms)
+  local fields = {"payload", payload, "state", "wait", "created_ms", tostring(now_ms)}
+  if gid ~= nil and gid ~= "" then
+    table.insert(fields, "gid")
+    table.insert(fields, gid)
+  end
+  if priority > 0 then
+    table.insert(fields, "priority")
+    table.insert(fields, tostring(priority))
+  end
+  for i = 1, #OPT_FIELDS do
+    local v = opts[i]
+    if v ~= nil then
+      table.insert(fields, OPT_FIELDS[i])
+      table.insert(fields, tostring(v))
+    end
+  end
+  if due_ms ~= nil and due_ms > now_ms then
+    fields[4] = "delayed"
+    table.insert(fields, "due_ms")
+    table.insert(fields, tostring(due_ms))
+  end
+  return fields
+end
+
 local k_job        = base .. ":job:" .. job_id
 local k_delayed    = base .. ":delayed"
 local k_wait       = base .. ":wait"
 local k_has_groups = base .. ":has_groups"
+local k_prios      = base .. ":wait:prios"
+
+-- ungrouped jobs with priority > 0 wait in {queue}:wait:<priority>; :wait:prios holds the levels in use
+local function push_wait(job_id, prio)
+  if prio > 0 then
+    redis.call("ZADD", k_prios, prio, tostring(prio))
+    redis.call("RPUSH", k_wait .. ":" .. prio, job_id)
+  else
+    redis.call("RPUSH", k_wait, job_id)
+  end
+end
 
 local is_grouped = (gid ~= nil and gid ~= "")
 
-if is_grouped then
-  redis.call("HSET", k_job,
-    "id", job_id,
-    "payload", payload,
-    "gid", gid,
-    "state", "wait",
-    "attempt", "0",
-    "max_attempts", tostring(max_attempts),
-    "timeout_ms", tostring(timeout_ms),
-    "backoff_ms", tostring(backoff_ms),
-    "created_ms", tostring(now_ms),
-    "updated_ms", tostring(now_ms)
-  )
+if redis.call("EXISTS", k_job) == 1 then
+  return {"ERR", "JOB_EXISTS"}
+end
 
+redis.call("HSET", k_job, unpack(job_fields(payload, gid, priority, {max_attempts, timeout_ms, backoff_ms}, due_ms)))
+
+if is_grouped then
   redis.call("SET", k_has_groups, "1")
 
   local k_glimit = base .. ":g:" .. gid .. ":limit"
@@ -51,23 +104,11 @@ if is_grouped then
       redis.call("SET", k_glimit, tostring(group_limit))
     end
   end
-else
-  redis.call("HSET", k_job,
-    "id", job_id,
-    "payload", payload,
-    "state", "wait",
-    "attempt", "0",
-    "max_attempts", tostring(max_attempts),
-    "timeout_ms", tostring(timeout_ms),
-    "backoff_ms", tostring(backoff_ms),
-    "created_ms", tostring(now_ms),
-    "updated_ms", tostring(now_ms)
-  )
 end
 
 if due_ms ~= nil and due_ms > now_ms then
   redis.call("ZADD", k_delayed, due_ms, job_id)
-  redis.call("HSET", k_job, "state", "delayed", "due_ms", tostring(due_ms))
+  stat("delayed", 1)
 else
   if is_grouped then
     local k_gwait = base .. ":g:" .. gid .. ":wait"
@@ -80,10 +121,15 @@ else
     if inflight < limit then
       local k_gready = base .. ":groups:ready"
       redis.call("ZADD", k_gready, now_ms, gid)
+      notify(1)
     end
   else
-    redis.call("RPUSH", k_wait, job_id)
+    push_wait(job_id, priority)
+    notify(1)
   end
+  stat("waiting", 1)
 end
 
+stat("total_enqueued", 1)
+
 return {"OK", job_id}
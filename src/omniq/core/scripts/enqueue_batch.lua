@@ -0,0 +1,176 @@
+local anchor = KEYS[1]
+local now_ms = tonumber(ARGV[1] or "0")
+local count  = tonumber(ARGV[2] or "0")
+
+local DEFAULT_GROUP_LIMIT = 1
+local MAX_BATCH = 1000
+local FIELDS_PER_JOB = 9
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
+local k_delayed    = base .. ":delayed"
+local k_wait       = base .. ":wait"
+local k_gready     = base .. ":groups:ready"
+local k_has_groups = base .. ":has_groups"
+local k_prios      = base .. ":wait:prios"
+
+-- ungrouped jobs with priority > 0 wait in {queue}:wait:<priority>; :wait:prios holds the levels in use
+local function push_wait(job_id, prio)
+  if prio > 0 then
+    redis.call("ZADD", k_prios, prio, tostring(prio))
+    redis.call("RPUSH", k_wait .. ":" .. prio, job_id)
+  else
+    redis.call("RPUSH", k_wait, job_id)
+  end
+end
+
+if count == nil or count <= 0 then
+  return {"OK"}
+end
+
+if count > MAX_BATCH then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_BATCH)}
+end
+
+if #ARGV < (2 + count * FIELDS_PER_JOB) then
+  return {"ERR", "BAD_ARGS"}
+end
+
+-- only options the caller passed are stored; the rest follow the queue defaults in {queue}:meta
+local OPT_FIELDS = {"max_attempts", "timeout_ms", "backoff_ms"}
+
+local function job_fields(payload, gid, priority, opts, due_ms)
+  local fields = {"payload", payload, "state", "wait", "created_ms", tostring(now_ms)}
+  if gid ~= nil and gid ~= "" then
+    table.insert(fields, "gid")
+    table.insert(fields, gid)
+  end
+  if priority > 0 then
+    table.insert(fields, "priority")
+    table.insert(fields, tostring(priority))
+  end
+  for i = 1, #OPT_FIELDS do
+    local v = opts[i]
+    if v ~= nil then
+      table.insert(fields, OPT_FIELDS[i])
+      table.insert(fields, tostring(v))
+    end
+  end
+  if due_ms ~= nil and due_ms > now_ms then
+    fields[4] = "delayed"
+    table.insert(fields, "due_ms")
+    table.insert(fields, tostring(due_ms))
+  end
+  return fields
+end
+
+-- the batch is all or nothing: reject it before writing if any id is taken or repeated
+local seen = {}
+for i = 1, count do
+  local job_id = ARGV[2 + (i - 1) * FIELDS_PER_JOB + 1]
+  if seen[job_id] then
+    return {"ERR", "DUPLICATE_IN_BATCH", job_id}
+  end
+  if redis.call("EXISTS", base .. ":job:" .. job_id) == 1 then
+    return {"ERR", "JOB_EXISTS", job_id}
+  end
+  seen[job_id] = true
+end
+
+local out = {"OK"}
+local ready = 0
+local delayed = 0
+local has_groups_set = false
+
+for i = 1, count do
+  local o = 2 + (i - 1) * FIELDS_PER_JOB
+
+  local job_id       = ARGV[o + 1]
+  local payload      = ARGV[o + 2] or ""
+  local max_attempts = tonumber(ARGV[o + 3] or "")
+  local timeout_ms   = tonumber(ARGV[o + 4] or "")
+  local backoff_ms   = tonumber(ARGV[o + 5] or "")
+  local due_ms       = tonumber(ARGV[o + 6] or "0")
+  local gid          = ARGV[o + 7]
+  local group_limit  = tonumber(ARGV[o + 8] or "0")
+  local priority     = tonumber(ARGV[o + 9] or "0") or 0
+
+  local k_job = base .. ":job:" .. job_id
+  local is_grouped = (gid ~= nil and gid ~= "")
+
+  redis.call("HSET", k_job, unpack(job_fields(payload, gid, priority, {max_attempts, timeout_ms, backoff_ms}, due_ms)))
+
+  if is_grouped then
+    if not has_groups_set then
+      redis.call("SET", k_has_groups, "1")
+      has_groups_set = true
+    end
+
+    local k_glimit = base .. ":g:" .. gid .. ":limit"
+    if group_limit ~= nil and group_limit > 0 then
+      if redis.call("EXISTS", k_glimit) == 0 then
+        redis.call("SET", k_glimit, tostring(group_limit))
+      end
+    end
+  end
+
+  if due_ms ~= nil and due_ms > now_ms then
+    redis.call("ZADD", k_delayed, due_ms, job_id)
+    delayed = delayed + 1
+  else
+    if is_grouped then
+      local k_gwait = base .. ":g:" .. gid .. ":wait"
+      redis.call("RPUSH", k_gwait, job_id)
+
+      local k_ginflight = base .. ":g:" .. gid .. ":inflight"
+      local inflight = tonumber(redis.call("GET", k_ginflight) or "0")
+
+      local limit = tonumber(redis.call("GET", base .. ":g:" .. gid .. ":limit") or tostring(DEFAULT_GROUP_LIMIT))
+      if inflight < limit then
+        redis.call("ZADD", k_gready, now_ms, gid)
+        ready = ready + 1
+      end
+    else
+      push_wait(job_id, priority)
+      ready = ready + 1
+    end
+  end
+
+  table.insert(out, job_id)
+end
+
+notify(ready)
+
+stat("delayed", delayed)
+stat("waiting", count - delayed)
+stat("total_enqueued", count)
+
+return out
@@ -23,6 +23,15 @@ local function to_i(v)
   return math.floor(n)
 end
 
+local OPT_DEFAULTS = {max_attempts = 3, timeout_ms = 60000, backoff_ms = 5000}
+
+local function job_opt(k_job, field)
+  local v = redis.call("HGET", k_job, field)
+  if not v then v = redis.call("HGET", anchor, field) end
+  if not v then return OPT_DEFAULTS[field] end
+  return to_i(v)
+end
+
 if lease_token == nil or lease_token == "" then
   return {"ERR", "TOKEN_REQUIRED"}
 end
@@ -39,7 +48,7 @@ end
 
 local cur_lock_until = tonumber(cur_score) or 0
 
-local timeout_ms = to_i(redis.call("HGET", k_job, "timeout_ms"))
+local timeout_ms = job_opt(k_job, "timeout_ms")
 if timeout_ms <= 0 then timeout_ms = 60000 end
 
 local base_ms = cur_lock_until
@@ -0,0 +1,96 @@
+local anchor = KEYS[1]
+local now_ms = tonumber(ARGV[1] or "0")
+local count  = tonumber(ARGV[2] or "0")
+
+local MAX_BATCH = 100
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_active = base .. ":active"
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local OPT_DEFAULTS = {max_attempts = 3, timeout_ms = 60000, backoff_ms = 5000}
+
+local function job_opt(k_job, field)
+  local v = redis.call("HGET", k_job, field)
+  if not v then v = redis.call("HGET", anchor, field) end
+  if not v then return OPT_DEFAULTS[field] end
+  return to_i(v)
+end
+
+local out = {}
+
+local function push(job_id, status, value)
+  table.insert(out, job_id)
+  table.insert(out, status)
+  table.insert(out, value)
+end
+
+if count <= 0 then
+  return out
+end
+
+if count > MAX_BATCH then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_BATCH)}
+end
+
+if #ARGV < (2 + count * 2) then
+  return {"ERR", "BAD_ARGS"}
+end
+
+for i = 1, count do
+  local job_id      = ARGV[1 + i * 2]
+  local lease_token = ARGV[2 + i * 2]
+
+  if job_id == nil or job_id == "" then
+    push("", "ERR", "BAD_JOB_ID")
+  elseif lease_token == nil or lease_token == "" then
+    push(job_id, "ERR", "TOKEN_REQUIRED")
+  else
+    local k_job = base .. ":job:" .. job_id
+    local cur_token = redis.call("HGET", k_job, "lease_token") or ""
+
+    if cur_token ~= lease_token then
+      push(job_id, "ERR", "TOKEN_MISMATCH")
+    else
+      local cur_score = redis.call("ZSCORE", k_active, job_id)
+      if not cur_score then
+        push(job_id, "ERR", "NOT_ACTIVE")
+      else
+        local timeout_ms = job_opt(k_job, "timeout_ms")
+        if timeout_ms <= 0 then timeout_ms = 60000 end
+
+        local base_ms = tonumber(cur_score) or 0
+        if now_ms > base_ms then
+          base_ms = now_ms
+        end
+
+        local lock_until = base_ms + timeout_ms
+
+        redis.call("HSET", k_job,
+          "lock_until_ms", tostring(lock_until),
+          "updated_ms", tostring(now_ms)
+        )
+        redis.call("ZADD", k_active, lock_until, job_id)
+
+        push(job_id, "OK", tostring(lock_until))
+      end
+    end
+  end
+end
+
+return out
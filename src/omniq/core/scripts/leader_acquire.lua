@@ -0,0 +1,36 @@
+local anchor   = KEYS[1]
+local owner    = ARGV[1]
+local lease_ms = tonumber(ARGV[2] or "5000")
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_leader = base .. ":maint:leader"
+
+if owner == nil or owner == "" then
+  return {"ERR", "OWNER_REQUIRED"}
+end
+
+if lease_ms == nil or lease_ms <= 0 then
+  return {"ERR", "INVALID_LEASE_MS"}
+end
+
+local cur = redis.call("GET", k_leader)
+if cur == owner then
+  redis.call("PEXPIRE", k_leader, lease_ms)
+  return {"OK", "1"}
+end
+
+if cur then
+  return {"OK", "0"}
+end
+
+redis.call("SET", k_leader, owner, "PX", lease_ms)
+return {"OK", "1"}
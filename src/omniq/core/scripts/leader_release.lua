@@ -0,0 +1,21 @@
+local anchor = KEYS[1]
+local owner  = ARGV[1]
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_leader = base .. ":maint:leader"
+
+if owner ~= nil and owner ~= "" and redis.call("GET", k_leader) == owner then
+  redis.call("DEL", k_leader)
+  return {"OK", "1"}
+end
+
+return {"OK", "0"}
@@ -14,8 +14,29 @@ end
 
 local base = derive_base(anchor)
 
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
 local k_delayed = base .. ":delayed"
 local k_wait    = base .. ":wait"
+local k_prios   = base .. ":wait:prios"
 local k_gready  = base .. ":groups:ready"
 
 local function to_i(v)
@@ -32,8 +53,19 @@ local function group_limit_for(gid)
   return lim
 end
 
+-- ungrouped jobs with priority > 0 wait in {queue}:wait:<priority>; :wait:prios holds the levels in use
+local function push_wait(job_id, prio)
+  if prio > 0 then
+    redis.call("ZADD", k_prios, prio, tostring(prio))
+    redis.call("RPUSH", k_wait .. ":" .. prio, job_id)
+  else
+    redis.call("RPUSH", k_wait, job_id)
+  end
+end
+
 local ids = redis.call("ZRANGEBYSCORE", k_delayed, "-inf", now_ms, "LIMIT", 0, max_promote)
 local promoted = 0
+local ready = 0
 
 for i=1,#ids do
   local job_id = ids[i]
@@ -50,13 +82,26 @@ for i=1,#ids do
       local limit = group_limit_for(gid)
       if inflight < limit then
         redis.call("ZADD", k_gready, now_ms, gid)
+        ready = ready + 1
       end
     else
-      redis.call("RPUSH", k_wait, job_id)
+      push_wait(job_id, to_i(redis.call("HGET", k_job, "priority")))
+      ready = ready + 1
     end
 
     promoted = promoted + 1
   end
 end
 
-return {"OK", tostring(promoted)}
+stat("delayed", -promoted)
+stat("waiting", promoted)
+
+notify(ready)
+
+local next_due = ""
+local head = redis.call("ZRANGE", k_delayed, 0, 0, "WITHSCORES")
+if head[2] then
+  next_due = head[2]
+end
+
+return {"OK", tostring(promoted), next_due}
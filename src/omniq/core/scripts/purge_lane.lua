@@ -0,0 +1,97 @@
+local anchor        = KEYS[1]
+local lane          = ARGV[1] or ""
+local now_ms        = tonumber(ARGV[2] or "0")
+local older_than_ms = tonumber(ARGV[3] or "0")
+local chunk         = tonumber(ARGV[4] or "0")
+
+local MAX_CHUNK = 1000
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+if lane == "failed" or lane == "completed" then
+  seed_stat(lane)
+end
+
+if lane ~= "failed" and lane ~= "completed" then
+  return {"ERR", "BAD_LANE"}
+end
+
+if chunk == nil or chunk <= 0 then
+  return {"OK", "0", "0", "0", "1"}
+end
+
+if chunk > MAX_CHUNK then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_CHUNK)}
+end
+
+local k_lane = base .. ":" .. lane
+
+local cutoff = nil
+if older_than_ms ~= nil and older_than_ms > 0 then
+  cutoff = now_ms - older_than_ms
+end
+
+local ids = redis.call("LRANGE", k_lane, -chunk, -1)
+local n = #ids
+
+local purged = 0
+local removed = 0
+local done = "0"
+if n < chunk then done = "1" end
+
+-- oldest first; stop at the first entry newer than the cutoff
+for i = n, 1, -1 do
+  local job_id = ids[i]
+  local k_job = base .. ":job:" .. job_id
+  local st = redis.call("HGET", k_job, "state")
+
+  if st == lane and cutoff ~= nil and to_i(redis.call("HGET", k_job, "updated_ms")) > cutoff then
+    done = "1"
+    break
+  end
+
+  if st == lane then
+    redis.call("DEL", k_job)
+    purged = purged + 1
+  end
+  removed = removed + 1
+end
+
+if removed > 0 then
+  redis.call("LTRIM", k_lane, 0, -(removed + 1))
+end
+
+stat(lane, -purged)
+
+return {"OK", tostring(purged), tostring(n), "0", done}
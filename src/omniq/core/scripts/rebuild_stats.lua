@@ -0,0 +1,64 @@
+local anchor = KEYS[1]
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local WINDOW = 1000
+
+-- list lanes may hold stale ids (removed or retried jobs are skipped lazily),
+-- so only count each live job whose state still matches the lane once
+local function count_live(k_list, state, gid)
+  local seen = {}
+  local live = 0
+  local len = redis.call("LLEN", k_list)
+  for start = 0, len - 1, WINDOW do
+    local ids = redis.call("LRANGE", k_list, start, start + WINDOW - 1)
+    for i = 1, #ids do
+      local job_id = ids[i]
+      if not seen[job_id] then
+        seen[job_id] = true
+        local cur = redis.call("HMGET", base .. ":job:" .. job_id, "state", "gid")
+        if cur[1] == state and (gid == nil or (cur[2] or "") == gid) then
+          live = live + 1
+        end
+      end
+    end
+  end
+  return live
+end
+
+local waiting = count_live(base .. ":wait", "wait", "")
+local levels = redis.call("ZRANGE", base .. ":wait:prios", 0, -1)
+for i = 1, #levels do
+  waiting = waiting + count_live(base .. ":wait:" .. levels[i], "wait", "")
+end
+for i = 1, #ARGV do
+  local gid = ARGV[i]
+  if gid ~= nil and gid ~= "" then
+    waiting = waiting + count_live(base .. ":g:" .. gid .. ":wait", "wait", gid)
+  end
+end
+
+local active    = redis.call("ZCARD", base .. ":active")
+local delayed   = redis.call("ZCARD", base .. ":delayed")
+local completed = redis.call("LLEN", base .. ":completed")
+local failed    = count_live(base .. ":failed", "failed", nil)
+
+redis.call("HSET", k_stats,
+  "waiting", tostring(waiting),
+  "active", tostring(active),
+  "delayed", tostring(delayed),
+  "completed", tostring(completed),
+  "failed", tostring(failed)
+)
+
+return {"OK", tostring(waiting), tostring(active), tostring(delayed), tostring(completed), tostring(failed)}
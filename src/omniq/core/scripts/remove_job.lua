@@ -2,8 +2,6 @@ local anchor = KEYS[1]
 local job_id = ARGV[1]
 local lane   = ARGV[2] or ""
 
-local DEFAULT_GROUP_LIMIT = 1
-
 local function derive_base(a)
   if a == nil or a == "" then return "" end
   if string.sub(a, -5) == ":meta" then
@@ -28,21 +26,31 @@ local function dec_floor0(key)
   return v
 end
 
-local function group_limit_for(base, gid)
-  local lim = to_i(redis.call("GET", base .. ":g:" .. gid .. ":limit"))
-  if lim <= 0 then return DEFAULT_GROUP_LIMIT end
-  return lim
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
 end
 
-local base = derive_base(anchor)
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+if lane == "failed" or lane == "completed" then
+  seed_stat(lane)
+end
 
 local k_job       = base .. ":job:" .. job_id
-local k_wait      = base .. ":wait"
 local k_active    = base .. ":active"
 local k_delayed   = base .. ":delayed"
-local k_failed    = base .. ":failed"
-local k_completed = base .. ":completed"
-local k_gready    = base .. ":groups:ready"
 
 if redis.call("EXISTS", k_job) ~= 1 then
   return {"ERR", "NO_JOB"}
@@ -85,10 +93,12 @@ if gid ~= "" then
   end
 end
 
+-- wait / gwait / failed / completed entries are dropped lazily: once the job hash is gone,
+-- reserve, the sweep and the bulk scripts skip the id when they reach it.
 local removed = 0
 
 if lane == "wait" then
-  removed = redis.call("LREM", k_wait, 1, job_id)
+  if gid == "" then removed = 1 end
 
 elseif lane == "delayed" then
   if redis.call("ZSCORE", k_delayed, job_id) == false then
@@ -97,30 +107,25 @@ elseif lane == "delayed" then
   removed = redis.call("ZREM", k_delayed, job_id)
 
 elseif lane == "failed" then
-  removed = redis.call("LREM", k_failed, 1, job_id)
+  removed = 1
 
 elseif lane == "completed" then
-  removed = redis.call("LREM", k_completed, 1, job_id)
+  removed = 1
 
 elseif lane == "gwait" then
-  local k_gwait = base .. ":g:" .. gid .. ":wait"
-  removed = redis.call("LREM", k_gwait, 1, job_id)
-
-  local inflight = to_i(redis.call("GET", base .. ":g:" .. gid .. ":inflight"))
-  local limit = group_limit_for(base, gid)
-  local qlen = to_i(redis.call("LLEN", k_gwait))
-
-  if qlen > 0 and inflight < limit then
-    redis.call("ZADD", k_gready, 0, gid)
-  else
-    redis.call("ZREM", k_gready, gid)
-  end
+  removed = 1
 end
 
-if (lane == "wait" or lane == "failed" or lane == "completed" or lane == "gwait") and removed <= 0 then
+if removed <= 0 then
   return {"ERR", "NOT_IN_LANE"}
 end
 
 redis.call("DEL", k_job)
 
+if lane == "wait" or lane == "gwait" then
+  stat("waiting", -1)
+else
+  stat(lane, -1)
+end
+
 return {"OK"}
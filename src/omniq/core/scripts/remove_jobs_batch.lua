@@ -2,7 +2,6 @@ local anchor = KEYS[1]
 local lane   = ARGV[1] or ""
 local count  = tonumber(ARGV[2] or "0")
 
-local DEFAULT_GROUP_LIMIT = 1
 local MAX_BATCH = 100
 
 local function derive_base(a)
@@ -29,12 +28,6 @@ local function dec_floor0(key)
   return v
 end
 
-local function group_limit_for(base, gid)
-  local lim = to_i(redis.call("GET", base .. ":g:" .. gid .. ":limit"))
-  if lim <= 0 then return DEFAULT_GROUP_LIMIT end
-  return lim
-end
-
 local function expected_state_for_lane(l)
   if l == "wait" then return "wait" end
   if l == "delayed" then return "delayed" end
@@ -46,14 +39,31 @@ end
 
 local base = derive_base(anchor)
 
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+if lane == "failed" or lane == "completed" then
+  seed_stat(lane)
+end
+
 local k_active    = base .. ":active"
-local k_wait      = base .. ":wait"
 local k_delayed   = base .. ":delayed"
-local k_failed    = base .. ":failed"
-local k_completed = base .. ":completed"
-local k_gready    = base .. ":groups:ready"
 
 local out = {}
+local removed_ok = 0
 
 local function push(job_id, status, reason)
   table.insert(out, job_id)
@@ -109,14 +119,12 @@ for i = 1, count do
             end
           end
 
-          local removed = 0
-
-          if lane == "wait" then
-            removed = redis.call("LREM", k_wait, 1, job_id)
-            if removed <= 0 then
+          if lane == "wait" or lane == "gwait" or lane == "failed" or lane == "completed" then
+            if lane == "wait" and gid ~= "" then
               push(job_id, "ERR", "NOT_IN_LANE")
             else
               redis.call("DEL", k_job)
+              removed_ok = removed_ok + 1
               push(job_id, "OK", nil)
             end
 
@@ -126,44 +134,7 @@ for i = 1, count do
             else
               redis.call("ZREM", k_delayed, job_id)
               redis.call("DEL", k_job)
-              push(job_id, "OK", nil)
-            end
-
-          elseif lane == "failed" then
-            removed = redis.call("LREM", k_failed, 1, job_id)
-            if removed <= 0 then
-              push(job_id, "ERR", "NOT_IN_LANE")
-            else
-              redis.call("DEL", k_job)
-              push(job_id, "OK", nil)
-            end
-
-          elseif lane == "completed" then
-            removed = redis.call("LREM", k_completed, 1, job_id)
-            if removed <= 0 then
-              push(job_id, "ERR", "NOT_IN_LANE")
-            else
-              redis.call("DEL", k_job)
-              push(job_id, "OK", nil)
-            end
-
-          elseif lane == "gwait" then
-            local k_gwait = base .. ":g:" .. gid .. ":wait"
-            removed = redis.call("LREM", k_gwait, 1, job_id)
-            if removed <= 0 then
-              push(job_id, "ERR", "NOT_IN_LANE")
-            else
-              local inflight = to_i(redis.call("GET", base .. ":g:" .. gid .. ":inflight"))
-              local limit = group_limit_for(base, gid)
-              local qlen = to_i(redis.call("LLEN", k_gwait))
-
-              if qlen > 0 and inflight < limit then
-                redis.call("ZADD", k_gready, 0, gid)
-              else
-                redis.call("ZREM", k_gready, gid)
-              end
-
-              redis.call("DEL", k_job)
+              removed_ok = removed_ok + 1
               push(job_id, "OK", nil)
             end
           end
@@ -173,4 +144,10 @@ for i = 1, count do
   end
 end
 
+if expected_state == "wait" then
+  stat("waiting", -removed_ok)
+else
+  stat(lane, -removed_ok)
+end
+
 return out
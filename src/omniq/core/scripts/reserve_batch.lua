@@ -0,0 +1,388 @@
+local anchor   = KEYS[1]
+local now_ms   = tonumber(ARGV[1] or "0")
+local max_jobs = tonumber(ARGV[2] or "1")
+local promote_max = tonumber(ARGV[3] or "0")
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+local k_paused = base .. ":paused"
+if redis.call("EXISTS", k_paused) == 1 then
+  return {"PAUSED"}
+end
+
+local DEFAULT_GROUP_LIMIT = 1
+local MAX_GROUP_POPS = 10
+local MAX_STALE_POPS = 100
+local MAX_BATCH = 100
+local MAX_INLINE_PROMOTE = 100
+local MAX_REARM = 100
+local NOTIFY_MAX = 64
+
+if max_jobs == nil or max_jobs <= 0 then
+  return {"EMPTY"}
+end
+
+if max_jobs > MAX_BATCH then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_BATCH)}
+end
+
+local k_wait     = base .. ":wait"
+local k_prios    = base .. ":wait:prios"
+local k_picks    = base .. ":wait:picks"
+local k_delayed  = base .. ":delayed"
+local k_active   = base .. ":active"
+local k_gready   = base .. ":groups:ready"
+local k_gthrottled = base .. ":groups:throttled"
+local k_qrate    = base .. ":rate"
+local k_rr       = base .. ":lane:rr"
+
+local k_token_seq = base .. ":lease:seq"
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local OPT_DEFAULTS = {max_attempts = 3, timeout_ms = 60000, backoff_ms = 5000}
+
+local function job_opt(k_job, field)
+  local v = redis.call("HGET", k_job, field)
+  if not v then v = redis.call("HGET", anchor, field) end
+  if not v then return OPT_DEFAULTS[field] end
+  return to_i(v)
+end
+
+local function new_lease_token(job_id)
+  local seq = redis.call("INCR", k_token_seq)
+  return redis.sha1hex(job_id .. ":" .. tostring(now_ms) .. ":" .. tostring(seq))
+end
+
+local out = {"JOBS"}
+
+local function lease_job(job_id)
+  local k_job = base .. ":job:" .. job_id
+
+  local timeout_ms = job_opt(k_job, "timeout_ms")
+  if timeout_ms <= 0 then timeout_ms = 60000 end
+
+  local attempt = to_i(redis.call("HGET", k_job, "attempt")) + 1
+  local lock_until = now_ms + timeout_ms
+
+  local payload = redis.call("HGET", k_job, "payload") or ""
+  local gid = redis.call("HGET", k_job, "gid") or ""
+
+  local lease_token = new_lease_token(job_id)
+
+  redis.call("HSET", k_job,
+    "state", "active",
+    "attempt", tostring(attempt),
+    "lock_until_ms", tostring(lock_until),
+    "lease_token", lease_token,
+    "updated_ms", tostring(now_ms)
+  )
+
+  redis.call("ZADD", k_active, lock_until, job_id)
+
+  table.insert(out, job_id)
+  table.insert(out, payload)
+  table.insert(out, tostring(lock_until))
+  table.insert(out, tostring(attempt))
+  table.insert(out, gid)
+  table.insert(out, lease_token)
+  return true
+end
+
+local function is_waiting(job_id, gid)
+  local cur = redis.call("HMGET", base .. ":job:" .. job_id, "state", "gid")
+  return cur[1] == "wait" and (cur[2] or "") == gid
+end
+
+-- set when a lane still had stale ids after MAX_STALE_POPS: the queue is not known to be empty,
+-- so the script answers CONTINUE and the client calls it again instead of going idle
+local stale_capped = false
+
+local function pop_waiting(k_list, gid)
+  for _ = 1, MAX_STALE_POPS do
+    local job_id = redis.call("LPOP", k_list)
+    if not job_id then
+      return nil
+    end
+    if is_waiting(job_id, gid) then
+      return job_id
+    end
+  end
+  stale_capped = true
+  return nil
+end
+
+-- lanes are drained highest priority first; every priority_fair_every-th pick (0 = strict)
+-- starts from one of the lower lanes in turn, so a busy high lane cannot starve them
+local function pop_ungrouped()
+  local levels = redis.call("ZREVRANGE", k_prios, 0, -1)
+  if #levels == 0 then
+    return pop_waiting(k_wait, "")
+  end
+  table.insert(levels, "0")
+
+  local start = 0
+  local every = to_i(redis.call("HGET", anchor, "priority_fair_every"))
+  if every > 0 then
+    local pick = to_i(redis.call("INCR", k_picks))
+    if pick % every == 0 then
+      start = 1 + math.floor(pick / every) % (#levels - 1)
+    end
+  end
+
+  for n = 0, #levels - 1 do
+    local level = levels[(start + n) % #levels + 1]
+    local k_lane = k_wait
+    if level ~= "0" then k_lane = k_wait .. ":" .. level end
+
+    local job_id = pop_waiting(k_lane, "")
+    if job_id then
+      return job_id
+    end
+    if level ~= "0" and redis.call("LLEN", k_lane) == 0 then
+      redis.call("ZREM", k_prios, level)
+    end
+  end
+  return nil
+end
+
+local function try_ungrouped()
+  local job_id = pop_ungrouped()
+  if not job_id then
+    return false
+  end
+  return lease_job(job_id)
+end
+
+local function group_limit_for(gid)
+  local k_glimit = base .. ":g:" .. gid .. ":limit"
+  local lim = to_i(redis.call("GET", k_glimit))
+  if lim <= 0 then return DEFAULT_GROUP_LIMIT end
+  return lim
+end
+
+-- ungrouped jobs with priority > 0 wait in {queue}:wait:<priority>; :wait:prios holds the levels in use
+local function push_wait(job_id, prio)
+  if prio > 0 then
+    redis.call("ZADD", k_prios, prio, tostring(prio))
+    redis.call("RPUSH", k_wait .. ":" .. prio, job_id)
+  else
+    redis.call("RPUSH", k_wait, job_id)
+  end
+end
+
+local function promote_due(limit)
+  if limit <= 0 then return 0 end
+  if limit > MAX_INLINE_PROMOTE then limit = MAX_INLINE_PROMOTE end
+
+  local ids = redis.call("ZRANGEBYSCORE", k_delayed, "-inf", now_ms, "LIMIT", 0, limit)
+  local promoted = 0
+
+  for i=1,#ids do
+    local job_id = ids[i]
+    if redis.call("ZREM", k_delayed, job_id) == 1 then
+      local k_job = base .. ":job:" .. job_id
+      redis.call("HSET", k_job, "state", "wait", "updated_ms", tostring(now_ms))
+
+      local gid = redis.call("HGET", k_job, "gid")
+      if gid and gid ~= "" then
+        redis.call("RPUSH", base .. ":g:" .. gid .. ":wait", job_id)
+
+        local inflight = to_i(redis.call("GET", base .. ":g:" .. gid .. ":inflight"))
+        if inflight < group_limit_for(gid) then
+          redis.call("ZADD", k_gready, now_ms, gid)
+        end
+      else
+        push_wait(job_id, to_i(redis.call("HGET", k_job, "priority")))
+      end
+
+      promoted = promoted + 1
+    end
+  end
+
+  return promoted
+end
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
+-- token buckets ({queue}:rate and {queue}:g:<gid>:rate) hold rate_per_s and burst plus the
+-- tokens left at ts_ms; they are refilled lazily on read, so an idle bucket costs nothing
+local function bucket(k_rate)
+  local b = redis.call("HMGET", k_rate, "rate_per_s", "burst", "tokens", "ts_ms")
+  local rate = tonumber(b[1] or "")
+  if rate == nil or rate <= 0 then
+    return nil
+  end
+  local burst = tonumber(b[2] or "") or 1
+  local tokens = tonumber(b[3] or "") or burst
+  local ts = tonumber(b[4] or "") or now_ms
+  if now_ms > ts then
+    tokens = math.min(burst, tokens + (now_ms - ts) * rate / 1000)
+  end
+  return {rate = rate, tokens = tokens, ts = math.max(ts, now_ms)}
+end
+
+-- ms until the bucket holds a whole token; 0 when one is available (or there is no limit)
+local function token_wait_ms(b)
+  if b == nil or b.tokens >= 1 then return 0 end
+  return math.ceil((1 - b.tokens) * 1000 / b.rate)
+end
+
+local function take_token(k_rate, b)
+  if b == nil then return end
+  b.tokens = b.tokens - 1
+  redis.call("HSET", k_rate, "tokens", tostring(b.tokens), "ts_ms", tostring(b.ts))
+end
+
+-- groups out of tokens wait in :groups:throttled scored by their next token; they go back
+-- to :groups:ready with that score once it is due
+local function rearm_throttled()
+  local due = redis.call("ZRANGEBYSCORE", k_gthrottled, "-inf", now_ms, "WITHSCORES", "LIMIT", 0, MAX_REARM)
+  for i = 1, #due, 2 do
+    redis.call("ZREM", k_gthrottled, due[i])
+    redis.call("ZADD", k_gready, due[i + 1], due[i])
+  end
+end
+
+local function throttled_ms(q_wait)
+  if q_wait > 0 then return q_wait end
+  local head = redis.call("ZRANGE", k_gthrottled, 0, 0, "WITHSCORES")
+  if #head == 0 then return 0 end
+  return math.max(1, tonumber(head[2]) - now_ms)
+end
+
+local function try_grouped()
+  for _ = 1, MAX_GROUP_POPS do
+    local popped = redis.call("ZPOPMIN", k_gready, 1)
+    if not popped or #popped == 0 then
+      return false
+    end
+
+    local gid = popped[1]
+    if not gid or gid == "" then
+    else
+      local k_gwait     = base .. ":g:" .. gid .. ":wait"
+      local k_ginflight = base .. ":g:" .. gid .. ":inflight"
+
+      local inflight = to_i(redis.call("GET", k_ginflight))
+      local limit = group_limit_for(gid)
+
+      local k_grate = base .. ":g:" .. gid .. ":rate"
+      local gb = nil
+      local wait_ms = 0
+      if inflight < limit then
+        gb = bucket(k_grate)
+        wait_ms = token_wait_ms(gb)
+      end
+
+      if inflight >= limit then
+        -- saturated groups stay parked out of the ready set; ack_* / reap_expired re-arm
+        -- them once inflight drops below the limit, so reserve never cycles them
+      elseif wait_ms > 0 then
+        redis.call("ZADD", k_gthrottled, now_ms + wait_ms, gid)
+      else
+        local job_id = pop_waiting(k_gwait, gid)
+        if not job_id then
+          if to_i(redis.call("LLEN", k_gwait)) > 0 then
+            redis.call("ZADD", k_gready, now_ms, gid)
+          end
+        else
+          take_token(k_grate, gb)
+          inflight = to_i(redis.call("INCR", k_ginflight))
+
+          if inflight < limit and to_i(redis.call("LLEN", k_gwait)) > 0 then
+            redis.call("ZADD", k_gready, now_ms, gid)
+          end
+
+          return lease_job(job_id)
+        end
+      end
+    end
+  end
+
+  return false
+end
+
+local promoted = promote_due(promote_max or 0)
+rearm_throttled()
+
+local qb = bucket(k_qrate)
+local q_wait = 0
+
+local rr = to_i(redis.call("GET", k_rr))
+local leased = 0
+
+for _ = 1, max_jobs do
+  q_wait = token_wait_ms(qb)
+  if q_wait > 0 then
+    break
+  end
+
+  local ok
+  if rr == 0 then
+    ok = try_grouped()
+    if not ok then ok = try_ungrouped() end
+  else
+    ok = try_ungrouped()
+    if not ok then ok = try_grouped() end
+  end
+
+  if not ok then
+    break
+  end
+
+  take_token(k_qrate, qb)
+  leased = leased + 1
+  if rr == 0 then rr = 1 else rr = 0 end
+end
+
+stat("delayed", -promoted)
+stat("waiting", promoted - leased)
+stat("active", leased)
+
+if leased == 0 then
+  notify(promoted)
+  if stale_capped then
+    return {"CONTINUE"}
+  end
+  local wait_ms = throttled_ms(q_wait)
+  if wait_ms > 0 then
+    return {"THROTTLED", tostring(wait_ms)}
+  end
+  return {"EMPTY"}
+end
+
+notify(promoted - leased)
+
+redis.call("SET", k_rr, tostring(rr))
+
+return out
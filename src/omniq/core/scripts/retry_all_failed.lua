@@ -0,0 +1,154 @@
+local anchor    = KEYS[1]
+local now_ms    = tonumber(ARGV[1] or "0")
+local chunk     = tonumber(ARGV[2] or "0")
+local skip      = tonumber(ARGV[3] or "0")
+local gid_match = ARGV[4] or ""
+local err_match = ARGV[5] or ""
+
+local DEFAULT_GROUP_LIMIT = 1
+local MAX_CHUNK = 1000
+local TOMBSTONE = "__omniq_removed__"
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+seed_stat("failed")
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
+local k_wait   = base .. ":wait"
+local k_prios  = base .. ":wait:prios"
+local k_failed = base .. ":failed"
+local k_gready = base .. ":groups:ready"
+
+-- ungrouped jobs with priority > 0 wait in {queue}:wait:<priority>; :wait:prios holds the levels in use
+local function push_wait(job_id, prio)
+  if prio > 0 then
+    redis.call("ZADD", k_prios, prio, tostring(prio))
+    redis.call("RPUSH", k_wait .. ":" .. prio, job_id)
+  else
+    redis.call("RPUSH", k_wait, job_id)
+  end
+end
+
+if chunk == nil or chunk <= 0 then
+  return {"OK", "0", "0", tostring(skip), "1"}
+end
+
+if chunk > MAX_CHUNK then
+  return {"ERR", "BATCH_TOO_LARGE", tostring(MAX_CHUNK)}
+end
+
+if skip == nil or skip < 0 then skip = 0 end
+
+local function matches(k_job)
+  if gid_match ~= "" and (redis.call("HGET", k_job, "gid") or "") ~= gid_match then
+    return false
+  end
+  if err_match ~= "" then
+    local err = redis.call("HGET", k_job, "last_error") or ""
+    if not string.find(err, err_match, 1, true) then
+      return false
+    end
+  end
+  return true
+end
+
+local ids = redis.call("LRANGE", k_failed, -(skip + chunk), -(skip + 1))
+local n = #ids
+
+local retried = 0
+local dropped = 0
+local ready = 0
+
+-- oldest first: the tail of :failed holds the earliest failures
+for i = n, 1, -1 do
+  local job_id = ids[i]
+  local idx = -(skip + (n - i) + 1)
+  local k_job = base .. ":job:" .. job_id
+
+  if redis.call("EXISTS", k_job) ~= 1 or (redis.call("HGET", k_job, "state") or "") ~= "failed" then
+    redis.call("LSET", k_failed, idx, TOMBSTONE)
+    dropped = dropped + 1
+  elseif matches(k_job) then
+    redis.call("LSET", k_failed, idx, TOMBSTONE)
+
+    redis.call("HSET", k_job, "state", "wait", "updated_ms", tostring(now_ms))
+    redis.call("HDEL", k_job, "attempt", "lease_token", "lock_until_ms", "due_ms")
+
+    local gid = redis.call("HGET", k_job, "gid") or ""
+    if gid ~= "" then
+      redis.call("RPUSH", base .. ":g:" .. gid .. ":wait", job_id)
+
+      local inflight = to_i(redis.call("GET", base .. ":g:" .. gid .. ":inflight"))
+      local limit = to_i(redis.call("GET", base .. ":g:" .. gid .. ":limit"))
+      if limit <= 0 then limit = DEFAULT_GROUP_LIMIT end
+
+      if inflight < limit then
+        redis.call("ZADD", k_gready, now_ms, gid)
+        ready = ready + 1
+      end
+    else
+      push_wait(job_id, to_i(redis.call("HGET", k_job, "priority")))
+      ready = ready + 1
+    end
+
+    retried = retried + 1
+  end
+end
+
+local removed = retried + dropped
+if removed > 0 then
+  redis.call("LREM", k_failed, -removed, TOMBSTONE)
+end
+
+stat("failed", -retried)
+stat("waiting", retried)
+stat("total_retried", retried)
+
+notify(ready)
+
+local done = "0"
+if n < chunk then done = "1" end
+
+return {"OK", tostring(retried), tostring(n), tostring(skip + n - removed), done}
@@ -22,13 +22,55 @@ end
 
 local base = derive_base(anchor)
 
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+seed_stat("failed")
+
+local NOTIFY_MAX = 64
+
+local function notify(n)
+  if n <= 0 then return end
+  local k_notify = base .. ":notify"
+  local room = NOTIFY_MAX - redis.call("LLEN", k_notify)
+  if n > room then n = room end
+  for i=1,n do
+    redis.call("RPUSH", k_notify, "1")
+  end
+end
+
 local k_wait    = base .. ":wait"
+local k_prios   = base .. ":wait:prios"
 local k_active  = base .. ":active"
 local k_delayed = base .. ":delayed"
-local k_failed  = base .. ":failed"
 local k_gready  = base .. ":groups:ready"
 
+-- ungrouped jobs with priority > 0 wait in {queue}:wait:<priority>; :wait:prios holds the levels in use
+local function push_wait(job_id, prio)
+  if prio > 0 then
+    redis.call("ZADD", k_prios, prio, tostring(prio))
+    redis.call("RPUSH", k_wait .. ":" .. prio, job_id)
+  else
+    redis.call("RPUSH", k_wait, job_id)
+  end
+end
+
 local out = {}
+local ready = 0
+local retried = 0
 
 local function push(job_id, status, reason)
   table.insert(out, job_id)
@@ -67,17 +109,9 @@ for i = 1, count do
         -- cleanup any lane remnants (same as single)
         redis.call("ZREM", k_active, job_id)
         redis.call("ZREM", k_delayed, job_id)
-        redis.call("LREM", k_wait, 0, job_id)
-        redis.call("LREM", k_failed, 0, job_id)
-
-        redis.call("HSET", k_job,
-          "state", "wait",
-          "attempt", "0",
-          "updated_ms", tostring(now_ms),
-          "lease_token", "",
-          "lock_until_ms", "",
-          "due_ms", ""
-        )
+
+        redis.call("HSET", k_job, "state", "wait", "updated_ms", tostring(now_ms))
+        redis.call("HDEL", k_job, "attempt", "lease_token", "lock_until_ms", "due_ms")
 
         local gid = redis.call("HGET", k_job, "gid") or ""
 
@@ -94,15 +128,24 @@ for i = 1, count do
 
           if inflight < limit then
             redis.call("ZADD", k_gready, now_ms, gid)
+            ready = ready + 1
           end
         else
-          redis.call("RPUSH", k_wait, job_id)
+          push_wait(job_id, to_i(redis.call("HGET", k_job, "priority")))
+          ready = ready + 1
         end
 
+        retried = retried + 1
         push(job_id, "OK", nil)
       end
     end
   end
 end
 
+stat("failed", -retried)
+stat("waiting", retried)
+stat("total_retried", retried)
+
+notify(ready)
+
 return out
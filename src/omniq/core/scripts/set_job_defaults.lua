@@ -0,0 +1,22 @@
+local anchor = KEYS[1]
+
+local fields = {"max_attempts", "timeout_ms", "backoff_ms"}
+local minimum = {1, 1, 0}
+
+if #ARGV < #fields then
+  return {"ERR", "BAD_ARGS"}
+end
+
+local args = {}
+for i = 1, #fields do
+  local v = tonumber(ARGV[i])
+  if v == nil or v < minimum[i] then
+    return {"ERR", "BAD_" .. string.upper(fields[i])}
+  end
+  table.insert(args, fields[i])
+  table.insert(args, tostring(math.floor(v)))
+end
+
+redis.call("HSET", anchor, unpack(args))
+
+return {"OK"}
@@ -0,0 +1,10 @@
+local anchor = KEYS[1]
+
+local every = tonumber(ARGV[1] or "")
+if every == nil or every < 0 then
+  return {"ERR", "BAD_FAIR_EVERY"}
+end
+
+redis.call("HSET", anchor, "priority_fair_every", tostring(math.floor(every)))
+
+return {"OK"}
@@ -0,0 +1,59 @@
+local anchor = KEYS[1]
+local gid    = ARGV[1] or ""
+local rate   = tonumber(ARGV[2] or "")
+local burst  = tonumber(ARGV[3] or "")
+local now_ms = tonumber(ARGV[4] or "0")
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local base = derive_base(anchor)
+
+if rate == nil or rate < 0 then
+  return {"ERR", "BAD_RATE"}
+end
+
+if burst == nil or burst < 1 then
+  return {"ERR", "BAD_BURST"}
+end
+burst = math.floor(burst)
+
+local k_rate = base .. ":rate"
+if gid ~= "" then
+  k_rate = base .. ":g:" .. gid .. ":rate"
+end
+
+if rate == 0 then
+  redis.call("DEL", k_rate)
+  return {"OK"}
+end
+
+-- keep the current fill (capped at the new burst) so changing a limit does not hand out a fresh burst;
+-- the fill is brought up to now at the old rate first, so the new rate only refills time from here on
+local cur = redis.call("HMGET", k_rate, "rate_per_s", "burst", "tokens", "ts_ms")
+local tokens = tonumber(cur[3] or "")
+local old_rate = tonumber(cur[1] or "")
+local ts = tonumber(cur[4] or "")
+if tokens ~= nil and old_rate ~= nil and ts ~= nil and now_ms > ts then
+  tokens = math.min(tonumber(cur[2] or "") or burst, tokens + (now_ms - ts) * old_rate / 1000)
+end
+if tokens == nil or tokens > burst then
+  tokens = burst
+end
+if ts == nil or ts < now_ms then
+  ts = now_ms
+end
+
+redis.call("HSET", k_rate,
+  "rate_per_s", tostring(rate),
+  "burst", tostring(burst),
+  "tokens", tostring(tokens),
+  "ts_ms", tostring(ts)
+)
+
+return {"OK"}
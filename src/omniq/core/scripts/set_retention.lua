@@ -0,0 +1,21 @@
+local anchor = KEYS[1]
+
+local fields = {"completed_keep", "completed_max_age_ms", "failed_keep", "failed_max_age_ms"}
+
+if #ARGV < #fields then
+  return {"ERR", "BAD_ARGS"}
+end
+
+local args = {}
+for i = 1, #fields do
+  local v = tonumber(ARGV[i])
+  if v == nil or v < 0 then
+    return {"ERR", "BAD_" .. string.upper(fields[i])}
+  end
+  table.insert(args, fields[i])
+  table.insert(args, tostring(math.floor(v)))
+end
+
+redis.call("HSET", anchor, unpack(args))
+
+return {"OK"}
@@ -0,0 +1,90 @@
+local anchor    = KEYS[1]
+local now_ms    = tonumber(ARGV[1] or "0")
+local max_sweep = tonumber(ARGV[2] or "0")
+
+local DEFAULT_COMPLETED_KEEP = 100
+local MAX_SWEEP = 1000
+
+local function derive_base(a)
+  if a == nil or a == "" then return "" end
+  if string.sub(a, -5) == ":meta" then
+    return string.sub(a, 1, -6)
+  end
+  return a
+end
+
+local function to_i(v)
+  if v == false or v == nil or v == '' then return 0 end
+  local n = tonumber(v)
+  if n == nil then return 0 end
+  return math.floor(n)
+end
+
+local base = derive_base(anchor)
+
+local k_stats = base .. ":stats"
+
+local function stat(field, n)
+  if n ~= 0 then
+    redis.call("HINCRBY", k_stats, field, n)
+  end
+end
+
+-- queues written before the stats hash existed start a lane's counter from its length the first time
+-- it is touched; no stale entries exist yet at that point, so the length is the live count
+local function seed_stat(lane)
+  if redis.call("HEXISTS", k_stats, lane) == 0 then
+    redis.call("HSET", k_stats, lane, redis.call("LLEN", base .. ":" .. lane))
+  end
+end
+
+if max_sweep == nil or max_sweep <= 0 then
+  return {"OK", "0"}
+end
+
+if max_sweep > MAX_SWEEP then max_sweep = MAX_SWEEP end
+
+local policy = redis.call("HMGET", anchor, "completed_keep", "completed_max_age_ms", "failed_keep", "failed_max_age_ms")
+
+local completed_keep = DEFAULT_COMPLETED_KEEP
+if policy[1] then completed_keep = to_i(policy[1]) end
+
+local budget = max_sweep
+
+-- oldest entries sit at the tail; stop at the first live job inside the policy
+local function sweep(lane, keep, max_age_ms)
+  if keep <= 0 and max_age_ms <= 0 then return end
+
+  local k_lane = base .. ":" .. lane
+  local cutoff = now_ms - max_age_ms
+  local removed = 0
+
+  seed_stat(lane)
+  local live = to_i(redis.call("HGET", k_stats, lane))
+
+  while budget > 0 do
+    local job_id = redis.call("LINDEX", k_lane, -1)
+    if not job_id then break end
+
+    local k_job = base .. ":job:" .. job_id
+    local cur = redis.call("HMGET", k_job, "state", "updated_ms")
+
+    if cur[1] == lane then
+      local over = keep > 0 and live - removed > keep
+      local expired = max_age_ms > 0 and to_i(cur[2]) <= cutoff
+      if not over and not expired then break end
+      redis.call("DEL", k_job)
+      removed = removed + 1
+    end
+
+    redis.call("RPOP", k_lane)
+    budget = budget - 1
+  end
+
+  stat(lane, -removed)
+end
+
+sweep("completed", completed_keep, to_i(policy[2]))
+sweep("failed", to_i(policy[3]), to_i(policy[4]))
+
+return {"OK", tostring(max_sweep - budget)}
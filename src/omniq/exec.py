@@ -1,7 +1,8 @@
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 from .client import OmniqClient
+from .types import PublishJob
 
 @dataclass(frozen=True)
 class Exec:
@@ -14,12 +15,13 @@ class Exec:
         queue: str,
         payload: Any,
         job_id: Optional[str] = None,
-        max_attempts: int = 3,
-        timeout_ms: int = 60_000,
-        backoff_ms: int = 5_000,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
         due_ms: int = 0,
         gid: Optional[str] = None,
         group_limit: int = 0,
+        priority: int = 0,
     ) -> str:
         return self.client.publish(
             queue=queue,
@@ -31,6 +33,26 @@ class Exec:
             due_ms=due_ms,
             gid=gid,
             group_limit=group_limit,
+            priority=priority,
+        )
+
+    def publish_many(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Union[PublishJob, Dict[str, Any]]],
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        chunk_size: int = 100,
+    ) -> List[str]:
+        return self.client.publish_many(
+            queue=queue,
+            jobs=jobs,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            chunk_size=chunk_size,
         )
 
     def pause(self, *, queue: str) -> str:
@@ -50,3 +72,72 @@ class Exec:
         if not cid:
             raise ValueError("child_id is required (or provide default_child_id)")
         return int(self.client.child_ack(key=key, child_id=cid))
+
+@dataclass(frozen=True)
+class AsyncExec:
+    client: Any
+    default_child_id: str
+
+    async def publish(
+        self,
+        *,
+        queue: str,
+        payload: Any,
+        job_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        due_ms: int = 0,
+        gid: Optional[str] = None,
+        group_limit: int = 0,
+        priority: int = 0,
+    ) -> str:
+        return await self.client.publish(
+            queue=queue,
+            payload=payload,
+            job_id=job_id,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            due_ms=due_ms,
+            gid=gid,
+            group_limit=group_limit,
+            priority=priority,
+        )
+
+    async def publish_many(
+        self,
+        *,
+        queue: str,
+        jobs: Sequence[Union[PublishJob, Dict[str, Any]]],
+        max_attempts: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        backoff_ms: Optional[int] = None,
+        chunk_size: int = 100,
+    ) -> List[str]:
+        return await self.client.publish_many(
+            queue=queue,
+            jobs=jobs,
+            max_attempts=max_attempts,
+            timeout_ms=timeout_ms,
+            backoff_ms=backoff_ms,
+            chunk_size=chunk_size,
+        )
+
+    async def pause(self, *, queue: str) -> str:
+        return await self.client.pause(queue=queue)
+
+    async def resume(self, *, queue: str) -> int:
+        return await self.client.resume(queue=queue)
+
+    async def is_paused(self, *, queue: str) -> bool:
+        return await self.client.is_paused(queue=queue)
+
+    async def childs_init(self, key: str, expected: int) -> None:
+        await self.client.childs_init(key=key, expected=int(expected))
+
+    async def child_ack(self, key: str, child_id: Optional[str] = None) -> int:
+        cid = (child_id or self.default_child_id or "").strip()
+        if not cid:
+            raise ValueError("child_id is required (or provide default_child_id)")
+        return int(await self.client.child_ack(key=key, child_id=cid))
@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ._ops import OmniqOps
+from .clock import now_ms
+
+def _lease_lost(msg: str) -> bool:
+    msg_u = (msg or "").upper()
+    return ("NOT_ACTIVE" in msg_u) or ("TOKEN_MISMATCH" in msg_u)
+
+@dataclass
+class _Lease:
+    job_id: str
+    lease_token: str
+    interval_s: float
+    queue: str
+    flags: Dict[str, bool] = field(default_factory=lambda: {"lost": False})
+
+HEARTBEAT_BATCH = 100
+
+class _HeartbeatQueue:
+    def __init__(self, client: Any, *, queue: str):
+        self._client = client
+        self._queue = queue
+        self._heap: List[Tuple[float, int, _Lease]] = []
+        self._leases: Dict[str, _Lease] = {}
+        self._seq = 0
+        self._stopped = False
+
+    def _add(self, job_id: str, lease_token: str, interval_s: float, first_delay_s: Optional[float], queue: Optional[str]) -> _Lease:
+        lease = _Lease(job_id=job_id, lease_token=lease_token, interval_s=max(0.01, float(interval_s)), queue=queue or self._queue)
+        if first_delay_s is None:
+            first_delay_s = lease.interval_s
+        self._leases[job_id] = lease
+        self._schedule(lease, max(0.0, float(first_delay_s)))
+        return lease
+
+    def _schedule(self, lease: _Lease, delay_s: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (time.monotonic() + delay_s, self._seq, lease))
+
+    def _is_current(self, lease: _Lease) -> bool:
+        return self._leases.get(lease.job_id) is lease
+
+    def _due_in_s(self) -> Optional[float]:
+        while self._heap:
+            due, _, lease = self._heap[0]
+            if self._is_current(lease):
+                return due - time.monotonic()
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self) -> List[_Lease]:
+        now = time.monotonic()
+        batch: List[_Lease] = []
+        while self._heap and len(batch) < HEARTBEAT_BATCH:
+            due, _, lease = self._heap[0]
+            if not self._is_current(lease):
+                heapq.heappop(self._heap)
+                continue
+            if due > now + lease.interval_s * 0.1:
+                break
+            heapq.heappop(self._heap)
+            batch.append(lease)
+        return batch
+
+    def _by_queue(self, batch: List[_Lease]) -> Dict[str, List[Tuple[str, str]]]:
+        # leases of a sharded queue live in different partitions; one heartbeat_batch per partition
+        out: Dict[str, List[Tuple[str, str]]] = {}
+        for lease in batch:
+            out.setdefault(lease.queue, []).append((lease.job_id, lease.lease_token))
+        return out
+
+    def _apply(self, batch: List[_Lease], results: Optional[List[Tuple[str, str, Any]]]) -> None:
+        by_id = {}
+        for job_id, status, value in results or []:
+            by_id[job_id] = (status, value)
+
+        for lease in batch:
+            if not self._is_current(lease):
+                continue
+            status, value = by_id.get(lease.job_id, ("ERR", "UNKNOWN"))
+            if status == "OK":
+                self._schedule(lease, lease.interval_s)
+            elif _lease_lost(str(value)):
+                lease.flags["lost"] = True
+                self._leases.pop(lease.job_id, None)
+            else:
+                self._schedule(lease, min(0.2, lease.interval_s))
+
+class HeartbeatScheduler(_HeartbeatQueue):
+    def __init__(self, client: Any, *, queue: str):
+        super().__init__(client, queue=queue)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def add(self, *, job_id: str, lease_token: str, interval_s: float, first_delay_s: Optional[float] = None, queue: Optional[str] = None) -> Dict[str, bool]:
+        with self._cond:
+            lease = self._add(job_id, lease_token, interval_s, first_delay_s, queue)
+            self._cond.notify()
+        return lease.flags
+
+    def remove(self, job_id: str) -> None:
+        with self._cond:
+            self._leases.pop(job_id, None)
+
+    def active(self) -> int:
+        with self._cond:
+            return len(self._leases)
+
+    def _next_due(self) -> List[_Lease]:
+        with self._cond:
+            while not self._stopped:
+                delay = self._due_in_s()
+                if delay is None:
+                    self._cond.wait()
+                    continue
+                if delay <= 0:
+                    return self._pop_due()
+                self._cond.wait(delay)
+            return []
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_due()
+            if not batch:
+                return
+
+            results: List[Tuple[str, str, Any]] = []
+            for queue, jobs in self._by_queue(batch).items():
+                try:
+                    results.extend(self._client.heartbeat_batch(queue=queue, jobs=jobs))
+                except Exception:
+                    pass
+
+            with self._cond:
+                self._apply(batch, results)
+
+class AsyncHeartbeatScheduler(_HeartbeatQueue):
+    def __init__(self, client: Any, *, queue: str):
+        super().__init__(client, queue=queue)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        self._stopped = True
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    def add(self, *, job_id: str, lease_token: str, interval_s: float, first_delay_s: Optional[float] = None, queue: Optional[str] = None) -> Dict[str, bool]:
+        lease = self._add(job_id, lease_token, interval_s, first_delay_s, queue)
+        self._wake.set()
+        return lease.flags
+
+    def remove(self, job_id: str) -> None:
+        self._leases.pop(job_id, None)
+
+    def active(self) -> int:
+        return len(self._leases)
+
+    async def _run(self) -> None:
+        while not self._stopped:
+            delay = self._due_in_s()
+            if delay is None or delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = self._pop_due()
+            results: List[Tuple[str, str, Any]] = []
+            for queue, jobs in self._by_queue(batch).items():
+                try:
+                    results.extend(await self._client.heartbeat_batch(queue=queue, jobs=jobs))
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    pass
+
+            self._apply(batch, results)
+
+def _lease_heartbeat_s(lock_until_ms: int, heartbeat_interval_s: Optional[float]) -> Tuple[float, float]:
+    remaining_ms = max(0, int(lock_until_ms) - now_ms())
+    if heartbeat_interval_s is not None:
+        interval_s = float(heartbeat_interval_s)
+    else:
+        interval_s = OmniqOps.derive_heartbeat_interval_s(remaining_ms)
+    return interval_s, min(interval_s, remaining_ms / 2000.0)
@@ -1,4 +1,9 @@
-from typing import Any
+import zlib
+from typing import Any, Dict, List, Optional
+
+SHARD_SEP = "#"
+MAX_SHARDS = 1024
+MAX_PRIORITY = 9
 
 def queue_base(queue_name: str) -> str:
     if "{" in queue_name and "}" in queue_name:
@@ -8,6 +13,39 @@ def queue_base(queue_name: str) -> str:
 def queue_anchor(queue_name: str) -> str:
     return queue_base(queue_name) + ":meta"
 
+def shard_queue(queue_name: str, shard: int) -> str:
+    return queue_name + SHARD_SEP + str(int(shard))
+
+def queue_partitions(queue_name: str, shards: int = 1) -> List[str]:
+    if shards <= 1:
+        return [queue_name]
+    return [shard_queue(queue_name, i) for i in range(shards)]
+
+def shard_for_gid(gid: str, shards: int) -> int:
+    # stable across processes and languages (unlike hash()), so a gid always lands on one partition
+    return zlib.crc32(gid.encode("utf-8")) % shards
+
+def check_shards(shards: Optional[Dict[str, int]]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for queue_name, n in (shards or {}).items():
+        if not queue_name or "{" in queue_name or "}" in queue_name:
+            raise ValueError(f"shards queue name must be non-empty and must not contain '{{' or '}}': {queue_name!r}")
+        n = int(n)
+        if n < 1 or n > MAX_SHARDS:
+            raise ValueError(f"shards[{queue_name!r}] must be between 1 and {MAX_SHARDS}")
+        out[queue_name] = n
+    return out
+
+def check_priority(priority: int) -> int:
+    priority = int(priority or 0)
+    if priority < 0 or priority > MAX_PRIORITY:
+        raise ValueError(f"priority must be between 0 and {MAX_PRIORITY}")
+    return priority
+
+def wait_lane(priority: int) -> str:
+    # priority 0 keeps the plain wait list; higher levels get their own list next to it
+    return "wait" if priority <= 0 else f"wait:{int(priority)}"
+
 def as_str(v: Any) -> str:
     if v is None:
         return ""
@@ -0,0 +1,257 @@
+import argparse
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+from .clock import now_ms
+from .ids import new_ulid
+
+LEADER_LEASE_MS = 5000
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{new_ulid()}"
+
+def _earliest(*scores: Optional[int]) -> Optional[int]:
+    due = [s for s in scores if s is not None]
+    return min(due) if due else None
+
+class _MaintainerBase:
+    def __init__(
+        self,
+        client: Any,
+        *,
+        queue: str,
+        owner: Optional[str] = None,
+        lease_ms: int = LEADER_LEASE_MS,
+        promote_batch: int = 1000,
+        reap_batch: int = 1000,
+        sweep_batch: int = 1000,
+        max_interval_s: float = 1.0,
+    ):
+        if lease_ms <= 0:
+            raise ValueError("lease_ms must be > 0")
+
+        self.client = client
+        self.queue = queue
+        self.owner = owner or default_owner()
+        self.lease_ms = int(lease_ms)
+        self.promote_batch = int(promote_batch)
+        self.reap_batch = int(reap_batch)
+        self.sweep_batch = int(sweep_batch)
+        self.max_interval_s = max(0.01, float(max_interval_s))
+        self.leader = False
+        self._next_at = 0.0
+
+    def due_in_s(self) -> float:
+        return max(0.0, self._next_at - time.monotonic())
+
+    def _renew_s(self) -> float:
+        return min(self.max_interval_s, self.lease_ms / 3000.0)
+
+    def _follower_s(self) -> float:
+        return self.lease_ms / 3000.0
+
+    def _leader_wait_s(self, promoted: int, reaped: int, swept: int, due_ms: Optional[int]) -> float:
+        if promoted >= self.promote_batch or reaped >= self.reap_batch or (self.sweep_batch > 0 and swept >= self.sweep_batch):
+            return 0.0
+        wait_s = self._renew_s()
+        if due_ms is not None:
+            wait_s = min(wait_s, max(0.0, (due_ms - now_ms()) / 1000.0))
+        return wait_s
+
+    def _schedule(self, now: float, wait_s: float) -> float:
+        self._next_at = now + wait_s
+        return wait_s
+
+class QueueMaintainer(_MaintainerBase):
+    def tick(self) -> float:
+        now = time.monotonic()
+        if now < self._next_at:
+            return self._next_at - now
+
+        try:
+            self.leader = self.client.leader_acquire(queue=self.queue, owner=self.owner, lease_ms=self.lease_ms)
+        except Exception:
+            self.leader = False
+            return self._schedule(now, self._renew_s())
+
+        if not self.leader:
+            return self._schedule(now, self._follower_s())
+
+        try:
+            promoted, next_delayed_ms = self.client.promote_delayed_next(queue=self.queue, max_promote=self.promote_batch)
+            reaped, next_active_ms = self.client.reap_expired_next(queue=self.queue, max_reap=self.reap_batch)
+            swept = self.client.sweep_retention(queue=self.queue, max_sweep=self.sweep_batch) if self.sweep_batch > 0 else 0
+        except Exception:
+            return self._schedule(now, self._renew_s())
+
+        return self._schedule(now, self._leader_wait_s(promoted, reaped, swept, _earliest(next_delayed_ms, next_active_ms)))
+
+    def release(self) -> None:
+        if not self.leader:
+            return
+        self.leader = False
+        try:
+            self.client.leader_release(queue=self.queue, owner=self.owner)
+        except Exception:
+            pass
+
+class AsyncQueueMaintainer(_MaintainerBase):
+    async def tick(self) -> float:
+        now = time.monotonic()
+        if now < self._next_at:
+            return self._next_at - now
+
+        try:
+            self.leader = await self.client.leader_acquire(queue=self.queue, owner=self.owner, lease_ms=self.lease_ms)
+        except Exception:
+            self.leader = False
+            return self._schedule(now, self._renew_s())
+
+        if not self.leader:
+            return self._schedule(now, self._follower_s())
+
+        try:
+            promoted, next_delayed_ms = await self.client.promote_delayed_next(queue=self.queue, max_promote=self.promote_batch)
+            reaped, next_active_ms = await self.client.reap_expired_next(queue=self.queue, max_reap=self.reap_batch)
+            swept = await self.client.sweep_retention(queue=self.queue, max_sweep=self.sweep_batch) if self.sweep_batch > 0 else 0
+        except Exception:
+            return self._schedule(now, self._renew_s())
+
+        return self._schedule(now, self._leader_wait_s(promoted, reaped, swept, _earliest(next_delayed_ms, next_active_ms)))
+
+    async def release(self) -> None:
+        if not self.leader:
+            return
+        self.leader = False
+        try:
+            await self.client.leader_release(queue=self.queue, owner=self.owner)
+        except Exception:
+            pass
+
+def run_maintenance(
+    client: Any,
+    *,
+    queues: Sequence[str],
+    lease_ms: int = LEADER_LEASE_MS,
+    promote_batch: int = 1000,
+    reap_batch: int = 1000,
+    sweep_batch: int = 1000,
+    max_interval_s: float = 1.0,
+    verbose: bool = False,
+    logger: Callable[[str], None] = print,
+    stop_on_ctrl_c: bool = True,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    from .consumer import StopController, _install_stop_signals, _restore_stop_signals, _safe_log
+
+    if not queues:
+        raise ValueError("run_maintenance requires at least one queue")
+
+    owner = default_owner()
+    maintainers = [
+        QueueMaintainer(
+            client,
+            queue=part,
+            owner=owner,
+            lease_ms=lease_ms,
+            promote_batch=promote_batch,
+            reap_batch=reap_batch,
+            sweep_batch=sweep_batch,
+            max_interval_s=max_interval_s,
+        )
+        for q in queues
+        for part in client.ops.partitions(q)
+    ]
+    leaders = {m.queue: False for m in maintainers}
+
+    ctrl = StopController(stop=False, sigint_count=0)
+
+    prev_sigterm = None
+    prev_sigint = None
+
+    try:
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            prev_sigterm, prev_sigint = _install_stop_signals(
+                ctrl,
+                queue=",".join(queues),
+                drain=True,
+                verbose=verbose,
+                logger=logger,
+                tag="maintenance",
+            )
+
+        while not ctrl.stop and not (stop_event is not None and stop_event.is_set()):
+            wait_s = max_interval_s
+            for m in maintainers:
+                wait_s = min(wait_s, m.tick())
+                if verbose and m.leader != leaders[m.queue]:
+                    state = "leader" if m.leader else "follower"
+                    _safe_log(logger, f"[maintenance] queue={m.queue} now {state} owner={owner}")
+                    leaders[m.queue] = m.leader
+
+            if wait_s > 0:
+                if stop_event is not None:
+                    stop_event.wait(wait_s)
+                else:
+                    time.sleep(wait_s)
+
+    except KeyboardInterrupt:
+        if verbose:
+            _safe_log(logger, "[maintenance] KeyboardInterrupt; exiting now.")
+
+    finally:
+        for m in maintainers:
+            m.release()
+
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            _restore_stop_signals(prev_sigterm, prev_sigint)
+
+        try:
+            client.close()
+        except Exception:
+            pass
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m omniq.maintenance", description="OmniQ promote/reap/retention scheduler")
+    parser.add_argument("--queue", action="append", required=True, help="queue name (repeatable)")
+    parser.add_argument("--shards", action="append", default=[], metavar="QUEUE=N", help="sharded queue partition count (repeatable)")
+    parser.add_argument("--redis-url", default=os.environ.get("OMNIQ_REDIS_URL"))
+    parser.add_argument("--host", default=os.environ.get("OMNIQ_REDIS_HOST"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("OMNIQ_REDIS_PORT", "6379")))
+    parser.add_argument("--lease-ms", type=int, default=LEADER_LEASE_MS)
+    parser.add_argument("--promote-batch", type=int, default=1000)
+    parser.add_argument("--reap-batch", type=int, default=1000)
+    parser.add_argument("--sweep-batch", type=int, default=1000, help="retention sweep per tick (0 disables)")
+    parser.add_argument("--max-interval-s", type=float, default=1.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.redis_url and not args.host:
+        parser.error("--redis-url or --host is required")
+
+    shards = {}
+    for spec in args.shards:
+        name, sep, n = spec.rpartition("=")
+        if not sep or not name or not n.isdigit():
+            parser.error(f"--shards expects QUEUE=N, got {spec!r}")
+        shards[name] = int(n)
+
+    from .client import OmniqClient
+    client = OmniqClient(redis_url=args.redis_url, host=args.host, port=args.port, client_name="omniq-maintenance", shards=shards)
+
+    run_maintenance(
+        client,
+        queues=args.queue,
+        lease_ms=args.lease_ms,
+        promote_batch=args.promote_batch,
+        reap_batch=args.reap_batch,
+        sweep_batch=args.sweep_batch,
+        max_interval_s=args.max_interval_s,
+        verbose=args.verbose,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from .helper import as_str, queue_base
+from .helper import as_str, check_priority, queue_base, shard_for_gid, wait_lane
+from ._ops import JOB_DEFAULT_FIELDS, _parse_job_defaults
+
+LIST_LANES = ("wait", "gwait", "failed", "completed")
+ZSET_LANES = ("active", "delayed")
 
 @dataclass(frozen=True)
 class QueueCounts:
@@ -11,6 +15,20 @@ class QueueCounts:
     delayed: int
     completed: int
     failed: int
+    by_priority: Dict[int, int] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class QueueStats:
+    paused: bool
+    waiting: int
+    active: int
+    delayed: int
+    completed: int
+    failed: int
+    total_enqueued: int
+    total_completed: int
+    total_failed: int
+    total_retried: int
 
 @dataclass(frozen=True)
 class GroupStatus:
@@ -24,6 +42,7 @@ class ActiveSample:
     gid: str
     lock_until_ms: int
     attempt: int
+    queue: str = ""
 
 @dataclass(frozen=True)
 class DelayedSample:
@@ -31,6 +50,7 @@ class DelayedSample:
     gid: str
     due_ms: int
     attempt: int
+    queue: str = ""
 
 @dataclass(frozen=True)
 class FailedSample:
@@ -40,6 +60,14 @@ class FailedSample:
     max_attempts: int
     failed_at_ms: int
     last_error: str
+    queue: str = ""
+
+@dataclass(frozen=True)
+class LaneItem:
+    job_id: str
+    score: Optional[int]
+    fields: Dict[str, str]
+    cursor: str
 
 @dataclass(frozen=True)
 class JobInfo:
@@ -56,6 +84,8 @@ class JobInfo:
     payload: str
     last_error: str
     updated_ms: int
+    queue: str = ""
+    priority: int = 0
 
 class QueueMonitor:
     def __init__(self, uq):
@@ -71,135 +101,204 @@ class QueueMonitor:
     def _base(self, queue: str) -> str:
         return queue_base(queue)
 
-    def counts(self, queue: str) -> QueueCounts:
-        base = self._base(queue)
-        r = self._r
+    def _partitions(self, queue: str) -> List[str]:
+        partitions = getattr(self._uq, "partitions", None)
+        return partitions(queue) if callable(partitions) else [queue]
 
-        paused = r.exists(f"{base}:paused") == 1
+    def _gid_partition(self, parts: List[str], gid: str) -> str:
+        return parts[shard_for_gid(gid, len(parts))] if len(parts) > 1 else parts[0]
 
-        waiting = int(r.llen(f"{base}:wait") or 0)
-        active = int(r.zcard(f"{base}:active") or 0)
-        delayed = int(r.zcard(f"{base}:delayed") or 0)
-        completed = int(r.llen(f"{base}:completed") or 0)
-        failed = int(r.llen(f"{base}:failed") or 0)
+    def stats(self, queue: str) -> QueueStats:
+        parts = self._partitions(queue)
 
-        return QueueCounts(
+        p = self._r.pipeline(transaction=False)
+        for part in parts:
+            base = self._base(part)
+            p.exists(f"{base}:paused")
+            p.hgetall(f"{base}:stats")
+        rows = p.execute()
+
+        # a sharded queue reports the sum of its partitions; paused only when all of them are
+        paused = all(int(rows[i] or 0) == 1 for i in range(0, len(rows), 2))
+        h: Dict[str, int] = {}
+        for raw in rows[1::2]:
+            for k, v in (raw or {}).items():
+                k_s = as_str(k)
+                h[k_s] = h.get(k_s, 0) + max(0, int(as_str(v) or "0"))
+
+        def n(field: str) -> int:
+            return h.get(field, 0)
+
+        return QueueStats(
             paused=paused,
-            waiting=waiting,
-            active=active,
-            delayed=delayed,
-            completed=completed,
-            failed=failed,
+            waiting=n("waiting"),
+            active=n("active"),
+            delayed=n("delayed"),
+            completed=n("completed"),
+            failed=n("failed"),
+            total_enqueued=n("total_enqueued"),
+            total_completed=n("total_completed"),
+            total_failed=n("total_failed"),
+            total_retried=n("total_retried"),
         )
 
+    def counts(self, queue: str) -> QueueCounts:
+        s = self.stats(queue)
+
+        return QueueCounts(
+            paused=s.paused,
+            waiting=s.waiting,
+            active=s.active,
+            delayed=s.delayed,
+            completed=s.completed,
+            failed=s.failed,
+            by_priority=self.priority_depth(queue),
+        )
+
+    def priority_depth(self, queue: str) -> Dict[int, int]:
+        # LLEN per lane: O(1) each, but removed / retried ids are only dropped when reserve reaches them
+        r = self._r
+        out: Dict[int, int] = {}
+        for part in self._partitions(queue):
+            base = self._base(part)
+            levels = [0] + [int(as_str(v)) for v in r.zrange(f"{base}:wait:prios", 0, -1)]
+
+            p = r.pipeline(transaction=False)
+            for level in levels:
+                p.llen(f"{base}:{wait_lane(level)}")
+            for level, n in zip(levels, p.execute()):
+                if int(n or 0) > 0:
+                    out[level] = out.get(level, 0) + int(n)
+        return out
+
     def groups_ready(self, queue: str, limit: int = 200) -> List[str]:
-        base = self._base(queue)
         r = self._r
         limit = max(1, min(int(limit), 2000))
+        out: List[str] = []
         try:
-            gids = r.zrange(f"{base}:groups:ready", 0, limit - 1)
-            return [as_str(g) for g in gids if g]
+            for part in self._partitions(queue):
+                gids = r.zrange(f"{self._base(part)}:groups:ready", 0, limit - len(out) - 1)
+                out.extend(as_str(g) for g in gids if g)
+                if len(out) >= limit:
+                    break
+            return out
         except Exception:
             return []
 
     def group_status(self, queue: str, gids: List[str], default_limit: int = 1) -> List[GroupStatus]:
-        base = self._base(queue)
-        r = self._r
+        parts = self._partitions(queue)
+        gids_s = [as_str(gid) for gid in gids]
+        if not gids_s:
+            return []
 
-        out: List[GroupStatus] = []
-        for gid in gids:
-            gid_s = as_str(gid)
+        p = self._r.pipeline(transaction=False)
+        for gid_s in gids_s:
+            base = self._base(self._gid_partition(parts, gid_s))
+            p.get(f"{base}:g:{gid_s}:inflight")
+            p.get(f"{base}:g:{gid_s}:limit")
+        rows = p.execute()
 
-            inflight = int(as_str(r.get(f"{base}:g:{gid_s}:inflight")) or "0")
+        out: List[GroupStatus] = []
+        for i, gid_s in enumerate(gids_s):
+            inflight = int(as_str(rows[2 * i]) or "0")
 
-            raw = r.get(f"{base}:g:{gid_s}:limit")
-            gl = int(as_str(raw) or "0")
+            gl = int(as_str(rows[2 * i + 1]) or "0")
             limit = gl if gl > 0 else int(default_limit)
 
             out.append(GroupStatus(gid=gid_s, inflight=inflight, limit=limit))
         return out
 
-    def sample_active(self, queue: str, limit: int = 50) -> List[ActiveSample]:
-        base = self._base(queue)
-        r = self._r
-        limit = max(1, min(int(limit), 500))
+    def _job_fields(self, base: str, job_ids: List[str], *fields: str) -> List[List[Any]]:
+        if not job_ids:
+            return []
+        p = self._r.pipeline(transaction=False)
+        for jid_s in job_ids:
+            p.hmget(f"{base}:job:{jid_s}", *fields)
+        return p.execute()
 
-        job_ids = r.zrange(f"{base}:active", 0, limit - 1)
-        out: List[ActiveSample] = []
+    def _job_defaults(self, base: str) -> Dict[str, int]:
+        d = _parse_job_defaults(self._r.hmget(f"{base}:meta", *JOB_DEFAULT_FIELDS))
+        return {"max_attempts": d.max_attempts, "timeout_ms": d.timeout_ms, "backoff_ms": d.backoff_ms}
+
+    def _sample_active(self, queue: str, limit: int) -> List[ActiveSample]:
+        base = self._base(queue)
 
-        for jid in job_ids:
-            jid_s = as_str(jid)
-            k_job = f"{base}:job:{jid_s}"
-            gid, attempt = r.hmget(k_job, "gid", "attempt")
-            score = r.zscore(f"{base}:active", jid) or 0
+        rows = self._r.zrange(f"{base}:active", 0, limit - 1, withscores=True)
+        fields = self._job_fields(base, [as_str(jid) for jid, _ in rows], "gid", "attempt")
 
+        out: List[ActiveSample] = []
+        for (jid, score), (gid, attempt) in zip(rows, fields):
             out.append(
                 ActiveSample(
-                    job_id=jid_s,
+                    job_id=as_str(jid),
                     gid=as_str(gid),
-                    lock_until_ms=int(score),
+                    lock_until_ms=int(score or 0),
                     attempt=int(as_str(attempt) or "0"),
+                    queue=queue,
                 )
             )
         return out
 
-    def sample_delayed(self, queue: str, limit: int = 50) -> List[DelayedSample]:
+    def _sample_delayed(self, queue: str, limit: int) -> List[DelayedSample]:
         base = self._base(queue)
-        r = self._r
-        limit = max(1, min(int(limit), 500))
-
-        job_ids = r.zrange(f"{base}:delayed", 0, limit - 1)
-        out: List[DelayedSample] = []
 
-        for jid in job_ids:
-            jid_s = as_str(jid)
-            k_job = f"{base}:job:{jid_s}"
-            gid, attempt = r.hmget(k_job, "gid", "attempt")
-            due = r.zscore(f"{base}:delayed", jid) or 0
+        rows = self._r.zrange(f"{base}:delayed", 0, limit - 1, withscores=True)
+        fields = self._job_fields(base, [as_str(jid) for jid, _ in rows], "gid", "attempt")
 
+        out: List[DelayedSample] = []
+        for (jid, due), (gid, attempt) in zip(rows, fields):
             out.append(
                 DelayedSample(
-                    job_id=jid_s,
+                    job_id=as_str(jid),
                     gid=as_str(gid),
-                    due_ms=int(due),
+                    due_ms=int(due or 0),
                     attempt=int(as_str(attempt) or "0"),
+                    queue=queue,
                 )
             )
         return out
 
-    def sample_failed(self, queue: str, limit: int = 50) -> List[FailedSample]:
+    def _sample_failed(self, queue: str, limit: int) -> List[FailedSample]:
         base = self._base(queue)
-        r = self._r
-        limit = max(1, min(int(limit), 500))
 
         try:
-            job_ids = r.lrange(f"{base}:failed", 0, limit - 1)
+            job_ids = [as_str(jid) for jid in self._r.lrange(f"{base}:failed", 0, limit - 1)]
         except Exception:
             return []
 
+        try:
+            fields = self._job_fields(
+                base,
+                job_ids,
+                "state",
+                "gid",
+                "attempt",
+                "max_attempts",
+                "last_error",
+                "last_error_ms",
+                "updated_ms",
+            )
+        except Exception:
+            fields = [["failed"] + [None] * 6 for _ in job_ids]
+
         out: List[FailedSample] = []
+        seen = set()
+        defaults = None
 
-        for jid in job_ids:
-            jid_s = as_str(jid)
-            k_job = f"{base}:job:{jid_s}"
-
-            try:
-                gid, attempt, max_attempts, last_error, last_error_ms, updated_ms = r.hmget(
-                    k_job,
-                    "gid",
-                    "attempt",
-                    "max_attempts",
-                    "last_error",
-                    "last_error_ms",
-                    "updated_ms",
-                )
-            except Exception:
-                gid = attempt = max_attempts = last_error = last_error_ms = updated_ms = None
+        for jid_s, (state, gid, attempt, max_attempts, last_error, last_error_ms, updated_ms) in zip(job_ids, fields):
+            if as_str(state) != "failed" or jid_s in seen:
+                continue
+            seen.add(jid_s)
 
             fam = int(as_str(last_error_ms) or "0")
             if fam <= 0:
                 fam = int(as_str(updated_ms) or "0")
 
+            if max_attempts is None:
+                if defaults is None:
+                    defaults = self._job_defaults(base)
+                max_attempts = defaults["max_attempts"]
+
             out.append(
                 FailedSample(
                     job_id=jid_s,
@@ -208,32 +307,220 @@ class QueueMonitor:
                     max_attempts=int(as_str(max_attempts) or "0"),
                     failed_at_ms=fam,
                     last_error=as_str(last_error),
+                    queue=queue,
                 )
             )
 
         return out
 
+    def sample_active(self, queue: str, limit: int = 50) -> List[ActiveSample]:
+        limit = max(1, min(int(limit), 500))
+        parts = self._partitions(queue)
+        out = [s for part in parts for s in self._sample_active(part, limit)]
+        if len(parts) > 1:
+            out.sort(key=lambda s: s.lock_until_ms)
+        return out[:limit]
+
+    def sample_delayed(self, queue: str, limit: int = 50) -> List[DelayedSample]:
+        limit = max(1, min(int(limit), 500))
+        parts = self._partitions(queue)
+        out = [s for part in parts for s in self._sample_delayed(part, limit)]
+        if len(parts) > 1:
+            out.sort(key=lambda s: s.due_ms)
+        return out[:limit]
+
+    def sample_failed(self, queue: str, limit: int = 50) -> List[FailedSample]:
+        limit = max(1, min(int(limit), 500))
+        parts = self._partitions(queue)
+        out = [s for part in parts for s in self._sample_failed(part, limit)]
+        if len(parts) > 1:
+            out.sort(key=lambda s: s.failed_at_ms, reverse=True)
+        return out[:limit]
+
+    def _lane_key(self, base: str, lane: str, gid: str, priority: int) -> str:
+        if priority:
+            if lane != "wait":
+                raise ValueError("iter_lane priority only applies to lane='wait'")
+            return f"{base}:{wait_lane(check_priority(priority))}"
+        if lane == "gwait":
+            if not gid:
+                raise ValueError("iter_lane lane='gwait' requires gid")
+            return f"{base}:g:{gid}:wait"
+        if lane in LIST_LANES or lane in ZSET_LANES:
+            return f"{base}:{lane}"
+        raise ValueError(f"iter_lane unknown lane: {lane}")
+
+    def _list_anchor(self, key: str, index: int, jid: str, head_push: bool) -> int:
+        # find the cursor's job again after the list moved: failed / completed grow at the head, so it can only
+        # have moved right; wait lanes lose their head, so it can only have moved left
+        positions = self._r.lpos(key, jid, count=0) or []
+        if not positions:
+            # popped from the head of a wait lane, or trimmed / removed from failed / completed, where
+            # whatever followed it has shifted into its slot
+            return index if head_push else 0
+        moved = [p for p in positions if (p >= index if head_push else p <= index)]
+        if moved:
+            return (min(moved) if head_push else max(moved)) + 1
+        return min(positions, key=lambda p: abs(p - index)) + 1
+
+    def _list_pages(self, key: str, page_size: int, cursor: str, head_push: bool) -> Iterator[List[Tuple[str, Optional[int], str]]]:
+        # cursors are "index:job_id"; every page checks that the last job is still where it was and
+        # re-finds it with LPOS when consumers or producers moved the list in between
+        anchor: Optional[Tuple[int, str]] = None
+        start = 0
+        if cursor:
+            index_s, _, jid = cursor.partition(":")
+            anchor = (int(index_s), jid)
+            start = anchor[0] + 1
+
+        while True:
+            if anchor is None:
+                ids = self._r.lrange(key, start, start + page_size - 1)
+            else:
+                p = self._r.pipeline(transaction=False)
+                p.lindex(key, anchor[0])
+                p.lrange(key, start, start + page_size - 1)
+                at, ids = p.execute()
+                if as_str(at) != anchor[1]:
+                    start = self._list_anchor(key, anchor[0], anchor[1], head_push)
+                    ids = self._r.lrange(key, start, start + page_size - 1)
+            if not ids:
+                return
+            page = [(as_str(jid), None, f"{start + i}:{as_str(jid)}") for i, jid in enumerate(ids)]
+            yield page
+            if len(ids) < page_size:
+                return
+            anchor = (start + len(ids) - 1, page[-1][0])
+            start += len(ids)
+
+    def _zset_pages(self, key: str, page_size: int, cursor: str) -> Iterator[List[Tuple[str, Optional[int], str]]]:
+        min_score = "-inf"
+        after: Optional[Tuple[int, str]] = None
+        if cursor:
+            score_s, _, member = cursor.partition(":")
+            after = (int(score_s), member)
+            min_score = score_s
+
+        offset = 0
+        while True:
+            rows = self._r.zrangebyscore(key, min_score, "+inf", start=offset, num=page_size, withscores=True)
+            if not rows:
+                return
+
+            page: List[Tuple[str, Optional[int], str]] = []
+            for jid, score in rows:
+                jid_s = as_str(jid)
+                score_i = int(score)
+                if after is not None and (score_i, jid_s) <= after:
+                    continue
+                page.append((jid_s, score_i, f"{score_i}:{jid_s}"))
+
+            if page:
+                yield page
+                last = page[-1][1]
+                if str(last) == min_score:
+                    offset += len(rows)
+                else:
+                    min_score = str(last)
+                    offset = sum(1 for _, score in rows if int(score) == last)
+                after = (page[-1][1], page[-1][0])
+            else:
+                offset += len(rows)
+
+            if len(rows) < page_size:
+                return
+
+    def iter_lane(
+        self,
+        queue: str,
+        lane: str,
+        *,
+        page_size: int = 500,
+        fields: Sequence[str] = ("gid", "attempt"),
+        cursor: str = "",
+        gid: str = "",
+        priority: int = 0,
+    ) -> Iterator[LaneItem]:
+        if len(self._partitions(queue)) > 1:
+            raise ValueError(f"iter_lane needs a partition of sharded queue {queue!r} (see partitions())")
+
+        base = self._base(queue)
+        key = self._lane_key(base, lane, as_str(gid), int(priority))
+        page_size = max(1, min(int(page_size), 5000))
+        fields = list(fields)
+
+        # list lanes skip removed / retried jobs lazily, so filter out stale ids
+        check_live = lane in LIST_LANES
+        query = ["state", "gid"] + fields if check_live else fields
+        want_state = "wait" if lane == "gwait" else lane
+        want_gid = as_str(gid) if lane in ("wait", "gwait") else None
+
+        if lane in ZSET_LANES:
+            pages = self._zset_pages(key, page_size, cursor)
+        else:
+            pages = self._list_pages(key, page_size, cursor, head_push=lane in ("failed", "completed"))
+
+        for page in pages:
+            seen = set()
+            if query:
+                rows = self._job_fields(base, [jid for jid, _, _ in page], *query)
+            else:
+                rows = [[] for _ in page]
+
+            for (jid, score, cur), row in zip(page, rows):
+                if check_live:
+                    state, row_gid, row = as_str(row[0]), as_str(row[1]), row[2:]
+                    if state != want_state or (want_gid is not None and row_gid != want_gid) or jid in seen:
+                        continue
+                    seen.add(jid)
+
+                yield LaneItem(
+                    job_id=jid,
+                    score=score,
+                    fields={f: as_str(v) for f, v in zip(fields, row)},
+                    cursor=cur,
+                )
+
     def get_job(self, queue: str, job_id: str) -> Optional[JobInfo]:
+        # a job lives in exactly one partition of a sharded queue
+        for part in self._partitions(queue):
+            info = self._get_job(part, job_id)
+            if info is not None:
+                return info
+        return None
+
+    def _get_job(self, queue: str, job_id: str) -> Optional[JobInfo]:
         base = self._base(queue)
         r = self._r
         jid_s = as_str(job_id)
         k_job = f"{base}:job:{jid_s}"
 
-        if r.exists(k_job) != 1:
-            return None
-
         fields = [
             "state", "gid", "attempt", "max_attempts", "timeout_ms", "backoff_ms",
-            "lease_token", "lock_until_ms", "due_ms", "payload", "last_error", "updated_ms",
+            "lease_token", "lock_until_ms", "due_ms", "payload", "last_error", "updated_ms", "created_ms", "priority",
         ]
 
         try:
-            vals = r.hmget(k_job, *fields)
+            p = r.pipeline(transaction=False)
+            p.hmget(k_job, *fields)
+            p.hmget(f"{base}:meta", *JOB_DEFAULT_FIELDS)
+            vals, meta = p.execute()
         except Exception:
             return None
 
+        if all(v is None for v in vals):
+            return None
+
         m = {fields[i]: vals[i] for i in range(len(fields))}
 
+        # options equal to the queue defaults are not stored on the job hash
+        d = _parse_job_defaults(meta)
+        for name in JOB_DEFAULT_FIELDS:
+            if m[name] is None:
+                m[name] = getattr(d, name)
+        if m["updated_ms"] is None:
+            m["updated_ms"] = m["created_ms"]
+
         return JobInfo(
             job_id=jid_s,
             state=as_str(m["state"]),
@@ -248,4 +535,6 @@ class QueueMonitor:
             payload=as_str(m["payload"]),
             last_error=as_str(m["last_error"]),
             updated_ms=int(as_str(m["updated_ms"]) or "0"),
+            queue=queue,
+            priority=int(as_str(m["priority"]) or "0"),
         )
\ No newline at end of file
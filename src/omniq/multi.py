@@ -0,0 +1,318 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Union
+
+from redis.exceptions import RedisClusterException
+
+from .client import OmniqClient
+from .consumer import StopController, _install_stop_signals, _restore_stop_signals, _steal_order, _reserve_any, _safe_log, _payload_preview
+from .types import JobCtx, ReserveJob
+from .exec import Exec
+from .backoff import IdleBackoff, default_backoff
+from .maintenance import QueueMaintainer
+from .heartbeat import HeartbeatScheduler, _lease_heartbeat_s
+
+MAX_WEIGHT = 1000
+
+@dataclass
+class _Lane:
+    queue: str
+    weight: int
+    parts: List[str]
+    handler: Callable[[JobCtx], None]
+    backoff: IdleBackoff
+    ready_at: float = 0.0
+    credit: int = 0
+    idle: bool = False
+
+def _pick(lanes: List[_Lane], now: float) -> Optional[_Lane]:
+    # smooth weighted round-robin over the lanes that are not backing off
+    best = None
+    total = 0
+    for lane in lanes:
+        if lane.ready_at > now:
+            continue
+        lane.credit += lane.weight
+        total += lane.weight
+        if best is None or lane.credit > best.credit:
+            best = lane
+    if best is not None:
+        best.credit -= total
+    return best
+
+def _cross_slot(e: Exception) -> bool:
+    if isinstance(e, RedisClusterException):
+        return True
+    msg = str(e).lower()
+    return "crossslot" in msg or "same slot" in msg or "same key slot" in msg
+
+def _lanes(
+    client: OmniqClient,
+    queues: Mapping[str, int],
+    handlers: Union[Callable[[JobCtx], None], Mapping[str, Callable[[JobCtx], None]]],
+    poll_interval_s: float,
+) -> List[_Lane]:
+    if not queues:
+        raise ValueError("consume_many requires at least one queue")
+
+    lanes: List[_Lane] = []
+    for queue, weight in queues.items():
+        weight = int(weight)
+        if weight < 1 or weight > MAX_WEIGHT:
+            raise ValueError(f"consume_many weight for queue {queue!r} must be between 1 and {MAX_WEIGHT}")
+
+        handler = handlers.get(queue) if isinstance(handlers, Mapping) else handlers
+        if handler is None:
+            raise ValueError(f"consume_many has no handler for queue {queue!r}")
+
+        lanes.append(
+            _Lane(
+                queue=queue,
+                weight=weight,
+                parts=_steal_order(client.ops.partitions(queue)),
+                handler=handler,
+                backoff=default_backoff(poll_interval_s),
+            )
+        )
+    return lanes
+
+def consume_many(
+    client: OmniqClient,
+    *,
+    queues: Mapping[str, int],
+    handlers: Union[Callable[[JobCtx], None], Mapping[str, Callable[[JobCtx], None]]],
+    poll_interval_s: float = 0.05,
+    promote_interval_s: float = 1.0,
+    promote_batch: int = 1000,
+    reap_interval_s: float = 1.0,
+    reap_batch: int = 1000,
+    heartbeat_interval_s: Optional[float] = None,
+    verbose: bool = False,
+    logger: Callable[[str], None] = print,
+    stop_on_ctrl_c: bool = True,
+    drain: bool = True,
+    idle_wait_s: float = 1.0,
+    idle_rescan_s: float = 30.0,
+    maintenance: bool = True,
+    promote_inline: int = 0,
+) -> None:
+    ops = client.ops
+
+    lanes = _lanes(client, queues, handlers, poll_interval_s)
+    by_part: Dict[str, _Lane] = {part: lane for lane in lanes for part in lane.parts}
+    names = ",".join(lane.queue for lane in lanes)
+
+    maints: List[QueueMaintainer] = []
+    if maintenance:
+        maints = [
+            QueueMaintainer(
+                client,
+                queue=part,
+                promote_batch=promote_batch,
+                reap_batch=reap_batch,
+                max_interval_s=min(promote_interval_s, reap_interval_s),
+            )
+            for part in by_part
+        ]
+
+    hb = HeartbeatScheduler(client, queue=lanes[0].parts[0])
+
+    # one wait over every notify list (per slot on a cluster) wakes the right lane; if it still fails cross-slot,
+    # lanes poll on their own backoff
+    multi_wait = idle_wait_s > 0
+
+    def park(lane: _Lane, now: float) -> None:
+        # the notify wait only runs once no lane is ready, so an empty lane parks until idle_rescan_s only when
+        # every other lane is parked too; while one queue is busy the others poll on their own backoff
+        delay_s = lane.backoff.on_empty()
+        lane.idle = multi_wait and all(other.ready_at > now for other in lanes if other is not lane)
+        if lane.idle:
+            delay_s = max(delay_s, float(idle_rescan_s))
+        lane.ready_at = now + delay_s
+
+    def unpark(now: float) -> None:
+        for lane in lanes:
+            if lane.idle:
+                lane.idle = False
+                lane.ready_at = min(lane.ready_at, now + lane.backoff.next_delay_s())
+
+    def wait_idle(now: float) -> None:
+        nonlocal multi_wait
+
+        timeout_s = min([lane.ready_at for lane in lanes]) - now
+        timeout_s = min([timeout_s] + [m.due_in_s() for m in maints])
+        if idle_wait_s > 0:
+            timeout_s = min(timeout_s, float(idle_wait_s))
+        if timeout_s <= 0:
+            return
+
+        if not multi_wait:
+            time.sleep(timeout_s)
+            return
+
+        try:
+            part = client.wait_for_any(queues=list(by_part), timeout_s=timeout_s)
+        except Exception as e:
+            if _cross_slot(e):
+                multi_wait = False
+                for lane in lanes:
+                    lane.ready_at = min(lane.ready_at, now + lane.backoff.next_delay_s())
+            else:
+                time.sleep(min(timeout_s, 0.2))
+            return
+
+        if part is not None:
+            lane = by_part[part]
+            lane.backoff.reset()
+            lane.ready_at = 0.0
+            lane.idle = False
+
+    def run_job(lane: _Lane, part: str, res: ReserveJob) -> None:
+        hb_s, first_s = _lease_heartbeat_s(res.lock_until_ms, heartbeat_interval_s)
+        flags = hb.add(job_id=res.job_id, lease_token=res.lease_token, interval_s=hb_s, first_delay_s=first_s, queue=part)
+
+        exec = Exec(client=client, default_child_id=res.job_id)
+        ctx = JobCtx(
+            queue=part,
+            job_id=res.job_id,
+            payload_raw=res.payload,
+            attempt=res.attempt,
+            lock_until_ms=res.lock_until_ms,
+            lease_token=res.lease_token,
+            gid=res.gid,
+            exec=exec,
+            lease=flags,
+        )
+
+        if verbose:
+            pv = _payload_preview(ctx.payload)
+            gid_s = ctx.gid or "-"
+            _safe_log(logger, f"[consume_many] received queue={ctx.queue} job_id={ctx.job_id} attempt={ctx.attempt} gid={gid_s} payload={pv}")
+
+        try:
+            lane.handler(ctx)
+
+            if not flags.get("lost", False):
+                try:
+                    client.ack_success(queue=part, job_id=res.job_id, lease_token=res.lease_token)
+                    if verbose:
+                        _safe_log(logger, f"[consume_many] ack success job_id={ctx.job_id}")
+                except Exception as e:
+                    if verbose:
+                        _safe_log(logger, f"[consume_many] ack success error job_id={ctx.job_id}: {e}")
+
+        except KeyboardInterrupt:
+            raise
+
+        except Exception as e:
+            if not flags.get("lost", False):
+                try:
+                    err = f"{type(e).__name__}: {e}"
+                    result = client.ack_fail(
+                        queue=part,
+                        job_id=res.job_id,
+                        lease_token=res.lease_token,
+                        error=err,
+                    )
+                    if verbose:
+                        if result[0] == "RETRY":
+                            _safe_log(logger, f"[consume_many] ack fail job_id={ctx.job_id} => RETRY due_ms={result[1]}")
+                        else:
+                            _safe_log(logger, f"[consume_many] ack fail job_id={ctx.job_id} => FAILED")
+                        _safe_log(logger, f"[consume_many] error job_id={ctx.job_id} => {err}")
+                except Exception as e2:
+                    if verbose:
+                        _safe_log(logger, f"[consume_many] ack fail error job_id={ctx.job_id}: {e2}")
+
+        finally:
+            hb.remove(res.job_id)
+
+    ctrl = StopController(stop=False, sigint_count=0)
+
+    prev_sigterm = None
+    prev_sigint = None
+
+    try:
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            prev_sigterm, prev_sigint = _install_stop_signals(
+                ctrl,
+                queue=names,
+                drain=drain,
+                verbose=verbose,
+                logger=logger,
+                tag="consume_many",
+            )
+
+        hb.start()
+
+        while True:
+            if ctrl.stop:
+                if verbose:
+                    _safe_log(logger, f"[consume_many] stop requested; exiting. queues={names}")
+                return
+
+            for m in maints:
+                m.tick()
+
+            now = time.monotonic()
+            lane = _pick(lanes, now)
+            if lane is None:
+                wait_idle(now)
+                continue
+
+            try:
+                part, res = _reserve_any(client, lane.parts, max_jobs=1, promote_max=promote_inline)
+            except Exception as e:
+                if verbose:
+                    _safe_log(logger, f"[consume_many] reserve error queue={lane.queue}: {e}")
+                lane.ready_at = now + 0.2
+                continue
+
+            if res is None:
+                park(lane, now)
+                continue
+
+            if getattr(res, "status", "") == "THROTTLED":
+                lane.ready_at = now + res.retry_in_ms / 1000.0
+                continue
+
+            if getattr(res, "status", "") == "PAUSED":
+                lane.ready_at = now + ops.paused_backoff_s(poll_interval_s)
+                continue
+
+            assert isinstance(res, ReserveJob)
+            lane.backoff.on_job()
+            unpark(now)
+
+            if not res.lease_token:
+                if verbose:
+                    _safe_log(logger, f"[consume_many] invalid reserve (missing lease_token) job_id={res.job_id}")
+                lane.ready_at = now + 0.2
+                continue
+
+            if ctrl.stop and not drain:
+                if verbose:
+                    _safe_log(logger, f"[consume_many] stop requested; fast-exit after reserve job_id={res.job_id}")
+                return
+
+            run_job(lane, part, res)
+
+    except KeyboardInterrupt:
+        if verbose:
+            _safe_log(logger, f"[consume_many] KeyboardInterrupt; exiting now. queues={names}")
+        return
+
+    finally:
+        hb.stop()
+
+        for m in maints:
+            m.release()
+
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            _restore_stop_signals(prev_sigterm, prev_sigint)
+
+        try:
+            client.close()
+        except Exception:
+            pass
@@ -0,0 +1,248 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from typing import Callable, List, Optional, Sequence
+
+from .client import OmniqClient
+from .consumer import StopController, _install_stop_signals, _restore_stop_signals, _idle_timeout_s, _wait_idle, _steal_order, _reserve_any, _safe_log, _payload_preview
+from .types import JobCtx, ReserveJob
+from .exec import Exec
+from .backoff import IdleBackoff, default_backoff
+from .maintenance import QueueMaintainer
+from .heartbeat import HeartbeatScheduler, _lease_heartbeat_s
+
+MAX_CONCURRENCY = 1024
+
+def _close_after(client: OmniqClient, hb: HeartbeatScheduler, running: Sequence[Future]) -> None:
+    futures_wait(list(running))
+    hb.stop()
+    try:
+        client.close()
+    except Exception:
+        pass
+
+def consume_pool(
+    client: OmniqClient,
+    *,
+    queue: str,
+    handler: Callable[[JobCtx], None],
+    concurrency: int = 4,
+    poll_interval_s: float = 0.05,
+    promote_interval_s: float = 1.0,
+    promote_batch: int = 1000,
+    reap_interval_s: float = 1.0,
+    reap_batch: int = 1000,
+    heartbeat_interval_s: Optional[float] = None,
+    verbose: bool = False,
+    logger: Callable[[str], None] = print,
+    stop_on_ctrl_c: bool = True,
+    drain: bool = True,
+    idle_wait_s: float = 1.0,
+    backoff: Optional[IdleBackoff] = None,
+    maintenance: bool = True,
+    promote_inline: int = 0,
+    shutdown_timeout_s: float = 30.0,
+) -> None:
+    ops = client.ops
+    parts = _steal_order(ops.partitions(queue))
+
+    concurrency = max(1, min(int(concurrency), MAX_CONCURRENCY))
+    slots = threading.BoundedSemaphore(concurrency)
+
+    hb = HeartbeatScheduler(client, queue=parts[0])
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="omniq-worker")
+    futures: List[Future] = []
+
+    maints: List[QueueMaintainer] = []
+    if maintenance:
+        maints = [
+            QueueMaintainer(
+                client,
+                queue=part,
+                promote_batch=promote_batch,
+                reap_batch=reap_batch,
+                max_interval_s=min(promote_interval_s, reap_interval_s),
+            )
+            for part in parts
+        ]
+
+    idle = backoff or default_backoff(poll_interval_s)
+
+    def wait_idle(throttle_s: Optional[float] = None) -> None:
+        delay_s = idle.on_empty()
+        if throttle_s is not None:
+            delay_s = min(delay_s, throttle_s)
+        if idle_wait_s <= 0:
+            time.sleep(delay_s)
+            return
+        timeout_s = _idle_timeout_s(idle_wait_s, maints, throttle_s)
+        _wait_idle(client, queues=parts, timeout_s=timeout_s, fallback_s=delay_s)
+
+    ctrl = StopController(stop=False, sigint_count=0)
+    wait_for_jobs = drain
+
+    prev_sigterm = None
+    prev_sigint = None
+
+    def run_job(part: str, res: ReserveJob) -> None:
+        try:
+            hb_s, first_s = _lease_heartbeat_s(res.lock_until_ms, heartbeat_interval_s)
+            flags = hb.add(job_id=res.job_id, lease_token=res.lease_token, interval_s=hb_s, first_delay_s=first_s, queue=part)
+
+            exec = Exec(client=client, default_child_id=res.job_id)
+            ctx = JobCtx(
+                queue=part,
+                job_id=res.job_id,
+                payload_raw=res.payload,
+                attempt=res.attempt,
+                lock_until_ms=res.lock_until_ms,
+                lease_token=res.lease_token,
+                gid=res.gid,
+                exec=exec,
+                lease=flags,
+            )
+
+            if verbose:
+                pv = _payload_preview(ctx.payload)
+                gid_s = ctx.gid or "-"
+                _safe_log(logger, f"[consume_pool] received job_id={ctx.job_id} attempt={ctx.attempt} gid={gid_s} payload={pv}")
+
+            try:
+                handler(ctx)
+
+                if not flags.get("lost", False):
+                    try:
+                        client.ack_success(queue=part, job_id=res.job_id, lease_token=res.lease_token)
+                        if verbose:
+                            _safe_log(logger, f"[consume_pool] ack success job_id={ctx.job_id}")
+                    except Exception as e:
+                        if verbose:
+                            _safe_log(logger, f"[consume_pool] ack success error job_id={ctx.job_id}: {e}")
+
+            except Exception as e:
+                if not flags.get("lost", False):
+                    try:
+                        err = f"{type(e).__name__}: {e}"
+                        result = client.ack_fail(
+                            queue=part,
+                            job_id=res.job_id,
+                            lease_token=res.lease_token,
+                            error=err,
+                        )
+                        if verbose:
+                            if result[0] == "RETRY":
+                                _safe_log(logger, f"[consume_pool] ack fail job_id={ctx.job_id} => RETRY due_ms={result[1]}")
+                            else:
+                                _safe_log(logger, f"[consume_pool] ack fail job_id={ctx.job_id} => FAILED")
+                            _safe_log(logger, f"[consume_pool] error job_id={ctx.job_id} => {err}")
+                    except Exception as e2:
+                        if verbose:
+                            _safe_log(logger, f"[consume_pool] ack fail error job_id={ctx.job_id}: {e2}")
+
+            finally:
+                hb.remove(res.job_id)
+
+        finally:
+            slots.release()
+
+    try:
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            prev_sigterm, prev_sigint = _install_stop_signals(
+                ctrl,
+                queue=queue,
+                drain=drain,
+                verbose=verbose,
+                logger=logger,
+                tag="consume_pool",
+            )
+
+        hb.start()
+
+        while True:
+            if ctrl.stop:
+                if verbose:
+                    _safe_log(logger, f"[consume_pool] stop requested; no new reserves. queue={queue} active={hb.active()}")
+                return
+
+            for m in maints:
+                m.tick()
+
+            if not slots.acquire(timeout=max(0.01, float(poll_interval_s))):
+                continue
+
+            try:
+                part, res = _reserve_any(client, parts, max_jobs=1, promote_max=promote_inline)
+            except Exception as e:
+                slots.release()
+                if verbose:
+                    _safe_log(logger, f"[consume_pool] reserve error: {e}")
+                time.sleep(0.2)
+                continue
+
+            if res is None:
+                slots.release()
+                wait_idle()
+                continue
+
+            if getattr(res, "status", "") == "THROTTLED":
+                slots.release()
+                wait_idle(res.retry_in_ms / 1000.0)
+                continue
+
+            if getattr(res, "status", "") == "PAUSED":
+                slots.release()
+                time.sleep(ops.paused_backoff_s(poll_interval_s))
+                continue
+
+            assert isinstance(res, ReserveJob)
+            idle.on_job()
+
+            if not res.lease_token:
+                slots.release()
+                if verbose:
+                    _safe_log(logger, f"[consume_pool] invalid reserve (missing lease_token) job_id={res.job_id}")
+                time.sleep(0.2)
+                continue
+
+            if ctrl.stop and not drain:
+                slots.release()
+                if verbose:
+                    _safe_log(logger, f"[consume_pool] stop requested; fast-exit after reserve job_id={res.job_id}")
+                return
+
+            futures = [f for f in futures if not f.done()]
+            futures.append(executor.submit(run_job, part, res))
+
+    except KeyboardInterrupt:
+        wait_for_jobs = False
+        if verbose:
+            _safe_log(logger, f"[consume_pool] KeyboardInterrupt; exiting now. queue={queue}")
+        return
+
+    finally:
+        try:
+            executor.shutdown(wait=wait_for_jobs, cancel_futures=not wait_for_jobs)
+            if not wait_for_jobs:
+                # queued jobs are cancelled; handlers already running get a bounded grace period
+                futures_wait(futures, timeout=max(0.0, float(shutdown_timeout_s)))
+        except KeyboardInterrupt:
+            if verbose:
+                _safe_log(logger, f"[consume_pool] KeyboardInterrupt while draining; exiting now. queue={queue}")
+
+        if verbose and wait_for_jobs:
+            _safe_log(logger, f"[consume_pool] drained in-flight jobs; exiting. queue={queue}")
+
+        for m in maints:
+            m.release()
+
+        if stop_on_ctrl_c and threading.current_thread() is threading.main_thread():
+            _restore_stop_signals(prev_sigterm, prev_sigint)
+
+        late = [f for f in futures if not f.done()]
+        if late:
+            # handlers still running keep their heartbeats and the client until they return
+            if verbose:
+                _safe_log(logger, f"[consume_pool] {len(late)} handlers still running; closing after they return. queue={queue}")
+            threading.Thread(target=_close_after, args=(client, hb, late), daemon=True).start()
+        else:
+            _close_after(client, hb, [])
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from dataclasses import dataclass
 from threading import Lock
@@ -14,12 +15,19 @@ class ScriptDef:
 @dataclass(frozen=True)
 class OmniqScripts:
     enqueue: ScriptDef
+    enqueue_batch: ScriptDef
     reserve: ScriptDef
+    reserve_batch: ScriptDef
     ack_success: ScriptDef
     ack_fail: ScriptDef
+    ack_success_batch: ScriptDef
+    ack_fail_batch: ScriptDef
     promote_delayed: ScriptDef
     reap_expired: ScriptDef
+    leader_acquire: ScriptDef
+    leader_release: ScriptDef
     heartbeat: ScriptDef
+    heartbeat_batch: ScriptDef
     pause: ScriptDef
     resume: ScriptDef
     retry_failed: ScriptDef
@@ -28,6 +36,14 @@ class OmniqScripts:
     remove_jobs_batch: ScriptDef
     childs_init: ScriptDef
     child_ack: ScriptDef
+    rebuild_stats: ScriptDef
+    retry_all_failed: ScriptDef
+    purge_lane: ScriptDef
+    set_retention: ScriptDef
+    sweep_retention: ScriptDef
+    set_job_defaults: ScriptDef
+    set_priority_fairness: ScriptDef
+    set_rate_limit: ScriptDef
 
 def default_scripts_dir() -> str:
     here = os.path.dirname(__file__)
@@ -51,12 +67,19 @@ def load_scripts(r: ScriptLoader, scripts_dir: str) -> OmniqScripts:
 
     scripts = OmniqScripts(
         enqueue=load_one("enqueue.lua"),
+        enqueue_batch=load_one("enqueue_batch.lua"),
         reserve=load_one("reserve.lua"),
+        reserve_batch=load_one("reserve_batch.lua"),
         ack_success=load_one("ack_success.lua"),
         ack_fail=load_one("ack_fail.lua"),
+        ack_success_batch=load_one("ack_success_batch.lua"),
+        ack_fail_batch=load_one("ack_fail_batch.lua"),
         promote_delayed=load_one("promote_delayed.lua"),
         reap_expired=load_one("reap_expired.lua"),
+        leader_acquire=load_one("leader_acquire.lua"),
+        leader_release=load_one("leader_release.lua"),
         heartbeat=load_one("heartbeat.lua"),
+        heartbeat_batch=load_one("heartbeat_batch.lua"),
         pause=load_one("pause.lua"),
         resume=load_one("resume.lua"),
         retry_failed=load_one("retry_failed.lua"),
@@ -65,9 +88,24 @@ def load_scripts(r: ScriptLoader, scripts_dir: str) -> OmniqScripts:
         remove_jobs_batch=load_one("remove_jobs_batch.lua"),
         childs_init=load_one("childs_init.lua"),
         child_ack=load_one("child_ack.lua"),
+        rebuild_stats=load_one("rebuild_stats.lua"),
+        retry_all_failed=load_one("retry_all_failed.lua"),
+        purge_lane=load_one("purge_lane.lua"),
+        set_retention=load_one("set_retention.lua"),
+        sweep_retention=load_one("sweep_retention.lua"),
+        set_job_defaults=load_one("set_job_defaults.lua"),
+        set_priority_fairness=load_one("set_priority_fairness.lua"),
+        set_rate_limit=load_one("set_rate_limit.lua"),
     )
 
     with _scripts_cache_lock:
         _scripts_cache[scripts_dir] = scripts
 
     return scripts
+
+class _LocalShaLoader:
+    def script_load(self, script: str) -> str:
+        return hashlib.sha1(script.encode("utf-8")).hexdigest()
+
+def read_scripts(scripts_dir: str) -> OmniqScripts:
+    return load_scripts(_LocalShaLoader(), scripts_dir)
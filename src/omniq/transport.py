@@ -8,6 +8,16 @@ try:
 except Exception:
     RedisCluster = None
 
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+try:
+    from redis.asyncio.cluster import RedisCluster as AsyncRedisCluster
+except Exception:
+    AsyncRedisCluster = None
+
 RedisArg = Union[str, bytes, int, float]
 
 class RedisLike(Protocol):
@@ -22,6 +32,8 @@ class RedisLike(Protocol):
     def zrange(self, key: str, start: int, end: int) -> list[Optional[str]]: ...
     def get(self, key: str) -> Optional[str]: ...
     def hmget(self, key: str, *fields: str) -> list[Optional[str]]: ...
+    def hgetall(self, key: str) -> dict: ...
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None) -> Any: ...
     def zscore(self, key: str, member: str) -> Optional[float]: ...
 
 @dataclass(frozen=True)
@@ -52,6 +64,11 @@ def _safe_close(client: Any) -> None:
     except Exception:
         pass
 
+def is_cluster_client(client: Any) -> bool:
+    return (RedisCluster is not None and isinstance(client, RedisCluster)) or (
+        AsyncRedisCluster is not None and isinstance(client, AsyncRedisCluster)
+    )
+
 def _looks_like_cluster_error(e: Exception) -> bool:
     msg = str(e).lower()
     return (
@@ -116,3 +133,56 @@ def build_redis_client(opts: RedisConnOpts) -> redis.Redis:
         db=int(opts.db),
         **kw,
     )
+
+async def _safe_aclose(client: Any) -> None:
+    try:
+        await client.aclose()
+        return
+    except AttributeError:
+        pass
+    except Exception:
+        return
+    try:
+        await client.close()
+    except Exception:
+        pass
+
+async def build_async_redis_client(opts: RedisConnOpts, client_name: Optional[str] = None) -> Any:
+    if aioredis is None:
+        raise RuntimeError("redis.asyncio is not available (requires redis>=4.2)")
+
+    kw = _common_kwargs(opts)
+    if client_name:
+        kw["client_name"] = str(client_name)
+
+    if opts.redis_url:
+        return aioredis.Redis.from_url(opts.redis_url, **kw)
+
+    if not opts.host:
+        raise ValueError("RedisConnOpts requires host (or redis_url)")
+
+    if AsyncRedisCluster is not None:
+        rc = None
+        try:
+            rc = AsyncRedisCluster(
+                host=opts.host,
+                port=int(opts.port),
+                **kw,
+            )
+            await rc.initialize()
+            await rc.ping()
+            return rc
+        except Exception as e:
+            if rc is not None:
+                await _safe_aclose(rc)
+            if _looks_like_cluster_error(e):
+                pass
+            else:
+                raise
+
+    return aioredis.Redis(
+        host=opts.host,
+        port=int(opts.port),
+        db=int(opts.db),
+        **kw,
+    )
@@ -1,24 +1,68 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, Optional, Tuple, Union, Literal, List
 
+from .codec import decode_payload
+
 PayloadT = Union[Dict[str, Any], list, str]
 
+class _LazyPayload:
+    # JobCtx.payload: decoded on first access unless passed to the constructor, so handlers
+    # that only forward payload_raw never pay for it
+    def __get__(self, ctx: Any, owner: Any = None) -> Any:
+        if ctx is None:
+            return self
+        try:
+            return ctx.__dict__["_payload"]
+        except KeyError:
+            pass
+        try:
+            value = decode_payload(ctx.payload_raw)
+        except Exception:
+            value = ctx.payload_raw
+        ctx.__dict__["_payload"] = value
+        return value
+
+    def __set__(self, ctx: Any, value: Any) -> None:
+        if value is not self:
+            ctx.__dict__["_payload"] = value
+
 @dataclass(frozen=True)
 class JobCtx:
     queue: str
     job_id: str
     payload_raw: str
-    payload: PayloadT
     attempt: int
     lock_until_ms: int
     lease_token: str
     gid: str = ""
     exec: Any = None
+    lease: Optional[Dict[str, bool]] = None
+    payload: PayloadT = field(default=_LazyPayload(), repr=False, compare=False)  # type: ignore[assignment]
+
+    def lease_lost(self) -> bool:
+        return bool(self.lease and self.lease.get("lost", False))
+
+@dataclass(frozen=True)
+class PublishJob:
+    payload: Any
+    job_id: Optional[str] = None
+    max_attempts: Optional[int] = None
+    timeout_ms: Optional[int] = None
+    backoff_ms: Optional[int] = None
+    due_ms: int = 0
+    gid: Optional[str] = None
+    group_limit: int = 0
+    priority: int = 0
 
 @dataclass(frozen=True)
 class ReservePaused:
     status: Literal["PAUSED"] = "PAUSED"
 
+@dataclass(frozen=True)
+class ReserveThrottled:
+    retry_in_ms: int
+    status: Literal["THROTTLED"] = "THROTTLED"
+
 @dataclass(frozen=True)
 class ReserveJob:
     status: Literal["JOB"]
@@ -29,7 +73,38 @@ class ReserveJob:
     gid: str
     lease_token: str
 
+@dataclass(frozen=True)
+class BulkProgress:
+    processed: int
+    scanned: int
+    cursor: int
+    done: bool
+    total: int
+
+@dataclass(frozen=True)
+class JobDefaults:
+    max_attempts: int = 3
+    timeout_ms: int = 60_000
+    backoff_ms: int = 5_000
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    completed_keep: int = 100
+    completed_max_age_ms: int = 0
+    failed_keep: int = 0
+    failed_max_age_ms: int = 0
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate_per_s: float
+    burst: int = 1
+
 AckFailResult = Tuple[Literal["RETRY", "FAILED"], Optional[int]]
 BatchRemoveResult = List[Tuple[str, str, Optional[str]]]
 BatchRetryFailedResult = List[Tuple[str, str, Optional[str]]]
-ReserveResult = Union[None, ReservePaused, ReserveJob]
+BatchAckSuccessResult = List[Tuple[str, str, Optional[str]]]
+BatchAckFailResult = List[Tuple[str, str, Union[int, str, None]]]
+BatchHeartbeatResult = List[Tuple[str, str, Union[int, str]]]
+MaintenanceResult = Tuple[int, Optional[int]]
+ReserveResult = Union[None, ReservePaused, ReserveThrottled, ReserveJob]
+ReserveBatchResult = Union[ReservePaused, ReserveThrottled, List[ReserveJob]]
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from omniq.client import OmniqClient
+from omniq.async_client import AsyncOmniqClient
+
+def _sha1hex(s):
+    if isinstance(s, str):
+        s = s.encode("utf-8")
+    return hashlib.sha1(s).hexdigest().encode()
+
+def _with_sha1hex(server) -> None:
+    # fakeredis' Lua sandbox has no redis.sha1hex (used for lease tokens); add it to the shared runtime
+    fakeredis.FakeRedis(server=server).eval("return 1", 0)
+    server._lua_runtime.eval("function(f) redis.sha1hex = f end")(_sha1hex)
+
+@pytest.fixture
+def server():
+    server = fakeredis.FakeServer()
+    _with_sha1hex(server)
+    return server
+
+@pytest.fixture
+def r(server):
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+@pytest.fixture
+def make_client(server):
+    def make(**kwargs) -> OmniqClient:
+        return OmniqClient(redis=fakeredis.FakeRedis(server=server, decode_responses=True), **kwargs)
+    return make
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
+
+@pytest.fixture
+def make_async_client(server):
+    def make(**kwargs) -> AsyncOmniqClient:
+        return AsyncOmniqClient(redis=fakeredis.FakeAsyncRedis(server=server, decode_responses=True), **kwargs)
+    return make
+
+class Stop(KeyboardInterrupt):
+    pass
+
+def run_until(target, *, timeout_s: float = 10.0) -> None:
+    # consumers return on KeyboardInterrupt, so handlers raise Stop once the test has what it needs
+    errors = []
+
+    def run():
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(timeout_s)
+    assert not t.is_alive(), "consumer did not stop"
+    if errors:
+        raise errors[0]
+
+def sigterm_when(cond, *, timeout_s: float = 5.0) -> None:
+    # consumers running in the main thread stop on SIGTERM (drain per their settings)
+    def run():
+        wait_for(cond, timeout_s=timeout_s)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    threading.Thread(target=run, daemon=True).start()
+
+def wait_for(cond, *, timeout_s: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not cond():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
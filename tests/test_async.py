@@ -0,0 +1,66 @@
+import asyncio
+
+from omniq.types import ReservePaused
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+def test_async_publish_reserve_ack(make_async_client, r):
+    async def main():
+        async with make_async_client() as client:
+            job_id = await client.publish(queue="q", payload={"i": 1})
+            job = await client.reserve(queue="q")
+            await client.ack_success(queue="q", job_id=job.job_id, lease_token=job.lease_token)
+            await client.pause(queue="q")
+            paused = await client.reserve(queue="q")
+            return job_id, job, paused
+
+    job_id, job, paused = run(main())
+
+    assert job.job_id == job_id
+    assert isinstance(paused, ReservePaused)
+    assert r.hget("{q}:job:" + job_id, "state") == "completed"
+
+def test_async_consume_runs_handlers_as_concurrent_tasks(make_async_client, r):
+    async def main():
+        client = make_async_client()
+        for i in range(6):
+            await client.publish(queue="q", payload={"i": i})
+
+        stop = asyncio.Event()
+        running = []
+        peak = []
+
+        async def handler(ctx):
+            running.append(ctx.job_id)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            running.remove(ctx.job_id)
+            await ctx.exec.publish(queue="next", payload={"from": ctx.job_id})
+            if r.llen("{next}:wait") == 6:
+                stop.set()
+
+        await client.consume(queue="q", handler=handler, concurrency=3, maintenance=False, idle_wait_s=0.05, stop_event=stop)
+        return peak
+
+    peak = run(main())
+
+    assert max(peak) == 3
+    assert r.llen("{q}:completed") == 6
+
+def test_async_consume_accepts_sync_handlers(make_async_client, r):
+    async def main():
+        client = make_async_client()
+        await client.publish(queue="q", payload={"i": 1})
+        stop = asyncio.Event()
+        seen = []
+
+        def handler(ctx):
+            seen.append(ctx.payload)
+            stop.set()
+
+        await client.consume(queue="q", handler=handler, maintenance=False, idle_wait_s=0.05, stop_event=stop)
+        return seen
+
+    assert run(main()) == [{"i": 1}]
+    assert r.llen("{q}:completed") == 1
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from omniq.backoff import DecorrelatedJitterBackoff, FixedBackoff, IdleBackoff, default_backoff
+
+def test_idle_backoff_requires_next_delay_s():
+    class Incomplete(IdleBackoff):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    with pytest.raises(TypeError):
+        IdleBackoff()
+
+def test_fixed_backoff_counts_empty_polls():
+    b = FixedBackoff(0.2)
+
+    assert b.on_empty() == 0.2
+    assert b.on_empty() == 0.2
+    b.on_job()
+
+    assert (b.stats.reserves, b.stats.empty) == (3, 2)
+    assert b.stats.empty_ratio() == pytest.approx(2 / 3)
+
+def test_decorrelated_jitter_grows_up_to_cap_and_resets_on_job():
+    b = DecorrelatedJitterBackoff(base_s=0.01, cap_s=0.5, rng=random.Random(3))
+
+    delays = [b.on_empty() for _ in range(50)]
+
+    assert all(0.01 <= d <= 0.5 for d in delays)
+    assert max(delays) == 0.5
+
+    b.on_job()
+    assert b.on_empty() <= 0.03
+
+def test_default_backoff_starts_at_poll_interval():
+    b = default_backoff(0.05)
+
+    assert isinstance(b, DecorrelatedJitterBackoff)
+    assert (b.base_s, b.cap_s) == (0.05, 2.0)
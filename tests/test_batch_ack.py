@@ -0,0 +1,49 @@
+import pytest
+
+from omniq.monitor import QueueMonitor
+
+def lease(client, n, **kwargs):
+    for i in range(n):
+        client.publish(queue="q", payload={"i": i}, **kwargs)
+    return client.reserve_batch(queue="q", max_jobs=n)
+
+def test_ack_success_batch_checks_each_token(client, r):
+    jobs = lease(client, 3)
+
+    results = client.ack_success_batch(queue="q", jobs=[
+        (jobs[0].job_id, jobs[0].lease_token),
+        (jobs[1].job_id, "stale"),
+        (jobs[2].job_id, jobs[2].lease_token),
+    ])
+
+    assert results == [(jobs[0].job_id, "OK", None), (jobs[1].job_id, "ERR", "TOKEN_MISMATCH"), (jobs[2].job_id, "OK", None)]
+    assert r.zcard("{q}:active") == 1
+    assert QueueMonitor(client).stats("q").completed == 2
+
+def test_ack_fail_batch_retries_then_fails(client, r):
+    jobs = lease(client, 2, max_attempts=2)
+    jobs.append(lease(client, 1, max_attempts=1)[0])
+
+    results = client.ack_fail_batch(queue="q", jobs=[(j.job_id, j.lease_token, "boom") for j in jobs])
+
+    assert [status for _, status, _ in results] == ["RETRY", "RETRY", "FAILED"]
+    assert all(isinstance(due, int) for _, _, due in results[:2])
+    assert r.zcard("{q}:delayed") == 2
+    assert r.lrange("{q}:failed", 0, -1) == [jobs[2].job_id]
+    assert r.hget("{q}:job:" + jobs[2].job_id, "last_error") == "boom"
+
+def test_ack_fail_batch_frees_group_slots(client, r):
+    for i in range(3):
+        client.publish(queue="q", payload={"i": i}, gid="g1", group_limit=1, max_attempts=1)
+    (job,) = client.reserve_batch(queue="q", max_jobs=3)
+
+    client.ack_fail_batch(queue="q", jobs=[(job.job_id, job.lease_token)])
+
+    assert client.reserve(queue="q").gid == "g1"
+
+def test_batch_ack_bounds(client):
+    with pytest.raises(ValueError):
+        client.ack_success_batch(queue="q", jobs=[("j", "t")] * 101)
+    with pytest.raises(ValueError):
+        client.ack_fail_batch(queue="q", jobs=[("j",)])
+    assert client.ack_success_batch(queue="q", jobs=[]) == []
@@ -0,0 +1,60 @@
+import pytest
+
+from omniq.monitor import QueueMonitor
+
+def fail_many(client, n, error="boom", **kwargs):
+    client.publish_many(queue="q", jobs=[{"payload": {"i": i}, "max_attempts": 1, **kwargs} for i in range(n)])
+    ids = []
+    while (job := client.reserve(queue="q")) is not None:
+        client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token, error=error)
+        ids.append(job.job_id)
+        if len(ids) == n:
+            break
+    return ids
+
+def test_retry_all_failed_goes_past_the_batch_cap(client):
+    fail_many(client, 250)
+    seen = []
+
+    progress = client.retry_all_failed(queue="q", chunk=100, on_progress=seen.append)
+
+    assert (progress.total, progress.done) == (250, True)
+    assert [p.processed for p in seen][:2] == [100, 100]
+    stats = QueueMonitor(client).stats("q")
+    assert (stats.failed, stats.waiting) == (0, 250)
+
+def test_retry_all_failed_filters_and_resumes(client):
+    fail_many(client, 3, error="timeout talking to api")
+    fail_many(client, 2, error="bad input")
+
+    first = client.retry_all_failed(queue="q", error_contains="timeout", chunk=1, max_chunks=2)
+    assert not first.done
+
+    rest = client.retry_all_failed(queue="q", error_contains="timeout", chunk=1, cursor=first.cursor)
+    assert rest.done
+    assert first.total + rest.total == 3
+    assert QueueMonitor(client).stats("q").failed == 2
+
+def test_retry_all_failed_by_gid(client):
+    fail_many(client, 2, gid="g1")
+    fail_many(client, 2)
+
+    assert client.retry_all_failed(queue="q", gid="g1").total == 2
+    assert QueueMonitor(client).stats("q").failed == 2
+
+def test_purge_lane_respects_older_than(client, r):
+    ids = fail_many(client, 4)
+    r.hset("{q}:job:" + ids[0], "updated_ms", "1")
+    r.hset("{q}:job:" + ids[1], "updated_ms", "1")
+
+    progress = client.purge_lane(queue="q", lane="failed", older_than_ms=60_000)
+
+    assert progress.total == 2
+    assert r.lrange("{q}:failed", 0, -1) == [ids[3], ids[2]]
+    assert not r.exists("{q}:job:" + ids[0])
+
+def test_bulk_ops_validate_arguments(client):
+    with pytest.raises(ValueError):
+        client.purge_lane(queue="q", lane="wait")
+    with pytest.raises(ValueError):
+        client.retry_all_failed(queue="q", chunk=0)
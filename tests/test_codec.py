@@ -0,0 +1,56 @@
+import dataclasses
+
+import pytest
+
+from omniq.codec import PayloadCodec, decode_payload
+from omniq.types import JobCtx
+
+from conftest import Stop, run_until
+
+def ctx(**kwargs):
+    return JobCtx(queue="q", job_id="j1", attempt=1, lock_until_ms=0, lease_token="t", **kwargs)
+
+def test_job_ctx_decodes_payload_lazily():
+    c = ctx(payload_raw='{"a":1}')
+
+    assert "_payload" not in c.__dict__
+    assert c.payload == {"a": 1}
+    assert c.payload is c.payload
+
+def test_job_ctx_accepts_a_decoded_payload():
+    c = ctx(payload_raw='{"a":1}', payload={"b": 2})
+
+    assert c.payload == {"b": 2}
+    assert dataclasses.replace(c, job_id="j2").payload == {"b": 2}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        c.payload = {}
+
+def test_job_ctx_falls_back_to_the_raw_payload():
+    assert ctx(payload_raw="not json").payload == "not json"
+
+def test_compressed_payload_round_trips_through_a_consumer(make_client, r):
+    client = make_client(codec=PayloadCodec(compression="zlib", threshold_bytes=16))
+    payload = {"text": "x" * 200}
+    job_id = client.publish(queue="q", payload=payload)
+    client.publish(queue="q", payload={"stop": True})
+
+    raw = r.hget("{q}:job:" + job_id, "payload")
+    assert len(raw) < 100
+    assert decode_payload(raw) == payload
+
+    seen = []
+
+    def handler(ctx):
+        if ctx.payload.get("stop"):
+            raise Stop()
+        seen.append(ctx.payload)
+
+    run_until(lambda: client.consume(queue="q", handler=handler, maintenance=False))
+
+    assert seen == [payload]
+
+def test_codec_rejects_unknown_settings():
+    with pytest.raises(ValueError):
+        PayloadCodec(serializer="pickle")
+    with pytest.raises(ValueError):
+        PayloadCodec(compression="lz4")
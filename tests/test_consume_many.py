@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+from redis.exceptions import RedisClusterException, ResponseError
+
+import omniq._ops
+from omniq.multi import _cross_slot
+
+from conftest import sigterm_when
+
+def test_consume_many_serves_queues_by_weight(client, r):
+    for i in range(6):
+        client.publish(queue="a", payload={"i": i})
+        client.publish(queue="b", payload={"i": i})
+
+    order = []
+
+    sigterm_when(lambda: r.llen("{a}:completed") + r.llen("{b}:completed") == 12)
+    client.consume_many(
+        queues={"a": 2, "b": 1},
+        handlers={"a": lambda ctx: order.append("a"), "b": lambda ctx: order.append("b")},
+        maintenance=False,
+        idle_wait_s=0.05,
+    )
+
+    assert order[:6].count("a") == 4
+    assert sorted(order) == ["a"] * 6 + ["b"] * 6
+
+def test_consume_many_rejects_missing_handler_and_bad_weight(client):
+    with pytest.raises(ValueError, match="no handler"):
+        client.consume_many(queues={"a": 1}, handlers={"b": print})
+    with pytest.raises(ValueError, match="weight"):
+        client.consume_many(queues={"a": 0}, handlers=print)
+
+def test_cross_slot_errors_are_recognised():
+    assert _cross_slot(RedisClusterException("BLPOP - all keys must map to the same key slot"))
+    assert _cross_slot(ResponseError("CROSSSLOT Keys in request don't hash to the same slot"))
+    assert not _cross_slot(ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value"))
+
+def test_wait_for_any_blocks_per_slot_on_a_cluster(client, r, monkeypatch):
+    monkeypatch.setattr(omniq._ops, "is_cluster_client", lambda _r: True)
+    calls = []
+    blpop = client.ops.r.blpop
+
+    def one_slot_blpop(keys, timeout=0):
+        calls.append(keys)
+        assert len(keys) == 1
+        return blpop(keys, timeout=timeout)
+
+    monkeypatch.setattr(client.ops.r, "blpop", one_slot_blpop)
+
+    t0 = time.monotonic()
+    assert client.wait_for_any(queues=["a", "b"], timeout_s=0.2) is None
+    assert 0.2 <= time.monotonic() - t0 < 0.5
+
+    client.publish(queue="b", payload={"i": 1})
+    assert client.wait_for_any(queues=["a", "b"], timeout_s=1.0) == "b"
+    assert {k for keys in calls for k in keys} == {"{a}:notify", "{b}:notify"}
+
+def test_idle_queue_is_polled_while_another_queue_is_busy(client, r):
+    # both queues start empty and park; then a keeps the loop busy while one job lands on b
+    def feed():
+        time.sleep(0.3)
+        for i in range(100):
+            client.publish(queue="a", payload={"i": i})
+        time.sleep(0.5)
+        sent.append(time.monotonic())
+        client.publish(queue="b", payload={"i": 0})
+
+    sent = []
+    got = []
+    threading.Thread(target=feed, daemon=True).start()
+
+    sigterm_when(lambda: r.llen("{b}:completed") == 1, timeout_s=10.0)
+    client.consume_many(
+        queues={"a": 1, "b": 1},
+        handlers={"a": lambda ctx: time.sleep(0.05), "b": lambda ctx: got.append(time.monotonic())},
+        maintenance=False,
+        idle_rescan_s=30.0,
+    )
+
+    assert r.llen("{a}:wait") > 0
+    assert got[0] - sent[0] < 2.5
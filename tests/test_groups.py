@@ -0,0 +1,41 @@
+T = 1_900_000_000_000
+
+def test_saturated_group_is_parked_until_a_slot_frees(client, r):
+    for i in range(3):
+        client.publish(queue="q", payload={"i": i}, gid="g1", group_limit=1)
+
+    job = client.reserve(queue="q")
+
+    assert client.reserve(queue="q") is None
+    assert r.zscore("{q}:groups:ready", "g1") is None
+
+    client.ack_success(queue="q", job_id=job.job_id, lease_token=job.lease_token)
+
+    assert r.zscore("{q}:groups:ready", "g1") is not None
+    assert client.reserve(queue="q").gid == "g1"
+
+def test_parked_group_does_not_block_other_groups(client):
+    for i in range(50):
+        client.publish(queue="q", payload={"i": i}, gid=f"busy{i % 5}", group_limit=1)
+    for g in range(5):
+        client.reserve(queue="q")
+    free = client.publish(queue="q", payload={"i": 0}, gid="free")
+
+    assert client.reserve(queue="q").job_id == free
+
+def test_reap_frees_the_group_slot(client, r):
+    client.publish(queue="q", payload={"i": 1}, gid="g1", timeout_ms=1_000)
+    client.publish(queue="q", payload={"i": 2}, gid="g1")
+    job = client.reserve(queue="q", now_ms_override=T)
+
+    assert client.reap_expired(queue="q", now_ms_override=T + 1_000) == 1
+
+    assert r.get("{q}:g:g1:inflight") == "0"
+    nxt = client.reserve(queue="q", now_ms_override=T + 1_000)
+    assert nxt.job_id != job.job_id
+
+def test_group_limit_allows_parallel_jobs(client):
+    for i in range(4):
+        client.publish(queue="q", payload={"i": i}, gid="g1", group_limit=2)
+
+    assert [client.reserve(queue="q") is not None for _ in range(3)] == [True, True, False]
@@ -0,0 +1,92 @@
+import time
+
+from omniq.clock import now_ms
+from omniq.heartbeat import HeartbeatScheduler, _lease_heartbeat_s
+
+from conftest import Stop, run_until
+
+def spy_heartbeats(client, monkeypatch):
+    calls = []
+    heartbeat_batch = client.heartbeat_batch
+
+    def spy(*, queue, jobs, **kwargs):
+        calls.append((time.monotonic(), list(jobs)))
+        return heartbeat_batch(queue=queue, jobs=jobs, **kwargs)
+
+    monkeypatch.setattr(client, "heartbeat_batch", spy)
+    return calls
+
+def test_first_heartbeat_is_at_the_lease_midpoint():
+    interval_s, first_s = _lease_heartbeat_s(now_ms() + 10_000, None)
+
+    assert 4.9 <= first_s <= 5.0
+    assert first_s <= interval_s
+    assert _lease_heartbeat_s(now_ms() + 10_000, 1.0) == (1.0, 1.0)
+
+def test_short_handlers_send_no_heartbeat(client, monkeypatch):
+    calls = spy_heartbeats(client, monkeypatch)
+    for i in range(3):
+        client.publish(queue="q", payload={"i": i}, timeout_ms=1_000)
+    client.publish(queue="q", payload={"stop": True})
+
+    def handler(ctx):
+        if ctx.payload.get("stop"):
+            raise Stop()
+        time.sleep(0.05)
+
+    run_until(lambda: client.consume(queue="q", handler=handler, maintenance=False))
+
+    assert calls == []
+
+def test_long_handler_is_renewed_from_the_midpoint(client, monkeypatch, r):
+    calls = spy_heartbeats(client, monkeypatch)
+    job_id = client.publish(queue="q", payload={"i": 1}, timeout_ms=600)
+    client.publish(queue="q", payload={"stop": True})
+    started = []
+
+    def handler(ctx):
+        if ctx.payload.get("stop"):
+            raise Stop()
+        started.append(time.monotonic())
+        time.sleep(0.8)
+
+    run_until(lambda: client.consume(queue="q", handler=handler, maintenance=False))
+
+    assert calls
+    assert calls[0][0] - started[0] >= 0.25
+    assert r.hmget("{q}:job:" + job_id, "state", "attempt") == ["completed", "1"]
+
+def test_heartbeat_batch_renews_each_lease_and_reports_lost_ones(client):
+    for i in range(3):
+        client.publish(queue="q", payload={"i": i})
+    jobs = client.reserve_batch(queue="q", max_jobs=3)
+    client.ack_success(queue="q", job_id=jobs[2].job_id, lease_token=jobs[2].lease_token)
+
+    results = client.heartbeat_batch(queue="q", jobs=[
+        (jobs[0].job_id, jobs[0].lease_token),
+        (jobs[1].job_id, "stale"),
+        (jobs[2].job_id, jobs[2].lease_token),
+    ])
+
+    assert results[0][:2] == (jobs[0].job_id, "OK")
+    assert results[0][2] >= jobs[0].lock_until_ms
+    assert results[1] == (jobs[1].job_id, "ERR", "TOKEN_MISMATCH")
+    assert results[2][:2] == (jobs[2].job_id, "ERR")
+
+def test_scheduler_renews_due_leases_in_one_call(client, monkeypatch):
+    calls = spy_heartbeats(client, monkeypatch)
+    for i in range(5):
+        client.publish(queue="q", payload={"i": i})
+    jobs = client.reserve_batch(queue="q", max_jobs=5)
+
+    hb = HeartbeatScheduler(client, queue="q")
+    hb.start()
+    flags = [hb.add(job_id=j.job_id, lease_token=j.lease_token, interval_s=0.1) for j in jobs]
+    # a lease that is gone is flagged lost and dropped
+    client.ack_success(queue="q", job_id=jobs[0].job_id, lease_token=jobs[0].lease_token)
+    time.sleep(0.15)
+    hb.stop()
+
+    assert len(calls[0][1]) == 5
+    assert flags[0]["lost"] and not any(f["lost"] for f in flags[1:])
+    assert hb.active() == 4
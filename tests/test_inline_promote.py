@@ -0,0 +1,28 @@
+T = 1_900_000_000_000
+
+def test_reserve_promotes_due_delayed_jobs_inline(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, due_ms=T)
+
+    assert client.reserve(queue="q", now_ms_override=T) is None
+    job = client.reserve(queue="q", now_ms_override=T, promote_max=10)
+
+    assert job.job_id == job_id
+    assert r.zcard("{q}:delayed") == 0
+
+def test_inline_promotion_is_bounded_by_promote_max(client, r):
+    for i in range(5):
+        client.publish(queue="q", payload={"i": i}, due_ms=T)
+
+    jobs = client.reserve_batch(queue="q", max_jobs=10, now_ms_override=T, promote_max=2)
+
+    assert len(jobs) == 2
+    assert r.zcard("{q}:delayed") == 3
+
+def test_retry_is_reservable_on_the_next_reserve(client):
+    client.publish(queue="q", payload={"i": 1}, backoff_ms=1_000)
+    job = client.reserve(queue="q", now_ms_override=T)
+    status, due_ms = client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token, now_ms_override=T)
+
+    assert (status, due_ms) == ("RETRY", T + 1_000)
+    assert client.reserve(queue="q", now_ms_override=T + 999, promote_max=10) is None
+    assert client.reserve(queue="q", now_ms_override=T + 1_000, promote_max=10).attempt == 2
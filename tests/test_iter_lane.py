@@ -0,0 +1,86 @@
+import pytest
+
+from omniq.monitor import QueueMonitor
+
+T = 1_900_000_000_000
+
+def test_iter_lane_pages_a_list_lane_and_resumes_from_a_cursor(client):
+    ids = [client.publish(queue="q", payload={"i": i}) for i in range(7)]
+    monitor = QueueMonitor(client)
+
+    items = list(monitor.iter_lane("q", "wait", page_size=3))
+    assert [item.job_id for item in items] == ids
+
+    rest = list(monitor.iter_lane("q", "wait", page_size=3, cursor=items[3].cursor))
+    assert [item.job_id for item in rest] == ids[4:]
+
+def test_iter_lane_never_repeats_sorted_set_items_with_equal_scores(client):
+    ids = [client.publish(queue="q", payload={"i": i}, due_ms=T + (i // 4)) for i in range(10)]
+    monitor = QueueMonitor(client)
+
+    items = list(monitor.iter_lane("q", "delayed", page_size=3, fields=()))
+    assert sorted(item.job_id for item in items) == sorted(ids)
+    assert [item.score for item in items] == sorted(item.score for item in items)
+
+    rest = list(monitor.iter_lane("q", "delayed", page_size=3, fields=(), cursor=items[4].cursor))
+    assert [item.job_id for item in rest] == [item.job_id for item in items[5:]]
+
+def test_iter_lane_reads_group_and_priority_lanes(client):
+    grouped = client.publish(queue="q", payload={"i": 1}, gid="g1")
+    urgent = client.publish(queue="q", payload={"i": 2}, priority=5)
+    monitor = QueueMonitor(client)
+
+    assert [(i.job_id, i.fields["gid"]) for i in monitor.iter_lane("q", "gwait", gid="g1")] == [(grouped, "g1")]
+    assert [i.job_id for i in monitor.iter_lane("q", "wait", priority=5)] == [urgent]
+    assert list(monitor.iter_lane("q", "wait")) == []
+
+def test_iter_lane_rejects_bad_arguments(client, make_client):
+    monitor = QueueMonitor(client)
+
+    with pytest.raises(ValueError):
+        list(monitor.iter_lane("q", "gwait"))
+    with pytest.raises(ValueError):
+        list(monitor.iter_lane("q", "nope"))
+    with pytest.raises(ValueError):
+        list(monitor.iter_lane("q", "failed", priority=3))
+    with pytest.raises(ValueError):
+        list(QueueMonitor(make_client(shards={"q": 2})).iter_lane("q", "wait"))
+
+def fail(client, n):
+    ids = [client.publish(queue="q", payload={"i": i}, max_attempts=1) for i in range(n)]
+    for _ in ids:
+        job = client.reserve(queue="q")
+        client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token)
+    return ids
+
+def test_list_cursor_survives_reserves_between_pages(client):
+    ids = [client.publish(queue="q", payload={"i": i}) for i in range(9)]
+    monitor = QueueMonitor(client)
+
+    pages = monitor.iter_lane("q", "wait", page_size=3, fields=())
+    first = [next(pages) for _ in range(3)]
+    for _ in range(2):
+        client.reserve(queue="q")
+    assert [item.job_id for item in first + list(pages)] == ids
+
+    rest = list(monitor.iter_lane("q", "wait", page_size=3, fields=(), cursor=first[-1].cursor))
+    assert [item.job_id for item in rest] == ids[3:]
+
+    # the cursor's own job was reserved: everything before it is gone as well
+    for _ in range(2):
+        client.reserve(queue="q")
+    rest = list(monitor.iter_lane("q", "wait", page_size=3, fields=(), cursor=first[-1].cursor))
+    assert [item.job_id for item in rest] == ids[4:]
+
+def test_list_cursor_survives_new_failures_between_pages(client):
+    failed = fail(client, 6)[::-1]
+    monitor = QueueMonitor(client)
+
+    pages = monitor.iter_lane("q", "failed", page_size=2, fields=())
+    first = [next(pages) for _ in range(2)]
+    fail(client, 3)
+    assert [item.job_id for item in first + list(pages)] == failed
+
+    fail(client, 2)
+    rest = list(monitor.iter_lane("q", "failed", page_size=2, fields=(), cursor=first[-1].cursor))
+    assert [item.job_id for item in rest] == failed[2:]
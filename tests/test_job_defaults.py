@@ -0,0 +1,67 @@
+import pytest
+
+from omniq._ops import _publish_many_argv, _publish_many_rows
+from omniq.types import JobDefaults
+
+T = 1_900_000_000_000
+
+def test_job_hash_only_stores_passed_options(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1})
+
+    assert sorted(r.hkeys("{q}:job:" + job_id)) == ["created_ms", "payload", "state"]
+
+def fail_once(client, queue="q"):
+    job = client.reserve(queue=queue)
+    return client.ack_fail(queue=queue, job_id=job.job_id, lease_token=job.lease_token)[0]
+
+def test_explicit_option_equal_to_the_default_is_kept(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, max_attempts=3)
+    client.set_job_defaults(queue="q", max_attempts=1)
+
+    assert r.hget("{q}:job:" + job_id, "max_attempts") == "3"
+    assert fail_once(client) == "RETRY"
+
+def test_unset_options_follow_later_queue_defaults(client):
+    client.publish(queue="q", payload={"i": 1})
+    client.set_job_defaults(queue="q", max_attempts=5, timeout_ms=1_000, backoff_ms=10)
+
+    assert client.get_job_defaults(queue="q") == JobDefaults(max_attempts=5, timeout_ms=1_000, backoff_ms=10)
+    assert fail_once(client) == "RETRY"
+
+    client.set_job_defaults(queue="q", max_attempts=1)
+    client.publish(queue="q", payload={"i": 2})
+    assert fail_once(client) == "FAILED"
+
+def test_publish_rejects_an_existing_job_id(client, r):
+    client.publish(queue="q", payload={"i": 1}, job_id="j1")
+
+    with pytest.raises(RuntimeError, match="JOB_EXISTS"):
+        client.publish(queue="q", payload={"i": 2}, job_id="j1")
+
+    assert r.llen("{q}:wait") == 1
+    assert client.reserve(queue="q").payload == '{"i":1}'
+
+def test_publish_many_rejects_the_chunk_with_a_taken_id(client, r):
+    client.publish(queue="q", payload={"i": 1}, job_id="j1")
+
+    with pytest.raises(RuntimeError, match="JOB_EXISTS j1"):
+        client.publish_many(queue="q", jobs=[{"payload": {"i": 2}, "job_id": "j2"}, {"payload": {"i": 3}, "job_id": "j1"}])
+
+    assert not r.exists("{q}:job:j2")
+    assert r.llen("{q}:wait") == 1
+
+def test_publish_many_rejects_a_job_id_repeated_in_the_call(client, make_client, r):
+    jobs = [{"payload": {"i": 2}, "job_id": "j2"}, {"payload": {"i": 3}, "job_id": "j2"}]
+
+    with pytest.raises(ValueError, match="repeats job_id 'j2'"):
+        client.publish_many(queue="q", jobs=jobs)
+    # a sharded queue would send the two jobs to different partitions
+    with pytest.raises(ValueError, match="repeats job_id 'j2'"):
+        make_client(shards={"q": 2}).publish_many(queue="q", jobs=jobs)
+
+    # the batch script refuses it on its own too
+    row = _publish_many_rows(jobs[:1], max_attempts=None, timeout_ms=None, backoff_ms=None)[0]
+    argv = _publish_many_argv([row, row], T)
+    assert r.eval(client.ops.scripts.enqueue_batch.src, 1, "{q}:meta", *argv) == ["ERR", "DUPLICATE_IN_BATCH", "j2"]
+
+    assert not r.exists("{q}:job:j2")
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from omniq.maintenance import QueueMaintainer
+
+def test_leader_lease_is_exclusive_until_released_or_expired(client):
+    assert client.leader_acquire(queue="q", owner="a", lease_ms=200)
+    assert not client.leader_acquire(queue="q", owner="b", lease_ms=200)
+    assert client.leader_acquire(queue="q", owner="a", lease_ms=200)
+
+    assert not client.leader_release(queue="q", owner="b")
+    assert client.leader_release(queue="q", owner="a")
+    assert client.leader_acquire(queue="q", owner="b", lease_ms=100)
+
+    time.sleep(0.15)
+    assert client.leader_acquire(queue="q", owner="a", lease_ms=100)
+
+def test_only_the_leader_runs_maintenance(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, due_ms=int(time.time() * 1000) + 50)
+    leader = QueueMaintainer(client, queue="q", owner="a")
+    follower = QueueMaintainer(client, queue="q", owner="b")
+
+    leader.tick()
+    follower.tick()
+    assert (leader.leader, follower.leader) == (True, False)
+
+    time.sleep(0.06)
+    leader.tick()
+    assert r.lrange("{q}:wait", 0, -1) == [job_id]
+
+    leader.release()
+    assert r.get("{q}:maint:leader") is None
+
+def test_maintainer_rejects_a_bad_lease(client):
+    with pytest.raises(ValueError):
+        QueueMaintainer(client, queue="q", lease_ms=0)
+
+def test_promote_and_reap_return_the_next_due_score(client):
+    t = 1_900_000_000_000
+    client.publish(queue="q", payload={"i": 1}, due_ms=t + 1_000)
+    client.publish(queue="q", payload={"i": 2}, due_ms=t + 2_000)
+
+    assert client.promote_delayed_next(queue="q", now_ms_override=t + 1_500) == (1, t + 2_000)
+    assert client.promote_delayed_next(queue="q", now_ms_override=t + 2_500) == (1, None)
+
+    job = client.reserve(queue="q", now_ms_override=t + 3_000)
+    assert client.reap_expired_next(queue="q", now_ms_override=t + 3_000) == (0, job.lock_until_ms)
+    assert client.next_maintenance_ms(queue="q") == job.lock_until_ms
+
+    # the reaped job is retried after its backoff, which is the next thing due
+    assert client.reap_expired_next(queue="q", now_ms_override=job.lock_until_ms) == (1, None)
+    assert client.next_maintenance_ms(queue="q") == job.lock_until_ms + 5_000
+
+def test_leader_sleeps_until_the_next_due_job(client, r):
+    client.publish(queue="q", payload={"i": 1}, due_ms=int(time.time() * 1000) + 50)
+    leader = QueueMaintainer(client, queue="q", owner="a", max_interval_s=5.0)
+
+    assert leader.tick() <= 0.06
+    assert client.next_maintenance_ms(queue="q") is not None
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from omniq.monitor import GroupStatus, QueueMonitor
+
+class CountingRedis:
+    # counts round-trips: direct commands and pipeline executions
+    def __init__(self, r):
+        self._r = r
+        self.trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        p = self._r.pipeline(*args, **kwargs)
+        execute = p.execute
+
+        def counted():
+            self.trips += 1
+            return execute()
+
+        p.execute = counted
+        return p
+
+    def __getattr__(self, name):
+        attr = getattr(self._r, name)
+        if not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.trips += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+def test_samples_cost_a_fixed_number_of_round_trips(client, r):
+    for i in range(20):
+        client.publish(queue="q", payload={"i": i}, gid=f"g{i % 4}", max_attempts=1)
+    jobs = client.reserve_batch(queue="q", max_jobs=20)
+    for job in jobs[:2]:
+        client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token, error="boom")
+
+    counting = CountingRedis(r)
+    monitor = QueueMonitor(SimpleNamespace(r=counting))
+
+    active = monitor.sample_active("q")
+    assert counting.trips == 2
+    assert {s.job_id for s in active} == {j.job_id for j in jobs[2:]}
+    assert all(s.attempt == 1 for s in active)
+
+    counting.trips = 0
+    failed = monitor.sample_failed("q")
+    assert counting.trips == 2
+    assert [(s.last_error, s.max_attempts) for s in failed] == [("boom", 1), ("boom", 1)]
+
+    counting.trips = 0
+    status = monitor.group_status("q", ["g0", "nope"])
+    assert counting.trips == 1
+    assert status == [GroupStatus(gid="g0", inflight=0, limit=1), GroupStatus(gid="nope", inflight=0, limit=1)]
+
+def test_sample_failed_skips_stale_and_duplicate_entries(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, max_attempts=1)
+    job = client.reserve(queue="q")
+    client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token)
+    client.retry_failed(queue="q", job_id=job_id)
+    job = client.reserve(queue="q")
+    client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token)
+
+    assert r.llen("{q}:failed") == 2
+    assert [s.job_id for s in QueueMonitor(client).sample_failed("q")] == [job_id]
+
+def test_sample_delayed_is_ordered_by_due_time(client):
+    late = client.publish(queue="q", payload={"i": 1}, due_ms=1_900_000_002_000)
+    early = client.publish(queue="q", payload={"i": 2}, due_ms=1_900_000_001_000)
+
+    samples = QueueMonitor(client).sample_delayed("q")
+
+    assert [(s.job_id, s.due_ms) for s in samples] == [(early, 1_900_000_001_000), (late, 1_900_000_002_000)]
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from conftest import Stop, run_until
+
+def test_enqueue_pushes_capped_wakeup_tokens(client, r):
+    for i in range(70):
+        client.publish(queue="q", payload={"i": i})
+
+    assert r.llen("{q}:notify") == 64
+
+def test_delayed_publish_wakes_only_on_promote(client, r):
+    client.publish(queue="q", payload={"i": 1}, due_ms=1_900_000_000_000)
+    assert r.llen("{q}:notify") == 0
+
+    client.promote_delayed(queue="q", now_ms_override=1_900_000_000_000)
+    assert r.llen("{q}:notify") == 1
+
+def test_retry_failed_wakes_consumers(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, max_attempts=1)
+    r.delete("{q}:notify")
+    job = client.reserve(queue="q")
+    client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token)
+
+    client.retry_failed(queue="q", job_id=job_id)
+
+    assert r.llen("{q}:notify") == 1
+
+def test_wait_for_jobs_consumes_a_token_or_times_out(client):
+    assert client.wait_for_jobs(queue="q", timeout_s=0.05) is False
+    client.publish(queue="q", payload={"i": 1})
+    assert client.wait_for_jobs(queue="q", timeout_s=0.05) is True
+
+def test_idle_consumer_wakes_on_publish(client, make_client):
+    producer = make_client()
+    sent = []
+
+    def publish_later():
+        time.sleep(0.3)
+        sent.append(time.monotonic())
+        producer.publish(queue="q", payload={"i": 1})
+
+    threading.Thread(target=publish_later, daemon=True).start()
+    got = []
+
+    def handler(ctx):
+        got.append(time.monotonic())
+        raise Stop()
+
+    run_until(lambda: client.consume(queue="q", handler=handler, maintenance=False, idle_wait_s=5.0, poll_interval_s=2.0))
+
+    assert got[0] - sent[0] < 0.5
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from conftest import sigterm_when, wait_for
+
+def test_consume_pool_runs_handlers_concurrently(client, r):
+    for i in range(8):
+        client.publish(queue="q", payload={"i": i})
+
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def handler(ctx):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.pop()
+
+    sigterm_when(lambda: r.llen("{q}:completed") == 8)
+    client.consume_pool(queue="q", handler=handler, concurrency=4, maintenance=False, idle_wait_s=0.05)
+
+    assert max(peak) == 4
+    assert r.zcard("{q}:active") == 0
+
+def test_consume_pool_keeps_group_limit(client, r):
+    for i in range(6):
+        client.publish(queue="q", payload={"i": i}, gid="g1", group_limit=2)
+
+    lock = threading.Lock()
+    inflight = []
+    peak = []
+
+    def handler(ctx):
+        with lock:
+            inflight.append(1)
+            peak.append(len(inflight))
+        time.sleep(0.05)
+        with lock:
+            inflight.pop()
+
+    sigterm_when(lambda: r.llen("{q}:completed") == 6)
+    client.consume_pool(queue="q", handler=handler, concurrency=8, maintenance=False, idle_wait_s=0.05)
+
+    assert max(peak) == 2
+
+def test_consume_pool_without_drain_keeps_running_handlers_alive(client, make_client, r):
+    # a 600 ms lease and a 1.2 s handler: the lease survives only if the heartbeats outlive the stop
+    job_id = client.publish(queue="q", payload={"i": 1}, timeout_ms=600)
+
+    reaper = make_client()
+    started = threading.Event()
+    finished = threading.Event()
+
+    def handler(ctx):
+        started.set()
+        time.sleep(1.2)
+        finished.set()
+
+    def reap():
+        while not finished.is_set():
+            reaper.reap_expired(queue="q")
+            time.sleep(0.05)
+
+    threading.Thread(target=reap, daemon=True).start()
+    sigterm_when(started.is_set)
+
+    t0 = time.monotonic()
+    client.consume_pool(queue="q", handler=handler, concurrency=2, drain=False, heartbeat_interval_s=0.1, maintenance=False)
+
+    assert finished.is_set()
+    assert time.monotonic() - t0 >= 1.0
+    wait_for(lambda: r.hget("{q}:job:" + job_id, "state") == "completed")
+    assert r.hget("{q}:job:" + job_id, "attempt") == "1"
+
+def test_consume_pool_shutdown_timeout_leaves_late_handlers_running(client, make_client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, timeout_ms=600)
+
+    reaper = make_client()
+    started = threading.Event()
+    finished = threading.Event()
+
+    def handler(ctx):
+        started.set()
+        time.sleep(1.0)
+        finished.set()
+
+    def reap():
+        while not finished.is_set():
+            reaper.reap_expired(queue="q")
+            time.sleep(0.05)
+
+    threading.Thread(target=reap, daemon=True).start()
+    sigterm_when(started.is_set)
+
+    t0 = time.monotonic()
+    client.consume_pool(
+        queue="q",
+        handler=handler,
+        drain=False,
+        heartbeat_interval_s=0.1,
+        maintenance=False,
+        idle_wait_s=0.05,
+        shutdown_timeout_s=0.1,
+    )
+
+    assert time.monotonic() - t0 < 0.8
+    assert not finished.is_set()
+    wait_for(lambda: r.hget("{q}:job:" + job_id, "state") == "completed")
+    assert r.hget("{q}:job:" + job_id, "attempt") == "1"
@@ -0,0 +1,44 @@
+import pytest
+
+from omniq.monitor import QueueMonitor
+
+T = 1_900_000_000_000
+
+def drain(client):
+    out = []
+    while (job := client.reserve(queue="q")) is not None:
+        out.append(job.job_id)
+    return out
+
+def test_higher_priority_first_and_fifo_within_a_level(client):
+    low = [client.publish(queue="q", payload={"i": i}) for i in range(2)]
+    high = [client.publish(queue="q", payload={"i": i}, priority=9) for i in range(2)]
+    mid = client.publish(queue="q", payload={"i": 0}, priority=3)
+
+    assert drain(client) == high + [mid] + low
+
+def test_fair_every_serves_lower_lanes(client):
+    high = [client.publish(queue="q", payload={"i": i}, priority=9) for i in range(6)]
+    low = client.publish(queue="q", payload={"i": 0})
+    client.set_priority_fairness(queue="q", fair_every=3)
+
+    order = drain(client)
+
+    assert client.get_priority_fairness(queue="q") == 3
+    assert order.index(low) <= 3
+    assert [j for j in order if j != low] == high
+
+def test_retry_keeps_the_priority(client, r):
+    job_id = client.publish(queue="q", payload={"i": 1}, priority=7, backoff_ms=0)
+    job = client.reserve(queue="q", now_ms_override=T)
+    client.ack_fail(queue="q", job_id=job.job_id, lease_token=job.lease_token, now_ms_override=T)
+    client.promote_delayed(queue="q", now_ms_override=T)
+
+    assert r.lrange("{q}:wait:7", 0, -1) == [job_id]
+    assert QueueMonitor(client).counts("q").by_priority == {7: 1}
+
+def test_priority_is_validated(client):
+    with pytest.raises(ValueError):
+        client.publish(queue="q", payload={"i": 1}, priority=10)
+    with pytest.raises(ValueError):
+        client.publish(queue="q", payload={"i": 1}, priority=1, gid="g1")
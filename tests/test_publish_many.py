@@ -0,0 +1,46 @@
+import pytest
+
+from omniq import PublishJob
+from omniq.monitor import QueueMonitor
+
+def test_publish_many_returns_ids_in_order_and_mixes_job_kinds(client, r):
+    ids = client.publish_many(queue="q", jobs=[
+        {"payload": {"i": 1}},
+        {"payload": {"i": 2}, "gid": "g1", "group_limit": 2},
+        PublishJob(payload={"i": 3}, due_ms=1_900_000_000_000),
+        PublishJob(payload={"i": 4}, job_id="mine"),
+    ])
+
+    assert ids[3] == "mine"
+    assert r.lrange("{q}:wait", 0, -1) == [ids[0], ids[3]]
+    assert r.lrange("{q}:g:g1:wait", 0, -1) == [ids[1]]
+    assert r.get("{q}:g:g1:limit") == "2"
+    assert r.zscore("{q}:delayed", ids[2]) == 1_900_000_000_000
+
+    stats = QueueMonitor(client).stats("q")
+    assert (stats.waiting, stats.delayed) == (3, 1)
+
+def test_publish_many_chunks_keep_order(client, r):
+    ids = client.publish_many(queue="q", jobs=[{"payload": {"i": i}} for i in range(250)], chunk_size=100)
+
+    assert len(set(ids)) == 250
+    assert r.lrange("{q}:wait", 0, -1) == ids
+
+def test_publish_many_call_level_options_apply_unless_a_job_overrides(client, r):
+    a, b = client.publish_many(
+        queue="q",
+        jobs=[{"payload": {"i": 1}}, {"payload": {"i": 2}, "max_attempts": 9}],
+        max_attempts=2,
+    )
+
+    assert r.hget("{q}:job:" + a, "max_attempts") == "2"
+    assert r.hget("{q}:job:" + b, "max_attempts") == "9"
+
+def test_publish_many_validates_input(client):
+    with pytest.raises(ValueError):
+        client.publish_many(queue="q", jobs=[{"payload": {}}], chunk_size=1001)
+    with pytest.raises(TypeError):
+        client.publish_many(queue="q", jobs=[{"payload": "text"}])
+    with pytest.raises(TypeError):
+        client.publish_many(queue="q", jobs=[("payload",)])
+    assert client.publish_many(queue="q", jobs=[]) == []
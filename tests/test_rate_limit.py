@@ -0,0 +1,73 @@
+import pytest
+
+from omniq.types import RateLimit, ReserveThrottled
+
+T = 1_900_000_000_000
+
+def test_set_and_get_rate_limit(client, r):
+    client.set_rate_limit(queue="q", gid="g1", rate_per_s=5, burst=10)
+    client.set_rate_limit(queue="q", rate_per_s=200)
+
+    assert client.get_rate_limit(queue="q", gid="g1") == RateLimit(rate_per_s=5.0, burst=10)
+    assert client.get_rate_limit(queue="q") == RateLimit(rate_per_s=200.0, burst=1)
+
+    client.set_rate_limit(queue="q", gid="g1", rate_per_s=0)
+
+    assert client.get_rate_limit(queue="q", gid="g1") is None
+    assert not r.exists("{q}:g:g1:rate")
+    with pytest.raises(ValueError):
+        client.set_rate_limit(queue="q", rate_per_s=1, burst=0)
+
+def test_queue_rate_throttles_reserve(client):
+    client.set_rate_limit(queue="q", rate_per_s=1, burst=2)
+    for i in range(3):
+        client.publish(queue="q", payload={"i": i})
+
+    assert client.reserve(queue="q", now_ms_override=T) is not None
+    assert client.reserve(queue="q", now_ms_override=T) is not None
+    assert client.reserve(queue="q", now_ms_override=T) == ReserveThrottled(retry_in_ms=1000)
+    assert client.reserve(queue="q", now_ms_override=T + 1000) is not None
+
+def test_throttled_group_is_parked_while_other_groups_run(client, r):
+    client.set_rate_limit(queue="q", gid="g1", rate_per_s=1)
+    for i in range(3):
+        client.publish(queue="q", payload={"i": i}, gid="g1", group_limit=5)
+    for i in range(2):
+        client.publish(queue="q", payload={"i": i}, gid="g2", group_limit=5)
+
+    first = client.reserve(queue="q", now_ms_override=T)
+    client.ack_success(queue="q", job_id=first.job_id, lease_token=first.lease_token)
+    gids = [first.gid] + [client.reserve(queue="q", now_ms_override=T).gid for _ in range(2)]
+
+    assert sorted(gids) == ["g1", "g2", "g2"]
+    assert r.zscore("{q}:groups:throttled", "g1") == T + 1000
+    assert client.reserve(queue="q", now_ms_override=T) == ReserveThrottled(retry_in_ms=1000)
+
+    assert client.reserve(queue="q", now_ms_override=T + 1000).gid == "g1"
+    assert r.zscore("{q}:groups:throttled", "g1") is None
+
+def test_sharded_queue_splits_the_queue_rate_and_burst(make_client, r):
+    client = make_client(shards={"q": 2})
+
+    client.set_rate_limit(queue="q", rate_per_s=10, burst=3)
+
+    assert [r.hget("{" + p + "}:rate", "rate_per_s") for p in client.partitions("q")] == ["5", "5"]
+    assert [r.hget("{" + p + "}:rate", "burst") for p in client.partitions("q")] == ["2", "1"]
+    assert client.get_rate_limit(queue="q") == RateLimit(rate_per_s=10.0, burst=3)
+
+    # every partition needs a whole token
+    client.set_rate_limit(queue="q", rate_per_s=10, burst=1)
+    assert client.get_rate_limit(queue="q") == RateLimit(rate_per_s=10.0, burst=2)
+
+def test_changing_the_rate_only_applies_from_then_on(client):
+    client.set_rate_limit(queue="q", rate_per_s=1, burst=10, now_ms_override=T)
+    for i in range(12):
+        client.publish(queue="q", payload={"i": i})
+    for _ in range(10):
+        client.reserve(queue="q", now_ms_override=T)
+
+    # 1 s at the old 1/s rate, then the new 1000/s rate from T + 1000 only
+    client.set_rate_limit(queue="q", rate_per_s=1000, burst=10, now_ms_override=T + 1000)
+
+    assert client.reserve(queue="q", now_ms_override=T + 1000) is not None
+    assert client.reserve(queue="q", now_ms_override=T + 1000) == ReserveThrottled(retry_in_ms=1)
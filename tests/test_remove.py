@@ -0,0 +1,96 @@
+import pytest
+
+from omniq.monitor import QueueMonitor
+
+def complete(client, n, queue="q"):
+    ids = [client.publish(queue=queue, payload={"i": i}) for i in range(n)]
+    for _ in ids:
+        job = client.reserve(queue=queue)
+        client.ack_success(queue=queue, job_id=job.job_id, lease_token=job.lease_token)
+    return ids
+
+def live_ids(client, queue, lane):
+    return [item.job_id for item in QueueMonitor(client).iter_lane(queue, lane)]
+
+def test_remove_waiting_job_is_lazy_and_reserve_skips_it(client, r):
+    a = client.publish(queue="q", payload={"i": 1})
+    b = client.publish(queue="q", payload={"i": 2})
+
+    client.remove_job(queue="q", job_id=a, lane="wait")
+
+    assert r.llen("{q}:wait") == 2
+    assert QueueMonitor(client).stats("q").waiting == 1
+    assert client.reserve(queue="q").job_id == b
+    assert client.reserve(queue="q") is None
+
+def test_remove_completed_job_does_not_scan_the_lane(client, r):
+    ids = complete(client, 3)
+
+    client.remove_job(queue="q", job_id=ids[1], lane="completed")
+
+    assert r.llen("{q}:completed") == 3
+    assert not r.exists("{q}:job:" + ids[1])
+    assert QueueMonitor(client).stats("q").completed == 2
+    assert live_ids(client, "q", "completed") == [ids[2], ids[0]]
+
+    with pytest.raises(RuntimeError, match="NO_JOB"):
+        client.remove_job(queue="q", job_id=ids[1], lane="completed")
+
+def test_remove_jobs_batch_completed_lane(client, r):
+    ids = complete(client, 3)
+
+    results = client.remove_jobs_batch(queue="q", lane="completed", job_ids=[ids[0], ids[2], "missing"])
+
+    assert results == [(ids[0], "OK", None), (ids[2], "OK", None), ("missing", "ERR", "NO_JOB")]
+    assert QueueMonitor(client).stats("q").completed == 1
+    assert live_ids(client, "q", "completed") == [ids[1]]
+
+def test_retention_sweep_skips_removed_completed_entries(client, r):
+    ids = complete(client, 5)
+    client.set_retention(queue="q", completed_keep=2)
+    client.remove_job(queue="q", job_id=ids[4], lane="completed")
+
+    client.sweep_retention(queue="q")
+
+    assert live_ids(client, "q", "completed") == [ids[3], ids[2]]
+    assert QueueMonitor(client).stats("q").completed == 2
+
+def test_purge_lane_skips_removed_completed_entries(client, r):
+    ids = complete(client, 4)
+    client.remove_job(queue="q", job_id=ids[0], lane="completed")
+
+    progress = client.purge_lane(queue="q", lane="completed")
+
+    assert (progress.total, progress.done) == (3, True)
+    assert r.llen("{q}:completed") == 0
+    assert QueueMonitor(client).stats("q").completed == 0
+
+def test_remove_rejects_active_and_wrong_lane(client):
+    job_id = client.publish(queue="q", payload={"i": 1})
+
+    with pytest.raises(RuntimeError, match="LANE_MISMATCH"):
+        client.remove_job(queue="q", job_id=job_id, lane="failed")
+
+    client.reserve(queue="q")
+    with pytest.raises(RuntimeError, match="ACTIVE"):
+        client.remove_job(queue="q", job_id=job_id, lane="wait")
+
+def test_reserve_reaches_live_jobs_behind_a_long_run_of_removed_ones(client, r):
+    # more stale ids than one reserve call pops (MAX_STALE_POPS = 100)
+    removed = client.publish_many(queue="q", jobs=[{"payload": {"i": i}} for i in range(250)])
+    live = client.publish(queue="q", payload={"live": True})
+    for i in range(0, 250, 100):
+        client.remove_jobs_batch(queue="q", lane="wait", job_ids=removed[i:i + 100])
+
+    assert client.reserve(queue="q").job_id == live
+    assert client.reserve(queue="q") is None
+
+def test_reserve_batch_reaches_live_jobs_behind_removed_group_jobs(client, r):
+    removed = client.publish_many(queue="q", jobs=[{"payload": {"i": i}, "gid": "g1"} for i in range(150)])
+    live = client.publish(queue="q", payload={"live": True}, gid="g1")
+    for i in range(0, 150, 100):
+        client.remove_jobs_batch(queue="q", lane="gwait", job_ids=removed[i:i + 100])
+
+    jobs = client.reserve_batch(queue="q", max_jobs=10)
+
+    assert [j.job_id for j in jobs] == [live]
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from omniq.types import ReservePaused
+
+from conftest import Stop, run_until
+
+def test_reserve_batch_leases_up_to_max_jobs(client, r):
+    for i in range(5):
+        client.publish(queue="q", payload={"i": i})
+
+    jobs = client.reserve_batch(queue="q", max_jobs=3)
+
+    assert [j.attempt for j in jobs] == [1, 1, 1]
+    assert len({j.lease_token for j in jobs}) == 3
+    assert r.zcard("{q}:active") == 3
+    assert len(client.reserve_batch(queue="q", max_jobs=10)) == 2
+    assert client.reserve_batch(queue="q", max_jobs=10) == []
+
+def test_reserve_batch_respects_group_limit(client):
+    for i in range(4):
+        client.publish(queue="q", payload={"i": i}, gid="g1", group_limit=2)
+
+    jobs = client.reserve_batch(queue="q", max_jobs=10)
+
+    assert len(jobs) == 2
+    assert {j.gid for j in jobs} == {"g1"}
+
+def test_reserve_batch_paused_and_bounds(client):
+    client.pause(queue="q")
+    assert isinstance(client.reserve_batch(queue="q", max_jobs=5), ReservePaused)
+
+    with pytest.raises(ValueError):
+        client.reserve_batch(queue="q", max_jobs=0)
+    with pytest.raises(ValueError):
+        client.reserve_batch(queue="q", max_jobs=101)
+
+def test_prefetched_leases_are_heartbeated_until_their_job_runs(client, make_client, r):
+    # three jobs leased in one batch for 600 ms each; run back to back they take ~1.2 s,
+    # so the last one would expire in the buffer and be reaped without a heartbeat
+    ids = [client.publish(queue="q", payload={"i": i}, timeout_ms=600) for i in range(3)]
+    client.publish(queue="q", payload={"stop": True}, timeout_ms=600)
+
+    reaper = make_client()
+    done = threading.Event()
+
+    def reap():
+        while not done.is_set():
+            reaper.reap_expired(queue="q")
+            time.sleep(0.05)
+
+    threading.Thread(target=reap, daemon=True).start()
+
+    runs = []
+
+    def handler(ctx):
+        if ctx.payload.get("stop"):
+            raise Stop()
+        runs.append(ctx.job_id)
+        time.sleep(0.4)
+
+    try:
+        run_until(lambda: client.consume(
+            queue="q",
+            handler=handler,
+            prefetch=4,
+            heartbeat_interval_s=0.1,
+            maintenance=False,
+        ))
+    finally:
+        done.set()
+
+    assert runs == ids
+    for job_id in ids:
+        assert r.hmget("{q}:job:" + job_id, "state", "attempt") == ["completed", "1"]
+
+def test_buffered_acks_keep_their_lease_while_the_next_job_runs(client, make_client, r):
+    # a's ack waits in the buffer while b runs for longer than a's lease
+    a = client.publish(queue="q", payload={"job": "a"}, timeout_ms=600)
+    b = client.publish(queue="q", payload={"job": "b"}, timeout_ms=600)
+    client.publish(queue="q", payload={"stop": True}, timeout_ms=600)
+
+    reaper = make_client()
+    done = threading.Event()
+
+    def reap():
+        while not done.is_set():
+            reaper.reap_expired(queue="q")
+            time.sleep(0.05)
+
+    threading.Thread(target=reap, daemon=True).start()
+
+    runs = []
+
+    def handler(ctx):
+        if ctx.payload.get("stop"):
+            raise Stop()
+        runs.append(ctx.job_id)
+        if ctx.job_id == b:
+            time.sleep(1.0)
+
+    try:
+        run_until(lambda: client.consume(
+            queue="q",
+            handler=handler,
+            prefetch=3,
+            heartbeat_interval_s=0.1,
+            ack_flush_ms=5_000,
+            maintenance=False,
+        ))
+    finally:
+        done.set()
+
+    assert runs == [a, b]
+    assert r.hmget("{q}:job:" + a, "state", "attempt") == ["completed", "1"]
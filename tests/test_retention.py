@@ -0,0 +1,82 @@
+from omniq.monitor import QueueMonitor
+
+def complete(client, n, queue="q"):
+    ids = [client.publish(queue=queue, payload={"i": i}) for i in range(n)]
+    for _ in ids:
+        job = client.reserve(queue=queue)
+        client.ack_success(queue=queue, job_id=job.job_id, lease_token=job.lease_token)
+    return ids
+
+def fail(client, n, queue="q"):
+    ids = [client.publish(queue=queue, payload={"i": i}, max_attempts=1) for i in range(n)]
+    for _ in ids:
+        job = client.reserve(queue=queue)
+        client.ack_fail(queue=queue, job_id=job.job_id, lease_token=job.lease_token, error="boom")
+    return ids
+
+def test_ack_keeps_completed_lane_bounded_without_a_sweep(client, r):
+    client.set_retention(queue="q", completed_keep=3)
+
+    ids = complete(client, 10)
+
+    assert r.lrange("{q}:completed", 0, -1) == [ids[9], ids[8], ids[7]]
+    assert not r.exists("{q}:job:" + ids[0])
+    assert QueueMonitor(client).stats("q").completed == 3
+
+def test_ack_batch_keeps_completed_lane_bounded(client, r):
+    client.set_retention(queue="q", completed_keep=2)
+    for i in range(6):
+        client.publish(queue="q", payload={"i": i})
+
+    jobs = client.reserve_batch(queue="q", max_jobs=6)
+    client.ack_success_batch(queue="q", jobs=[(j.job_id, j.lease_token) for j in jobs])
+
+    assert r.llen("{q}:completed") == 2
+    assert QueueMonitor(client).stats("q").completed == 2
+
+def test_default_keeps_last_100_completed(client, r):
+    complete(client, 105)
+
+    assert r.llen("{q}:completed") == 100
+
+def test_sweep_counts_by_lane_length_when_stats_are_missing(client, r):
+    client.set_retention(queue="q", completed_keep=0)
+    ids = complete(client, 6)
+    # a queue written before the stats hash existed
+    r.delete("{q}:stats")
+    client.set_retention(queue="q", completed_keep=2)
+
+    client.sweep_retention(queue="q")
+
+    assert r.lrange("{q}:completed", 0, -1) == [ids[5], ids[4]]
+    assert r.hget("{q}:stats", "completed") == "2"
+
+def test_ack_trims_a_queue_written_before_stats(client, r):
+    client.set_retention(queue="q", completed_keep=0)
+    complete(client, 6)
+    fail(client, 3)
+    r.delete("{q}:stats")
+    client.set_retention(queue="q", completed_keep=2)
+
+    complete(client, 1)
+    fail(client, 1)
+
+    # the first ack starts the counter from the list length, then trims two entries as usual
+    assert r.llen("{q}:completed") == 5
+    assert QueueMonitor(client).stats("q").completed == 5
+    assert QueueMonitor(client).stats("q").failed == 4
+
+def test_sweep_trims_by_age_and_failed_keep(client, r):
+    ids = complete(client, 3)
+    failed = fail(client, 4)
+    client.set_retention(queue="q", completed_max_age_ms=1000, failed_keep=1)
+
+    assert client.sweep_retention(queue="q") == 3
+    assert r.llen("{q}:completed") == 3
+
+    client.sweep_retention(queue="q", now_ms_override=int(r.hget("{q}:job:" + ids[2], "updated_ms")) + 1000)
+
+    assert r.llen("{q}:completed") == 0
+    assert r.lrange("{q}:failed", 0, -1) == [failed[3]]
+    assert QueueMonitor(client).stats("q").completed == 0
+    assert QueueMonitor(client).stats("q").failed == 1
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from omniq.helper import shard_for_gid
+from omniq.monitor import QueueMonitor
+
+from conftest import Stop, run_until
+
+@pytest.fixture
+def sharded(make_client):
+    return make_client(shards={"q": 3})
+
+def fail_all(client, n, **kwargs):
+    ids = [client.publish(queue="q", payload={"i": i}, max_attempts=1, **kwargs) for i in range(n)]
+    for part in client.partitions("q"):
+        # reserve and ack take the partition name
+        while (job := client.reserve(queue=part)) is not None:
+            client.ack_fail(queue=part, job_id=job.job_id, lease_token=job.lease_token)
+    return ids
+
+def failed_count(r, client):
+    return sum(r.llen("{" + part + "}:failed") for part in client.partitions("q"))
+
+def test_publish_spreads_jobs_and_keeps_a_gid_on_one_partition(sharded, r):
+    parts = sharded.partitions("q")
+    for i in range(6):
+        sharded.publish(queue="q", payload={"i": i})
+    for i in range(3):
+        sharded.publish(queue="q", payload={"i": i}, gid="acct:7")
+
+    assert [r.llen("{" + p + "}:wait") for p in parts] == [2, 2, 2]
+    assert r.llen("{" + parts[shard_for_gid("acct:7", 3)] + "}:g:acct:7:wait") == 3
+    assert QueueMonitor(sharded).stats("q").waiting == 9
+
+def test_per_job_ops_find_the_partition_of_the_job(sharded, r):
+    ids = fail_all(sharded, 3)
+
+    sharded.retry_failed(queue="q", job_id=ids[0])
+    assert sharded.retry_failed_batch(queue="q", job_ids=[ids[1], "missing"]) == [(ids[1], "OK", None), ("missing", "ERR", "NO_JOB")]
+    assert sharded.remove_job(queue="q", job_id=ids[2], lane="failed") == "OK"
+
+    assert QueueMonitor(sharded).stats("q").failed == 0
+    assert QueueMonitor(sharded).stats("q").waiting == 2
+
+def test_remove_jobs_batch_keeps_input_order_across_partitions(sharded):
+    ids = [sharded.publish(queue="q", payload={"i": i}) for i in range(6)]
+    order = ids[::-1]
+
+    results = sharded.remove_jobs_batch(queue="q", lane="wait", job_ids=order)
+
+    assert results == [(job_id, "OK", None) for job_id in order]
+    assert all(sharded.reserve(queue=part) is None for part in sharded.partitions("q"))
+
+def test_retry_all_failed_walks_every_partition_with_a_resumable_cursor(sharded):
+    fail_all(sharded, 6)
+
+    seen = []
+    progress = sharded.retry_all_failed(queue="q", chunk=1, max_chunks=2)
+    seen.append(progress.cursor)
+    while not progress.done:
+        progress = sharded.retry_all_failed(queue="q", chunk=1, max_chunks=2, cursor=progress.cursor)
+        seen.append(progress.cursor)
+
+    assert QueueMonitor(sharded).stats("q").failed == 0
+    assert QueueMonitor(sharded).stats("q").waiting == 6
+    assert len(seen) >= 3
+
+def test_retry_all_failed_with_gid_stays_on_its_partition(sharded):
+    fail_all(sharded, 2, gid="g1")
+    fail_all(sharded, 3)
+
+    progress = sharded.retry_all_failed(queue="q", gid="g1")
+
+    assert (progress.total, progress.done) == (2, True)
+    assert QueueMonitor(sharded).stats("q").failed == 3
+
+def test_purge_sweep_and_rebuild_stats_cover_every_partition(sharded, r):
+    fail_all(sharded, 6)
+
+    sharded.set_retention(queue="q", failed_keep=1)
+    assert sharded.sweep_retention(queue="q") == 3
+    assert failed_count(r, sharded) == 3
+
+    for part in sharded.partitions("q"):
+        r.delete("{" + part + "}:stats")
+    sharded.rebuild_stats(queue="q")
+    assert QueueMonitor(sharded).stats("q").failed == 3
+
+    progress = sharded.purge_lane(queue="q", lane="failed", chunk=1, max_chunks=1)
+    assert (progress.total, progress.done) == (1, False)
+
+    progress = sharded.purge_lane(queue="q", lane="failed")
+    assert progress.done
+    assert failed_count(r, sharded) == 0
+
+def test_async_client_routes_per_job_ops(make_async_client, sharded):
+    ids = fail_all(sharded, 3)
+
+    async def run():
+        client = make_async_client(shards={"q": 3})
+        results = await client.retry_failed_batch(queue="q", job_ids=ids)
+        await client.close()
+        return results
+
+    assert asyncio.run(run()) == [(job_id, "OK", None) for job_id in ids]
+    assert QueueMonitor(sharded).stats("q").waiting == 3
+
+def idle_then_publish(client, gid):
+    # publish once the consumer is blocked in its idle wait, to a partition other than the first
+    def run():
+        time.sleep(0.3)
+        sent.append(time.monotonic())
+        client.publish(queue="q", payload={"i": 1}, gid=gid)
+
+    sent = []
+    threading.Thread(target=run, daemon=True).start()
+    return sent
+
+def test_idle_consumer_wakes_on_any_partition(sharded):
+    gid = next(g for g in ("a", "b", "c", "d") if shard_for_gid(g, 3) != 0)
+    sent = idle_then_publish(sharded, gid)
+    got = []
+
+    def handler(ctx):
+        got.append(time.monotonic())
+        raise Stop()
+
+    run_until(lambda: sharded.consume(queue="q", handler=handler, maintenance=False, idle_wait_s=5.0))
+
+    assert got[0] - sent[0] < 1.0
+
+def test_idle_async_consumer_wakes_on_any_partition(make_async_client, sharded):
+    gid = next(g for g in ("a", "b", "c", "d") if shard_for_gid(g, 3) != 0)
+    sent = idle_then_publish(sharded, gid)
+    got = []
+
+    async def run():
+        stop = asyncio.Event()
+
+        async def handler(ctx):
+            got.append(time.monotonic())
+            stop.set()
+
+        client = make_async_client(shards={"q": 3})
+        await client.consume(queue="q", handler=handler, maintenance=False, idle_wait_s=2.0, stop_event=stop)
+
+    run_until(lambda: asyncio.run(run()))
+
+    # waiting on the first partition only would pick the job up after the 2 s idle wait
+    assert got[0] - sent[0] < 1.0
@@ -0,0 +1,50 @@
+from omniq.monitor import QueueMonitor
+
+def take(client, **kwargs):
+    client.publish(queue="q", payload={}, **kwargs)
+    return client.reserve(queue="q")
+
+def lifecycle(client):
+    a = take(client, max_attempts=2)
+    client.ack_fail(queue="q", job_id=a.job_id, lease_token=a.lease_token)
+    b = take(client, gid="g1", max_attempts=1)
+    client.ack_fail(queue="q", job_id=b.job_id, lease_token=b.lease_token)
+    c = take(client)
+    client.ack_success(queue="q", job_id=c.job_id, lease_token=c.lease_token)
+    take(client)
+    client.publish(queue="q", payload={}, due_ms=1_900_000_000_000)
+    client.publish(queue="q", payload={})
+    return b.job_id
+
+def counts(stats):
+    return (stats.waiting, stats.active, stats.delayed, stats.completed, stats.failed)
+
+def test_scripts_keep_counts_and_totals(client):
+    lifecycle(client)
+
+    stats = QueueMonitor(client).stats("q")
+
+    # a waits out its retry backoff next to the delayed job, b failed, c completed, the fourth is leased
+    assert counts(stats) == (1, 1, 2, 1, 1)
+    assert (stats.total_enqueued, stats.total_completed, stats.total_failed, stats.total_retried) == (6, 1, 1, 1)
+
+def test_retry_failed_and_pause_are_reflected(client):
+    failed_id = lifecycle(client)
+
+    client.retry_failed(queue="q", job_id=failed_id)
+    client.pause(queue="q")
+
+    stats = QueueMonitor(client).stats("q")
+    assert stats.paused
+    assert (stats.waiting, stats.failed) == (2, 0)
+
+def test_rebuild_stats_recounts_the_lanes(client, r):
+    lifecycle(client)
+    before = counts(QueueMonitor(client).stats("q"))
+    r.delete("{q}:stats")
+
+    client.rebuild_stats(queue="q")
+
+    stats = QueueMonitor(client).stats("q")
+    assert counts(stats) == before
+    assert stats.total_enqueued == 0